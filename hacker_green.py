@@ -2,13 +2,25 @@
 import sys
 import os
 import subprocess
+import signal
 import re
+import io
+import codecs
+import locale
 import time
+import json
+import shutil
+import threading
 import webbrowser
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+# Start of the Qt imports, which are most of the import time; for --profile-startup
+IMPORT_STARTED = time.perf_counter()
+
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
 
 # ==================== HACKER GAMER THEME ====================
 
@@ -233,11 +245,13 @@ class FastHighlighter(QSyntaxHighlighter):
         super().__init__(document)
         self.language = language
         self.rules = []
+        self.multiline = []
         self.setup_rules()
     
     def set_language(self, language):
         self.language = language
         self.rules = []
+        self.multiline = []
         self.setup_rules()
         self.rehighlight()
     
@@ -272,6 +286,8 @@ class FastHighlighter(QSyntaxHighlighter):
             self.rules.append((r'"[^"]*"', formats['string']))
             self.rules.append((r"'[^']*'", formats['string']))
             self.rules.append((r'\b\d+\b', formats['number']))
+            self.multiline.append(('"""', '"""', formats['string']))
+            self.multiline.append(("'''", "'''", formats['string']))
         
         # JavaScript
         elif self.language == 'javascript':
@@ -282,26 +298,30 @@ class FastHighlighter(QSyntaxHighlighter):
             
             self.rules.append((r'\bfunction\s+(\w+)', formats['function']))
             self.rules.append((r'//.*', formats['comment']))
+            self.multiline.append(('/*', '*/', formats['comment']))
             self.rules.append((r'"[^"]*"', formats['string']))
             self.rules.append((r"'[^']*'", formats['string']))
-            self.rules.append((r'`[^`]*`', formats['string']))
+            self.multiline.append(('`', '`', formats['string']))
         
         # Other languages use simplified rules for speed
         elif self.language == 'java':
             self.rules.append((r'\bclass\s+(\w+)', formats['class']))
             self.rules.append((r'//.*', formats['comment']))
+            self.multiline.append(('/*', '*/', formats['comment']))
             self.rules.append((r'"[^"]*"', formats['string']))
         
         elif self.language == 'cpp' or self.language == 'c':
             self.rules.append((r'//.*', formats['comment']))
+            self.multiline.append(('/*', '*/', formats['comment']))
             self.rules.append((r'"[^"]*"', formats['string']))
         
         elif self.language == 'html':
             self.rules.append((r'</?\w+', formats['tag']))
             self.rules.append((r'"[^"]*"', formats['string']))
+            self.multiline.append(('<!--', '-->', formats['comment']))
         
         elif self.language == 'css':
-            self.rules.append((r'/\*[\s\S]*?\*/', formats['comment']))
+            self.multiline.append(('/*', '*/', formats['comment']))
             self.rules.append((r'"[^"]*"', formats['string']))
     
     def create_format(self, color, bold=False, italic=False):
@@ -319,6 +339,37 @@ class FastHighlighter(QSyntaxHighlighter):
                 start = match.start()
                 length = match.end() - start
                 self.setFormat(start, length, fmt)
+        self.highlight_multiline(text)
+    
+    def highlight_multiline(self, text):
+        """Paint strings/comments that span blocks, carrying them in the block state"""
+        # Qt only moves on to the next block when this state changes, so an
+        # edit costs the blocks whose incoming state differs, not the document
+        self.setCurrentBlockState(0)
+        state = self.previousBlockState()
+        if 0 < state <= len(self.multiline):
+            start = pos = 0
+        else:
+            state, start, pos = self.find_multiline_start(text, 0)
+        while state:
+            _, end, fmt = self.multiline[state - 1]
+            close = text.find(end, pos)
+            if close == -1:
+                self.setFormat(start, len(text) - start, fmt)
+                self.setCurrentBlockState(state)
+                return
+            close += len(end)
+            self.setFormat(start, close - start, fmt)
+            state, start, pos = self.find_multiline_start(text, close)
+    
+    def find_multiline_start(self, text, pos):
+        """Return (state, start, end of opener) for the first opener at or after pos"""
+        found = (0, -1, -1)
+        for index, (begin, _, _) in enumerate(self.multiline):
+            start = text.find(begin, pos)
+            if start != -1 and (found[1] == -1 or start < found[1]):
+                found = (index + 1, start, start + len(begin))
+        return found
 
 # ==================== FAST CODE EDITOR ====================
 
@@ -430,6 +481,242 @@ class LineNumberArea(QWidget):
     def paintEvent(self, event):
         self.editor.line_number_area_paint_event(event)
 
+# ==================== ASYNC PROCESS RUNNER ====================
+
+class ProcessRunner(QObject):
+    """Runs commands with QProcess one after another, streaming their output"""
+    output_received = pyqtSignal(str)
+    error_received = pyqtSignal(str)
+    command_failed = pyqtSignal(str)
+    command_finished = pyqtSignal(int, bool)  # exit code, timed out
+    all_finished = pyqtSignal()
+    # Qt 6.7+ can start a command in a session of its own, which makes it the
+    # leader of a process group that can be stopped as a whole
+    NEW_SESSION = getattr(getattr(QProcess, 'UnixProcessFlag', None), 'CreateNewSession', None)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.process = None
+        self.queue = []
+        self.on_finished = None
+        self.timed_out = False
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setSingleShot(True)
+        self.timeout_timer.timeout.connect(self.on_timeout)
+    
+    def is_running(self):
+        return self.process is not None
+    
+    def run(self, command, cwd, timeout=None, on_finished=None, on_started=None):
+        """Queue a shell command string or an argument list; returns immediately"""
+        self.queue.append((command, cwd, timeout, on_started, on_finished))
+        if self.process is None:
+            self.start_next()
+    
+    def kill(self):
+        """Stop the running command and drop the queued ones"""
+        # Dropped commands still get their callback (as an abnormal exit) so they can clean up
+        dropped, self.queue = self.queue, []
+        for command, cwd, timeout, on_started, on_finished in dropped:
+            if on_finished is not None:
+                on_finished(-1)
+        if self.process is not None:
+            self.stop_process()
+    
+    def stop_process(self):
+        """Kill the running command together with every process it started"""
+        pid = self.process.processId()
+        try:
+            if os.name == 'nt':
+                if pid:
+                    subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            elif pid and os.getpgid(pid) == pid:
+                os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            pass  # Already gone
+        # Left to QProcess so it notices the exit; also covers a Qt without sessions
+        self.process.kill()
+    
+    def start_next(self):
+        command, cwd, timeout, on_started, self.on_finished = self.queue.pop(0)
+        self.timed_out = False
+        self.stdout_decoder = self.create_decoder()
+        self.stderr_decoder = self.create_decoder()
+        
+        process = QProcess(self)
+        process.setWorkingDirectory(cwd)
+        if isinstance(command, list):
+            process.setProgram(command[0])
+            process.setArguments(command[1:])
+        elif os.name == 'nt':
+            # Same command line subprocess builds for shell=True
+            process.setProgram(os.environ.get('COMSPEC', 'cmd.exe'))
+            process.setNativeArguments(f'/c "{command}"')
+        else:
+            process.setProgram('/bin/sh')
+            process.setArguments(['-c', command])
+        if os.name != 'nt' and self.NEW_SESSION is not None:
+            process.setUnixProcessParameters(self.NEW_SESSION)
+        process.readyReadStandardOutput.connect(self.read_output)
+        process.readyReadStandardError.connect(self.read_error)
+        process.finished.connect(self.on_process_finished)
+        process.errorOccurred.connect(self.on_process_error)
+        self.process = process
+        if on_started is not None:
+            on_started()
+        process.start()
+        # A command that failed to start has already been finished
+        if timeout and self.process is process:
+            self.timeout_timer.start(timeout * 1000)
+    
+    def create_decoder(self):
+        # Output arrives in arbitrary chunks, so multi-byte characters and
+        # \r\n pairs may be split between two reads
+        decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors='replace')
+        return io.IncrementalNewlineDecoder(decoder, translate=True)
+    
+    def read_output(self):
+        text = self.stdout_decoder.decode(bytes(self.process.readAllStandardOutput()))
+        if text:
+            self.output_received.emit(text)
+    
+    def read_error(self):
+        text = self.stderr_decoder.decode(bytes(self.process.readAllStandardError()))
+        if text:
+            self.error_received.emit(text)
+    
+    def on_timeout(self):
+        self.timed_out = True
+        self.stop_process()
+    
+    def on_process_error(self, error):
+        # Every other error is followed by finished()
+        if error == QProcess.ProcessError.FailedToStart:
+            self.command_failed.emit(self.process.errorString())
+            self.finish(-1)
+    
+    def on_process_finished(self, exit_code, exit_status):
+        self.read_output()
+        self.read_error()
+        for decoder, signal in ((self.stdout_decoder, self.output_received),
+                                (self.stderr_decoder, self.error_received)):
+            text = decoder.decode(b'', final=True)
+            if text:
+                signal.emit(text)
+        if exit_status != QProcess.ExitStatus.NormalExit:
+            exit_code = -1
+        self.finish(exit_code)
+    
+    def finish(self, exit_code):
+        self.timeout_timer.stop()
+        self.process.deleteLater()
+        self.process = None
+        on_finished = self.on_finished
+        self.on_finished = None
+        self.command_finished.emit(exit_code, self.timed_out)
+        if on_finished is not None:
+            on_finished(exit_code)
+        if self.queue:
+            self.start_next()
+        else:
+            self.all_finished.emit()
+
+# ==================== TOOLCHAIN DETECTION ====================
+
+# Compilers and interpreters to look for, in display order:
+# name -> (commands to try in turn, arguments that make them report a version)
+TOOLCHAIN_PROBES = {
+    'python': (['python3', 'python'], ['--version']),
+    'java':   (['java', 'javac'], ['-version']),
+    'node':   (['node'], ['--version']),
+    'php':    (['php'], ['--version']),
+    'gcc':    (['gcc'], ['--version']),
+    'g++':    (['g++'], ['--version']),
+}
+
+# Probe results are cached on disk, keyed by PATH and the resolved binaries'
+# mtimes; a matching cache answers at once and is re-checked in the background
+TOOLCHAIN_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".lrd_toolchains.json")
+TOOLCHAIN_PROBE_TIMEOUT = 1
+
+class ToolchainProbe(QObject):
+    """Detects the available toolchains concurrently, answering from a cache when it can"""
+    detected = pyqtSignal(dict)
+    
+    def __init__(self, probes, cache_file=TOOLCHAIN_CACHE_FILE):
+        super().__init__()
+        self.probes = probes
+        self.cache_file = cache_file
+        self.cache_key = json.dumps(probes)
+    
+    def detect(self):
+        """Return {name: command} for every toolchain found"""
+        fingerprint = self.fingerprint()
+        cached = self.load_cache().get(self.cache_key)
+        if cached and cached['fingerprint'] == fingerprint:
+            threading.Thread(target=self.revalidate, args=(fingerprint, cached['compilers']), daemon=True).start()
+            return dict(cached['compilers'])
+        
+        compilers = self.probe_all()
+        self.save_cache(fingerprint, compilers)
+        return compilers
+    
+    def revalidate(self, fingerprint, cached):
+        """Background thread: probe again and report if the cached answer was stale"""
+        compilers = self.probe_all()
+        self.save_cache(fingerprint, compilers)
+        if compilers != cached:
+            self.detected.emit(compilers)
+    
+    def probe_all(self):
+        with ThreadPoolExecutor(max_workers=len(self.probes)) as pool:
+            found = list(pool.map(lambda probe: self.probe(*probe), self.probes.values()))
+        return {name: cmd for name, cmd in zip(self.probes, found) if cmd}
+    
+    def probe(self, commands, args):
+        """First command that runs and exits cleanly, or None"""
+        for cmd in commands:
+            try:
+                subprocess.run([cmd] + args, capture_output=True, check=True, timeout=TOOLCHAIN_PROBE_TIMEOUT)
+                return cmd
+            except:
+                pass
+        return None
+    
+    def fingerprint(self):
+        """PATH plus where each command resolves to and when that binary last changed"""
+        binaries = {}
+        for commands, args in self.probes.values():
+            for cmd in commands:
+                path = shutil.which(cmd)
+                try:
+                    binaries[cmd] = [os.path.realpath(path), os.path.getmtime(path)] if path else None
+                except OSError:
+                    binaries[cmd] = None
+        return {'path': os.environ.get('PATH', ''), 'binaries': binaries}
+    
+    def load_cache(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def save_cache(self, fingerprint, compilers):
+        cache = self.load_cache()
+        cache[self.cache_key] = {'fingerprint': fingerprint, 'compilers': compilers}
+        # Detection can save from several threads at once, so each writer
+        # gets a temp file of its own and os.replace keeps the cache whole
+        temp_file = f"{self.cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(temp_file, self.cache_file)
+        except OSError:
+            pass
+
 # ==================== FAST INTERACTIVE TERMINAL ====================
 
 class FastInteractiveTerminal(QTextEdit):
@@ -440,6 +727,15 @@ class FastInteractiveTerminal(QTextEdit):
         self.history_index = -1
         self.current_dir = os.getcwd()
         self.compiler_paths = self.detect_compilers()
+        self.error_started = False
+        
+        # External commands run without blocking the window
+        self.runner = ProcessRunner(self)
+        self.runner.output_received.connect(self.insert_output)
+        self.runner.error_received.connect(self.insert_error)
+        self.runner.command_failed.connect(lambda message: self.append(f"Error: {message}"))
+        self.runner.command_finished.connect(self.on_command_finished)
+        self.runner.all_finished.connect(lambda: self.append(""))
         
         # Enable typing
         self.setReadOnly(False)
@@ -468,30 +764,13 @@ class FastInteractiveTerminal(QTextEdit):
     
     def detect_compilers(self):
         """Detect available compilers - faster detection"""
-        compilers = {}
-        
-        # Check common paths
-        common_commands = {
-            'python': ['python3', 'python'],
-            'java': ['java', 'javac'],
-            'node': ['node'],
-            'php': ['php'],
-            'gcc': ['gcc'],
-            'g++': ['g++']
-        }
-        
-        for lang, cmds in common_commands.items():
-            for cmd in cmds:
-                try:
-                    result = subprocess.run([cmd, '--version'] if cmd != 'javac' else [cmd, '-version'],
-                                          capture_output=True, timeout=1)
-                    if result.returncode == 0 or result.stderr:
-                        compilers[lang] = cmd
-                        break
-                except:
-                    continue
-        
-        return compilers
+        self.toolchain_probe = ToolchainProbe(TOOLCHAIN_PROBES)
+        self.toolchain_probe.detected.connect(self.set_compilers)
+        return self.toolchain_probe.detect()
+    
+    def set_compilers(self, compilers):
+        """Pick up toolchains that changed since the cached answer"""
+        self.compiler_paths = compilers
     
     def append_welcome(self):
         self.append(f"[{datetime.now().strftime('%H:%M:%S')}] ⚡ HACKER-GAMER TERMINAL ⚡")
@@ -503,6 +782,14 @@ class FastInteractiveTerminal(QTextEdit):
         self.input_start_pos = self.textCursor().position()
     
     def keyPressEvent(self, event):
+        # Output is still streaming in; Ctrl+C stops the running command
+        if self.runner.is_running():
+            if event.key() == Qt.Key.Key_C and event.modifiers() == Qt.KeyboardModifier.ControlModifier:
+                self.runner.kill()
+                self.append("^C")
+            event.accept()
+            return
+        
         # Handle Enter key to execute command
         if event.key() == Qt.Key.Key_Return or event.key() == Qt.Key.Key_Enter:
             self.execute_current_line()
@@ -551,8 +838,9 @@ class FastInteractiveTerminal(QTextEdit):
             # Execute command
             self.execute_command(command)
         
-        # Add new line for next command
-        self.append("")
+        # Add new line for next command, or once the running one finishes
+        if not self.runner.is_running():
+            self.append("")
     
     def clear_line(self):
         cursor = self.textCursor()
@@ -608,35 +896,32 @@ class FastInteractiveTerminal(QTextEdit):
         self.run_command(command)
     
     def run_command(self, command: str):
-        try:
-            # Check if it's a file execution
-            if self.is_file_execution(command):
-                self.handle_file_execution(command)
-                return
-            
-            # Run external command
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd=self.current_dir,
-                timeout=10
-            )
-            
-            # Display output
-            if result.stdout:
-                self.append(result.stdout)
-            if result.stderr:
-                self.append(f"ERROR: {result.stderr}")
-            
-            if result.returncode != 0:
-                self.append(f"[Exit code: {result.returncode}]")
+        # Check if it's a file execution
+        if self.is_file_execution(command):
+            self.handle_file_execution(command)
+            return
         
-        except subprocess.TimeoutExpired:
+        # Run external command in the background
+        self.runner.run(command, self.current_dir, timeout=10)
+    
+    def insert_output(self, text):
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        self.setTextCursor(cursor)
+    
+    def insert_error(self, text):
+        if not self.error_started:
+            self.error_started = True
+            text = f"ERROR: {text}"
+        self.insert_output(text)
+    
+    def on_command_finished(self, exit_code, timed_out):
+        self.error_started = False
+        if timed_out:
             self.append("Command timed out")
-        except Exception as e:
-            self.append(f"Error: {str(e)}")
+        elif exit_code != 0:
+            self.append(f"[Exit code: {exit_code}]")
     
     def is_file_execution(self, command: str) -> bool:
         """Check if command is for executing a file"""
@@ -653,24 +938,8 @@ class FastInteractiveTerminal(QTextEdit):
     
     def handle_file_execution(self, command: str):
         """Handle execution of code files"""
-        try:
-            # Simple execution - just run it
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd=self.current_dir,
-                timeout=15
-            )
-            
-            if result.stdout:
-                self.append(result.stdout)
-            if result.stderr:
-                self.append(f"ERROR: {result.stderr}")
-            
-        except Exception as e:
-            self.append(f"Execution error: {str(e)}")
+        # Simple execution - just run it, with more time than plain commands
+        self.runner.run(command, self.current_dir, timeout=15)
     
     def handle_cd(self, command: str):
         path = command[3:].strip()
@@ -749,9 +1018,9 @@ class GamerFileExplorer(QTreeView):
         self.model = QFileSystemModel()
         self.model.setRootPath("")
         
-        # Set custom icons
-        icon_provider = GamerIconProvider()
-        self.model.setIconProvider(icon_provider)
+        # Set custom icons, kept on the explorer so cache stats stay reachable
+        self.icon_provider = GamerIconProvider()
+        self.model.setIconProvider(self.icon_provider)
         
         self.setModel(self.model)
         
@@ -795,46 +1064,74 @@ class GamerFileExplorer(QTreeView):
 # ==================== GAMER ICON PROVIDER ====================
 
 class GamerIconProvider(QFileIconProvider):
+    """Gamer-style file icons, each distinct icon rendered once and cached"""
+    
     def __init__(self):
         super().__init__()
+        # (kind, color, label, device pixel ratio) -> QIcon
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
         
     def icon(self, info):
-        # Override icons with gamer-style text/icons
+        # Qt also asks for icons by IconType (drives, network), leave those to the default
+        if not isinstance(info, QFileInfo):
+            return super().icon(info)
+        
         if info.isDir():
-            # Folder icon
-            pixmap = QPixmap(16, 16)
-            pixmap.fill(Qt.GlobalColor.transparent)
-            painter = QPainter(pixmap)
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            
+            key = ('dir', HACKER_GAMER_THEME['neon_blue'], '')
+        elif info.isFile():
+            key = ('file',) + self.file_style(info.suffix().lower())
+        else:
+            return super().icon(info)
+        key += (QApplication.instance().devicePixelRatio(),)
+        
+        icon = self.cache.get(key)
+        if icon is None:
+            self.misses += 1
+            icon = self.render(*key)
+            self.cache[key] = icon
+        else:
+            self.hits += 1
+        return icon
+    
+    def file_style(self, ext):
+        """Outline color and label for an extension"""
+        # File type colors
+        if ext in ['py', 'js', 'java', 'cpp', 'c', 'php', 'html', 'css']:
+            color = HACKER_GAMER_THEME['neon_green']
+        elif ext in ['exe', 'bin', 'sh', 'bat']:
+            color = HACKER_GAMER_THEME['neon_yellow']
+        elif ext in ['txt', 'md', 'json', 'xml', 'yml']:
+            color = HACKER_GAMER_THEME['neon_cyan']
+        else:
+            color = HACKER_GAMER_THEME['text_secondary']
+        
+        # Extension indicator
+        if ext in ['py']:
+            label = "PY"
+        elif ext in ['js']:
+            label = "JS"
+        elif ext in ['html', 'css']:
+            label = "WEB"
+        else:
+            label = ""
+        return color, label
+    
+    def render(self, kind, color, label, ratio):
+        pixmap = QPixmap(round(16 * ratio), round(16 * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        
+        if kind == 'dir':
             # Draw folder icon
-            painter.setPen(QPen(QColor(HACKER_GAMER_THEME['neon_blue']), 2))
+            painter.setPen(QPen(QColor(color), 2))
             painter.setBrush(QColor(HACKER_GAMER_THEME['bg_dark']))
             painter.drawRect(2, 4, 12, 10)
             painter.drawRect(0, 2, 16, 12)
-            
-            painter.end()
-            return QIcon(pixmap)
-        
-        elif info.isFile():
-            ext = info.suffix().lower()
-            
-            # File type colors
-            if ext in ['py', 'js', 'java', 'cpp', 'c', 'php', 'html', 'css']:
-                color = HACKER_GAMER_THEME['neon_green']
-            elif ext in ['exe', 'bin', 'sh', 'bat']:
-                color = HACKER_GAMER_THEME['neon_yellow']
-            elif ext in ['txt', 'md', 'json', 'xml', 'yml']:
-                color = HACKER_GAMER_THEME['neon_cyan']
-            else:
-                color = HACKER_GAMER_THEME['text_secondary']
-            
-            # Create file icon
-            pixmap = QPixmap(16, 16)
-            pixmap.fill(Qt.GlobalColor.transparent)
-            painter = QPainter(pixmap)
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            
+        else:
             # Draw file icon
             painter.setPen(QPen(QColor(color), 2))
             painter.setBrush(QColor(HACKER_GAMER_THEME['bg_dark']))
@@ -842,21 +1139,20 @@ class GamerIconProvider(QFileIconProvider):
             painter.drawLine(10, 2, 10, 4)
             painter.drawLine(12, 2, 12, 4)
             
-            # Add extension indicator
-            if ext in ['py']:
-                painter.setPen(QPen(QColor(HACKER_GAMER_THEME['neon_green']), 1))
-                painter.drawText(4, 12, "PY")
-            elif ext in ['js']:
-                painter.setPen(QPen(QColor(HACKER_GAMER_THEME['neon_yellow']), 1))
-                painter.drawText(4, 12, "JS")
-            elif ext in ['html', 'css']:
-                painter.setPen(QPen(QColor(HACKER_GAMER_THEME['neon_red']), 1))
-                painter.drawText(4, 12, "WEB")
-            
-            painter.end()
-            return QIcon(pixmap)
+            if label:
+                label_colors = {"PY": 'neon_green', "JS": 'neon_yellow', "WEB": 'neon_red'}
+                painter.setPen(QPen(QColor(HACKER_GAMER_THEME[label_colors[label]]), 1))
+                painter.drawText(4, 12, label)
         
-        return super().icon(info)
+        painter.end()
+        return QIcon(pixmap)
+    
+    def cache_stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'icons': len(self.cache)}
+    
+    def clear_cache(self):
+        """Drop rendered icons, e.g. after a theme change"""
+        self.cache.clear()
 
 # ==================== MAIN WINDOW ====================
 
@@ -1389,6 +1685,18 @@ class HackerGamerEditor(QMainWindow):
         if file_path:
             self.open_file(file_path)
     
+    def open_paths(self, paths):
+        """Open files given on the command line or handed over by a second launch"""
+        if not paths:
+            return
+        for path in paths:
+            if os.path.isfile(path):
+                self.open_file(path)
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+    
     def open_file(self, file_path: str):
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -1865,15 +2173,183 @@ class HackerGamerEditor(QMainWindow):
         # Quick close - no prompts for speed
         event.accept()
 
+# ==================== SINGLE INSTANCE ====================
+
+# Every launch of this edition by the same user meets on this local socket
+INSTANCE_SERVER_NAME = "lrd-{}-{}".format(
+    os.path.splitext(os.path.basename(__file__))[0],
+    os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', ''))
+INSTANCE_TIMEOUT_MS = 250
+
+class SingleInstance(QObject):
+    """Local socket server that lets a second launch hand its files to the running editor"""
+    
+    files_received = pyqtSignal(list)
+    
+    def __init__(self):
+        super().__init__()
+        self.server = None
+    
+    def forward(self, paths):
+        """Send paths to the running instance, returns False when nobody is listening"""
+        client = QLocalSocket()
+        client.connectToServer(INSTANCE_SERVER_NAME)
+        if not client.waitForConnected(INSTANCE_TIMEOUT_MS):
+            return False
+        client.write(json.dumps(paths).encode('utf-8'))
+        client.waitForBytesWritten(INSTANCE_TIMEOUT_MS)
+        client.disconnectFromServer()
+        return True
+    
+    def listen(self):
+        self.server = QLocalServer(self)
+        if not self.server.listen(INSTANCE_SERVER_NAME):
+            if self.forward([]):
+                # Another instance owns the name, this one just runs on its own
+                self.server = None
+                return False
+            # A crashed instance left its socket behind
+            QLocalServer.removeServer(INSTANCE_SERVER_NAME)
+            if not self.server.listen(INSTANCE_SERVER_NAME):
+                self.server = None
+                return False
+        self.server.newConnection.connect(self.accept)
+        return True
+    
+    def accept(self):
+        while self.server.hasPendingConnections():
+            client = self.server.nextPendingConnection()
+            data = bytearray()
+            client.readyRead.connect(lambda client=client, data=data: data.extend(client.readAll().data()))
+            client.disconnected.connect(lambda client=client, data=data: self.receive(client, data))
+    
+    def receive(self, client, data):
+        data.extend(client.readAll().data())
+        client.deleteLater()
+        try:
+            paths = json.loads(data.decode('utf-8'))
+        except:
+            return
+        if paths:
+            self.files_received.emit(paths)
+
+# ==================== STARTUP PROFILER ====================
+
+class StartupProfiler(QObject):
+    """Times startup phases for --profile-startup[=DIR] and writes a JSON report plus a Chrome trace"""
+    
+    def __init__(self, argv):
+        super().__init__()
+        self.output_dir = None
+        for arg in argv[1:]:
+            if arg == '--profile-startup' or arg.startswith('--profile-startup='):
+                self.output_dir = arg.partition('=')[2] or os.getcwd()
+        self.phases = []
+        self.depth = 0
+        self.paint_phase = None
+        if self.output_dir:
+            self.phases.append(['imports', IMPORT_STARTED, time.perf_counter(), 0])
+    
+    def begin(self, name):
+        if not self.output_dir:
+            return None
+        self.phases.append([name, time.perf_counter(), None, self.depth])
+        self.depth += 1
+        return len(self.phases) - 1
+    
+    def end(self, phase):
+        if phase is not None:
+            self.depth -= 1
+            self.phases[phase][2] = time.perf_counter()
+    
+    def wrap(self, cls, *names):
+        """Time every call of the named methods as a phase of its own"""
+        if not self.output_dir:
+            return
+        for name in names:
+            setattr(cls, name, self.timed(name, getattr(cls, name)))
+    
+    def timed(self, name, method):
+        def wrapper(*args, **kwargs):
+            phase = self.begin(name)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.end(phase)
+        return wrapper
+    
+    def watch_first_paint(self, window):
+        """Close the profile once the window has painted for the first time"""
+        if not self.output_dir:
+            return
+        self.paint_phase = self.begin('first paint')
+        window.installEventFilter(self)
+    
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            # Let the paint finish before taking the time
+            QTimer.singleShot(0, self.finish)
+        return False
+    
+    def finish(self):
+        self.end(self.paint_phase)
+        self.write_report()
+        # exit() rather than quit(): quit() closes the window and can stop on the unsaved-changes prompt
+        QApplication.exit(0)
+    
+    def write_report(self):
+        edition = os.path.splitext(os.path.basename(__file__))[0]
+        origin = self.phases[0][1]
+        report = {
+            'edition': edition,
+            'python': sys.version.split()[0],
+            'qt': QT_VERSION_STR,
+            'platform': sys.platform,
+            'total_ms': round((max(end for _, _, end, _ in self.phases) - origin) * 1000, 3),
+            'phases': [{'name': name, 'depth': depth,
+                        'start_ms': round((start - origin) * 1000, 3),
+                        'duration_ms': round((end - start) * 1000, 3)}
+                       for name, start, end, depth in self.phases],
+        }
+        trace = {
+            'traceEvents': [{'name': name, 'cat': 'startup', 'ph': 'X', 'pid': os.getpid(), 'tid': 1,
+                             'ts': round((start - origin) * 1e6), 'dur': round((end - start) * 1e6)}
+                            for name, start, end, depth in self.phases],
+            'displayTimeUnit': 'ms',
+        }
+        
+        base = os.path.join(self.output_dir, f"{edition}_startup")
+        for path, data in ((base + '.json', report), (base + '.trace.json', trace)):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+        
+        for phase in report['phases']:
+            print(f"{'  ' * phase['depth']}{phase['name']:<{24 - 2 * phase['depth']}} {phase['duration_ms']:9.1f} ms")
+        print(f"{'total':<24} {report['total_ms']:9.1f} ms")
+        print(f"Startup profile written to {base}.json and {base}.trace.json")
+
 # ==================== FAST APPLICATION ====================
 
 def main():
+    profiler = StartupProfiler(sys.argv)
+    profiler.wrap(HackerGamerEditor, 'setup_ui', 'setup_menu', 'create_terminal')
+    profiler.wrap(FastInteractiveTerminal, 'detect_compilers')
+    
+    # Hand files to an already running editor instead of starting another one
+    instance = SingleInstance()
+    files = [os.path.abspath(arg) for arg in sys.argv[1:] if not arg.startswith('-') and os.path.isfile(arg)]
+    if files and instance.forward(files):
+        sys.exit(0)
+    
     # Disable High DPI scaling for speed
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.Round
     )
     
+    phase = profiler.begin('QApplication')
     app = QApplication(sys.argv)
+    profiler.end(phase)
     app.setStyle("Fusion")  # Fast and clean
     
     # Set app info
@@ -1881,9 +2357,16 @@ def main():
     app.setOrganizationName("LRD-TECH")
     
     # Create and show window
+    phase = profiler.begin('window')
     window = HackerGamerEditor()
+    profiler.end(phase)
+    profiler.watch_first_paint(window)
     window.show()
     
+    instance.files_received.connect(window.open_paths)
+    instance.listen()
+    window.open_paths(files)
+    
     # Start app
     sys.exit(app.exec())
 
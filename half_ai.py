@@ -1,20 +1,41 @@
 # lrd_code_editor_ultimate_optimized_fixed_enhanced.py
 import sys
 import os
+import signal
 import subprocess
 import re
+import fnmatch
+import io
+import time
+import codecs
+import queue
+import threading
+import multiprocessing
+import multiprocessing.forkserver
 import webbrowser
 import shutil
 import traceback
 import json
+import hashlib
+import heapq
+import pickle
+import uuid
+import stat
 import sqlite3
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque, Counter
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from typing import List, Dict, Optional
 
+# Start of the Qt imports, which are most of the import time; for --profile-startup
+IMPORT_STARTED = time.perf_counter()
+
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
 
 # ==================== MODERN GAMER THEME CONSTANTS ====================
 
@@ -397,6 +418,27 @@ MODERN_GAMER_STYLESHEET = f"""
 
 # ==================== THREAD POOL FOR ASYNC OPERATIONS ====================
 
+# Streamed command output reaches the GUI in batches at most this often and
+# this large; a chattier process is held back by its pipe instead
+STREAM_INTERVAL = 0.033
+STREAM_MAX_CHARS = 64 * 1024
+STREAM_READ_SIZE = 8192
+STREAM_QUEUE_SIZE = 16
+STREAM_ENCODING = 'utf-8'
+
+# Each command gets its own process group so stopping it also stops whatever
+# it started; a polite stop is turned into a kill after the grace period
+COMMAND_TIMEOUT = 60
+# Per-task timeouts: programs and typed commands run until the user stops them,
+# database queries are cut off quickly
+RUN_TIMEOUT = None
+QUERY_TIMEOUT = 30
+STOP_GRACE_PERIOD = 3.0
+if os.name == 'nt':
+    PROCESS_GROUP_OPTIONS = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    PROCESS_GROUP_OPTIONS = {'start_new_session': True}
+
 class ThreadManager(QObject):
     """Manages threads for non-blocking operations"""
     output_signal = pyqtSignal(str)
@@ -407,73 +449,217 @@ class ThreadManager(QObject):
         super().__init__()
         self.thread_pool = ThreadPoolExecutor(max_workers=4)
         self.running_tasks = {}
+        self.processes = {}
+        self.lock = threading.Lock()
         self.task_counter = 0
     
-    def run_command(self, command, cwd=None, task_name="Command"):
-        """Run a command in a separate thread"""
+    def run_command(self, command, cwd=None, task_name="Command", timeout=COMMAND_TIMEOUT):
+        """Run a command in a separate thread, streaming its output as it arrives"""
         task_id = self.task_counter
         self.task_counter += 1
         
         def worker():
             try:
-                # For Python specifically, ensure UTF-8 encoding
-                if command.strip().startswith('python'):
-                    env = os.environ.copy()
-                    env['PYTHONIOENCODING'] = 'utf-8'
-                    result = subprocess.run(
+                with self.lock:
+                    # Stopped while it was still waiting for a thread
+                    if task_id not in self.running_tasks:
+                        return
+                    # For Python specifically, ensure UTF-8 encoding
+                    env = None
+                    if command.strip().startswith('python'):
+                        env = os.environ.copy()
+                        env['PYTHONIOENCODING'] = 'utf-8'
+                    process = subprocess.Popen(
                         command,
                         shell=True,
-                        capture_output=True,
-                        text=True,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
                         cwd=cwd,
-                        timeout=60,
                         env=env,
-                        encoding='utf-8',
-                        errors='replace'
-                    )
-                else:
-                    result = subprocess.run(
-                        command,
-                        shell=True,
-                        capture_output=True,
-                        text=True,
-                        cwd=cwd,
-                        timeout=60,
-                        encoding='utf-8',
-                        errors='replace'
+                        **PROCESS_GROUP_OPTIONS
                     )
+                    self.processes[task_id] = task = {
+                        'process': process,
+                        'command': command,
+                        'started': time.monotonic(),
+                        'deadline': time.monotonic() + timeout if timeout else float('inf'),
+                        'kill_at': float('inf'),
+                        'killed': False,
+                        'outcome': 'completed',
+                    }
                 
-                if result.stdout:
-                    self.output_signal.emit(result.stdout)
-                if result.stderr:
-                    self.error_signal.emit(result.stderr)
-                
-                self.finished_signal.emit(f"{task_name} completed")
+                outcome = self.stream_process(task)
+                if outcome == 'completed':
+                    self.finished_signal.emit(f"{task_name} completed")
+                elif outcome == 'timed out':
+                    self.error_signal.emit(f"{task_name} timed out after {timeout} seconds")
+                else:
+                    self.error_signal.emit(f"{task_name} stopped")
                 
-            except subprocess.TimeoutExpired:
-                self.error_signal.emit(f"{task_name} timed out after 60 seconds")
             except Exception as e:
                 error_msg = f"Error in {task_name}: {str(e)}\n{traceback.format_exc()}"
                 self.error_signal.emit(error_msg)
             finally:
-                if task_id in self.running_tasks:
-                    del self.running_tasks[task_id]
+                with self.lock:
+                    self.processes.pop(task_id, None)
+                    self.running_tasks.pop(task_id, None)
         
         # Run in thread pool
-        future = self.thread_pool.submit(worker)
-        self.running_tasks[task_id] = future
+        with self.lock:
+            future = self.thread_pool.submit(worker)
+            self.running_tasks[task_id] = future
         
         return task_id
     
-    def stop_all(self):
-        """Stop all running tasks"""
-        for task_id, future in list(self.running_tasks.items()):
-            try:
+    def stream_process(self, task):
+        """Emit the output of a running task in batches until it ends; returns its outcome"""
+        process = task['process']
+        chunks = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        stopped = threading.Event()
+        for channel, pipe in (('output', process.stdout), ('error', process.stderr)):
+            threading.Thread(target=self.read_pipe, args=(pipe, channel, chunks, stopped), daemon=True).start()
+        
+        buffered = {'output': [], 'error': []}
+        size = 0
+        open_pipes = 2
+        next_flush = time.monotonic() + STREAM_INTERVAL
+        try:
+            # Once killed, stop waiting for pipes held open by anything that
+            # escaped the process group
+            while (open_pipes and not task['killed']) or process.poll() is None:
+                now = time.monotonic()
+                if now >= task['deadline']:
+                    task['deadline'] = float('inf')
+                    task['outcome'] = 'timed out'
+                    self.signal_task(task, force=False)
+                if now >= task['kill_at']:
+                    self.signal_task(task, force=True)
+                if now >= next_flush:
+                    self.flush_output(buffered)
+                    size = 0
+                    next_flush = now + STREAM_INTERVAL
+                    continue
+                if size >= STREAM_MAX_CHARS:
+                    # The batch is full: leave the rest in the pipe until the
+                    # next one is due, which slows the process down instead
+                    time.sleep(next_flush - now)
+                    continue
+                try:
+                    wake = min(next_flush, task['deadline'], task['kill_at'])
+                    channel, text = chunks.get(timeout=max(0, wake - now))
+                except queue.Empty:
+                    continue
+                if text is None:
+                    open_pipes -= 1
+                elif text:
+                    buffered[channel].append(text)
+                    size += len(text)
+            
+            self.flush_output(buffered)
+        finally:
+            stopped.set()
+        return task['outcome']
+    
+    def signal_task(self, task, force, grace=STOP_GRACE_PERIOD):
+        """Stop a task's whole process group, forcing it if it is still there after the grace period"""
+        process = task['process']
+        try:
+            if os.name == 'nt':
+                if force:
+                    subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                else:
+                    process.send_signal(signal.CTRL_BREAK_EVENT)
+            else:
+                os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+        except OSError:
+            pass  # Already gone
+        
+        if force:
+            task['killed'] = True
+            task['kill_at'] = float('inf')
+        else:
+            task['kill_at'] = min(task['kill_at'], time.monotonic() + grace)
+    
+    def stop_task(self, task_id, force, grace=STOP_GRACE_PERIOD):
+        with self.lock:
+            future = self.running_tasks.get(task_id)
+            task = self.processes.get(task_id)
+            if future is None:
+                return False
+            if task is None:
+                # Not started yet, so there is nothing to signal
                 future.cancel()
-            except:
-                pass
-            if task_id in self.running_tasks:
                 del self.running_tasks[task_id]
+                return True
+            if task['outcome'] == 'completed':
+                task['outcome'] = 'stopped'
+        self.signal_task(task, force, grace)
+        return True
+    
+    def terminate(self, task_id, grace=STOP_GRACE_PERIOD):
+        """Ask a task to stop, killing it once the grace period is over"""
+        return self.stop_task(task_id, force=False, grace=grace)
+    
+    def kill(self, task_id):
+        """Kill a task and everything it started right away"""
+        return self.stop_task(task_id, force=True)
+    
+    def jobs(self):
+        """List (task id, command, seconds running) for every running command"""
+        now = time.monotonic()
+        with self.lock:
+            return [(task_id, task['command'], now - task['started'])
+                    for task_id, task in sorted(self.processes.items())]
+    
+    def read_pipe(self, pipe, channel, chunks, stopped):
+        """Reader thread: decode one pipe as data arrives and queue the text"""
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(STREAM_ENCODING)(errors='replace'), translate=True)
+        
+        def put(item):
+            # Wait for room, but give up once nobody is reading any more
+            while not stopped.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        try:
+            for data in iter(lambda: pipe.read1(STREAM_READ_SIZE), b''):
+                if not put((channel, decoder.decode(data))):
+                    return
+            put((channel, decoder.decode(b'', final=True)))
+            put((channel, None))
+        finally:
+            pipe.close()
+    
+    def flush_output(self, buffered):
+        if buffered['output']:
+            self.output_signal.emit(''.join(buffered['output']))
+            buffered['output'].clear()
+        if buffered['error']:
+            self.error_signal.emit(''.join(buffered['error']))
+            buffered['error'].clear()
+    
+    def stop_all(self):
+        """Stop all running tasks, killing their processes straight away"""
+        with self.lock:
+            for task_id, future in list(self.running_tasks.items()):
+                try:
+                    future.cancel()
+                except:
+                    pass
+                if task_id in self.running_tasks:
+                    del self.running_tasks[task_id]
+            tasks = list(self.processes.values())
+        
+        for task in tasks:
+            if task['outcome'] == 'completed':
+                task['outcome'] = 'stopped'
+            self.signal_task(task, force=True)
 
 # ==================== ADVANCED AUTOMATION ENGINE ====================
 
@@ -545,6 +731,33 @@ if __name__ == "__main__":
 
 # ==================== AI CODE COMPLETION ENGINE ====================
 
+# Suggestions offered per request
+COMPLETION_LIMIT = 10
+# Accepted suggestions remembered, ranked ahead of the document's frequent words
+COMPLETION_RECENT_WORDS = 64
+# Quiet period after an edit before a document's words are counted again
+COMPLETION_REFRESH_MS = 500
+# Identifiers collected from documents, and the one being typed before the cursor
+COMPLETION_WORD = re.compile(r'[^\W\d]\w*')
+COMPLETION_PREFIX = re.compile(r'\w+$')
+
+class CompletionIndex:
+    """Words kept sorted for prefix lookup by bisect, with how often each occurs"""
+    
+    def __init__(self, counts):
+        # Keys are "folded\0word", so one bisect finds a case-insensitive prefix
+        # and the counts can rank the range without splitting every key
+        self.counts = {word.lower() + '\0' + word: count for word, count in counts.items()}
+        self.keys = sorted(self.counts)
+    
+    def lookup(self, prefix, limit):
+        """The most frequent words starting with prefix, ignoring case"""
+        folded = prefix.lower()
+        first = bisect_left(self.keys, folded)
+        last = bisect_left(self.keys, folded + '\U0010ffff', first)
+        best = heapq.nlargest(limit, self.keys[first:last], key=self.counts.__getitem__)
+        return [key.split('\0', 1)[1] for key in best]
+
 class AICodeCompletion(QObject):
     """AI-powered code completion engine"""
     suggestion_ready = pyqtSignal(str, list)
@@ -552,8 +765,20 @@ class AICodeCompletion(QObject):
     def __init__(self):
         super().__init__()
         self.keywords_cache = {}
+        self.keyword_indexes = {}
         self.load_keywords()
         
+        # id(document) -> {'document', 'revision', 'index', 'running'}; words are counted
+        # on a thread after edits settle, so a request only ever does a bisect
+        self.documents = {}
+        self.pending = {}
+        # language -> accepted suggestions, oldest first
+        self.recent = {}
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(COMPLETION_REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh_documents)
+        
     def load_keywords(self):
         """Load programming language keywords for suggestions"""
         self.keywords_cache = {
@@ -575,60 +800,87 @@ class AICodeCompletion(QObject):
                 'ORDER BY', 'HAVING', 'LIMIT', 'OFFSET'
             ]
         }
+        self.keyword_indexes = {language: CompletionIndex(dict.fromkeys(keywords, 0))
+                                for language, keywords in self.keywords_cache.items()}
     
-    def get_suggestions(self, text: str, language: str, cursor_pos: int) -> list:
-        """Get code suggestions based on context"""
-        suggestions = []
-        
-        # Get current line and word
-        lines = text[:cursor_pos].split('\n')
-        current_line = lines[-1] if lines else ""
-        current_word = self.get_current_word(current_line)
-        
+    def get_suggestions(self, line: str, column: int, language: str, document=None) -> list:
+        """Suggestions for the word before column in line: recently accepted, then frequent in the document, then keywords"""
+        current_word = self.get_current_word(line, column)
         if not current_word:
-            return suggestions
-        
-        # Filter keywords based on current word
-        keywords = self.keywords_cache.get(language, [])
-        for keyword in keywords:
-            if keyword.lower().startswith(current_word.lower()):
-                suggestions.append(keyword)
+            return []
         
-        # Add common completions
-        if language == 'python':
-            suggestions.extend(self.get_python_completions(current_word))
-        elif language == 'sql':
-            suggestions.extend(self.get_sql_completions(current_word))
-        
-        return suggestions[:10]  # Limit to 10 suggestions
-    
-    def get_current_word(self, line: str) -> str:
-        """Extract current word being typed"""
-        # Find the last word fragment
-        words = re.findall(r'[\w]+', line)
-        return words[-1] if words else ""
-    
-    def get_python_completions(self, word: str) -> list:
-        """Python-specific completions"""
-        completions = []
-        if word.startswith('pr'):
-            completions.append('print')
-        elif word.startswith('im'):
-            completions.append('import')
-        elif word.startswith('de'):
-            completions.append('def')
-        return completions
-    
-    def get_sql_completions(self, word: str) -> list:
-        """SQL-specific completions"""
-        completions = []
-        if word.upper().startswith('SEL'):
-            completions.append('SELECT')
-        elif word.upper().startswith('FRO'):
-            completions.append('FROM')
-        elif word.upper().startswith('WHE'):
-            completions.append('WHERE')
-        return completions
+        folded = current_word.lower()
+        suggestions = [word for word in reversed(self.recent.get(language, ()))
+                       if word.lower().startswith(folded) and word != current_word]
+        
+        sources = []
+        entry = self.documents.get(id(document)) if document is not None else None
+        if entry and entry['index']:
+            sources.append(entry['index'])
+        if language in self.keyword_indexes:
+            sources.append(self.keyword_indexes[language])
+        for index in sources:
+            # One extra, as the word being typed is in the document too
+            for word in index.lookup(current_word, COMPLETION_LIMIT + 1):
+                if word != current_word and word not in suggestions:
+                    suggestions.append(word)
+        
+        if document is not None and id(document) not in self.pending and (
+                entry is None or entry['revision'] != document.revision()):
+            self.schedule_refresh(document)
+        
+        return suggestions[:COMPLETION_LIMIT]
+    
+    def get_current_word(self, line: str, column: int) -> str:
+        """Extract the word fragment right before column"""
+        match = COMPLETION_PREFIX.search(line, 0, column)
+        return match.group() if match else ""
+    
+    def note_used(self, word: str, language: str):
+        """Rank an accepted suggestion first next time"""
+        recent = self.recent.setdefault(language, deque(maxlen=COMPLETION_RECENT_WORDS))
+        if word in recent:
+            recent.remove(word)
+        recent.append(word)
+    
+    def note_edited(self, document):
+        """Keep counting the words of documents completion has been used in"""
+        if id(document) in self.documents:
+            self.schedule_refresh(document)
+    
+    def schedule_refresh(self, document):
+        key = id(document)
+        if key not in self.documents:
+            # Holding the wrapper keeps id(document) the same for the document's lifetime
+            self.documents[key] = {'document': document, 'revision': None, 'index': None, 'running': False}
+            document.destroyed.connect(lambda: self.forget_document(key))
+        self.pending[key] = document
+        self.refresh_timer.start()
+    
+    def forget_document(self, key):
+        self.documents.pop(key, None)
+        self.pending.pop(key, None)
+    
+    def refresh_documents(self):
+        """Count the words of documents edited since their last count"""
+        for key, document in list(self.pending.items()):
+            entry = self.documents[key]
+            if entry['running']:
+                # Checked again once the running count is done
+                continue
+            del self.pending[key]
+            revision = document.revision()
+            if revision == entry['revision']:
+                continue
+            entry['revision'] = revision
+            entry['running'] = True
+            threading.Thread(target=self.count_words, args=(entry, document.toPlainText()), daemon=True).start()
+        if self.pending:
+            self.refresh_timer.start()
+    
+    def count_words(self, entry, text):
+        entry['index'] = CompletionIndex(Counter(COMPLETION_WORD.findall(text)))
+        entry['running'] = False
 
 # ==================== ADVANCED DATABASE MANAGER ====================
 
@@ -703,37 +955,150 @@ class DatabaseManager:
 
 # ==================== ENHANCED SYNTAX HIGHLIGHTER ====================
 
+# Matches rules of the form \bkeyword\b so they can be served by a dict lookup
+KEYWORD_RULE = re.compile(r'\\b(\w+)\\b')
+
+# Block state of lines still waiting for the tokenizer worker
+PENDING_STATE = -2
+# Lines tokenized on the GUI thread per event-loop turn before the rest is
+# handed to the worker
+INLINE_TOKENIZE_LINES = 500
+TOKENIZE_CHUNK_LINES = 500
+TOKENIZE_DELAY_MS = 50
+TOKENIZE_SLICE_MS = 8
+TOKENIZE_YIELD_LINES = 32
+
+class TokenizerWorker(QObject):
+    """Tokenizes document snapshots off the GUI thread"""
+    chunk_ready = pyqtSignal(int, int, object)
+    job_finished = pyqtSignal(int, object)
+    
+    def __init__(self, highlighter):
+        super().__init__(highlighter)
+        self.tokenize = highlighter.tokenize
+        self.revision = 0
+        # A new job only makes this highlighter's running job obsolete, so
+        # each highlighter has its own thread; a long job in one tab never
+        # holds up another
+        self.thread_pool = ThreadPoolExecutor(max_workers=1)
+    
+    def submit(self, lines, cache):
+        """Start tokenizing a snapshot, dropping whatever job is still running"""
+        self.revision += 1
+        self.thread_pool.submit(self.run_job, self.revision, lines, cache)
+    
+    def cancel(self):
+        self.revision += 1
+    
+    def run_job(self, revision, lines, cache):
+        results = {}
+        items = []
+        first = 0
+        state = 0
+        for number, text in enumerate(lines):
+            if revision != self.revision:
+                return
+            if not number % TOKENIZE_YIELD_LINES:
+                # Hand the GIL back often; otherwise every Qt call on the GUI
+                # thread waits out a full interpreter switch interval
+                time.sleep(0)
+            key = (state, text)
+            result = results.get(key) or cache.get(key)
+            if result is None:
+                result = self.tokenize(text, state)
+            results[key] = result
+            items.append((key, result))
+            state = result[1]
+            if len(items) == TOKENIZE_CHUNK_LINES:
+                self.chunk_ready.emit(revision, first, items)
+                first = number + 1
+                items = []
+        if revision == self.revision:
+            self.chunk_ready.emit(revision, first, items)
+            self.job_finished.emit(revision, results)
+
 class LRDHighlighter(QSyntaxHighlighter):
-    def __init__(self, document, language='python'):
+    # Rule tables and formats never change once built, so every highlighter in
+    # the process shares one copy per (language, theme) instead of its own
+    rule_tables = {}
+    theme_formats = {}
+    
+    def __init__(self, document, language='python', theme=MODERN_GAMER_THEME):
         super().__init__(document)
         self.language = language
+        self.theme = theme
+        self.theme_key = tuple(sorted(theme.items()))
         self.rules = []
-        self.setup_rules()
+        self.load_rules()
+        # Spans per (incoming state, line text), filled by the worker
+        self.span_cache = {}
+        self.inline_budget = INLINE_TOKENIZE_LINES
+        self.tokenizing = False
+        self.token_chunks = []
+        self.applying_tokens = False
+        self.worker = TokenizerWorker(self)
+        self.worker.chunk_ready.connect(self.queue_tokens)
+        self.worker.job_finished.connect(self.finish_tokens)
+        self.tokenize_timer = QTimer(self)
+        self.tokenize_timer.setSingleShot(True)
+        self.tokenize_timer.setInterval(TOKENIZE_DELAY_MS)
+        self.tokenize_timer.timeout.connect(self.start_tokenize)
+        self.apply_timer = QTimer(self)
+        self.apply_timer.setSingleShot(True)
+        self.apply_timer.timeout.connect(self.apply_tokens)
+        document.contentsChange.connect(self.on_contents_change)
     
     def set_language(self, language):
         self.language = language
-        self.rules = []
-        self.setup_rules()
+        self.load_rules()
+        self.cancel_tokens()
+        self.tokenize_timer.stop()
+        self.span_cache = {}
         self.rehighlight()
     
+    def load_rules(self):
+        """Point this highlighter at the shared tables for its language and theme"""
+        key = (self.language, self.theme_key)
+        table = self.rule_tables.get(key)
+        if table is None:
+            self.rules = []
+            self.multiline = []
+            self.setup_rules()
+            self.compile_rules()
+            table = (self.multiline, self.keywords, self.token_formats,
+                     self.multiline_states, self.pattern)
+            self.rule_tables[key] = table
+            self.rules = []
+        (self.multiline, self.keywords, self.token_formats,
+         self.multiline_states, self.pattern) = table
+    
+    def load_formats(self):
+        """Return the shared formats for this highlighter's theme, creating them on first use"""
+        formats = self.theme_formats.get(self.theme_key)
+        if formats is None:
+            theme = self.theme
+            formats = {
+                'keyword': self.create_format(theme['syntax_keyword'], bold=True),
+                'builtin': self.create_format(theme['syntax_builtin']),
+                'string': self.create_format(theme['syntax_string']),
+                'comment': self.create_format(theme['syntax_comment'], italic=True),
+                'function': self.create_format(theme['syntax_function'], bold=True),
+                'class': self.create_format(theme['syntax_class'], bold=True),
+                'number': self.create_format(theme['syntax_number']),
+                'operator': self.create_format(theme['syntax_operator']),
+                'tag': self.create_format(theme['syntax_tag'], bold=True),
+                'attribute': self.create_format(theme['syntax_attribute']),
+                'variable': self.create_format(theme['syntax_variable']),
+                'import': self.create_format(theme['syntax_import']),
+                'sql_keyword': self.create_format('#ff4081', bold=True),
+                'sql_function': self.create_format('#ff6d40'),
+                'sql_type': self.create_format('#ff9800'),
+            }
+            self.theme_formats[self.theme_key] = formats
+        return formats
+    
     def setup_rules(self):
-        formats = {
-            'keyword': self.create_format(MODERN_GAMER_THEME['syntax_keyword'], bold=True),
-            'builtin': self.create_format(MODERN_GAMER_THEME['syntax_builtin']),
-            'string': self.create_format(MODERN_GAMER_THEME['syntax_string']),
-            'comment': self.create_format(MODERN_GAMER_THEME['syntax_comment'], italic=True),
-            'function': self.create_format(MODERN_GAMER_THEME['syntax_function'], bold=True),
-            'class': self.create_format(MODERN_GAMER_THEME['syntax_class'], bold=True),
-            'number': self.create_format(MODERN_GAMER_THEME['syntax_number']),
-            'operator': self.create_format(MODERN_GAMER_THEME['syntax_operator']),
-            'tag': self.create_format(MODERN_GAMER_THEME['syntax_tag'], bold=True),
-            'attribute': self.create_format(MODERN_GAMER_THEME['syntax_attribute']),
-            'variable': self.create_format(MODERN_GAMER_THEME['syntax_variable']),
-            'import': self.create_format(MODERN_GAMER_THEME['syntax_import']),
-            'sql_keyword': self.create_format('#ff4081', bold=True),
-            'sql_function': self.create_format('#ff6d40'),
-            'sql_type': self.create_format('#ff9800'),
-        }
+        formats = self.load_formats()
         
         # Python
         if self.language == 'python':
@@ -762,6 +1127,8 @@ class LRDHighlighter(QSyntaxHighlighter):
             self.rules.append((r'#.*', formats['comment']))
             self.rules.append((r'"[^"\\]*(\\.[^"\\]*)*"', formats['string']))
             self.rules.append((r"'[^'\\]*(\\.[^'\\]*)*'", formats['string']))
+            self.multiline.append(('"""', '"""', formats['string']))
+            self.multiline.append(("'''", "'''", formats['string']))
             self.rules.append((r'\b\d+\b', formats['number']))
             self.rules.append((r'\bimport\s+\w+', formats['import']))
             self.rules.append((r'\bfrom\s+\w+', formats['import']))
@@ -782,10 +1149,10 @@ class LRDHighlighter(QSyntaxHighlighter):
             self.rules.append((r'\bfunction\s+(\w+)', formats['function']))
             self.rules.append((r'\bclass\s+(\w+)', formats['class']))
             self.rules.append((r'//.*', formats['comment']))
-            self.rules.append((r'/\*[\s\S]*?\*/', formats['comment']))
+            self.multiline.append(('/*', '*/', formats['comment']))
             self.rules.append((r'"[^"]*"', formats['string']))
             self.rules.append((r"'[^']*'", formats['string']))
-            self.rules.append((r'`[^`]*`', formats['string']))
+            self.multiline.append(('`', '`', formats['string']))
             self.rules.append((r'\b\d+\b', formats['number']))
         
         # HTML
@@ -794,12 +1161,12 @@ class LRDHighlighter(QSyntaxHighlighter):
             self.rules.append((r'\b\w+\s*=', formats['attribute']))
             self.rules.append((r'"[^"]*"', formats['string']))
             self.rules.append((r"'[^']*'", formats['string']))
-            self.rules.append((r'<!--.*-->', formats['comment']))
+            self.multiline.append(('<!--', '-->', formats['comment']))
         
         # CSS
         elif self.language == 'css':
             self.rules.append((r'\b[\w-]+\s*:', formats['attribute']))
-            self.rules.append((r'/\*[\s\S]*?\*/', formats['comment']))
+            self.multiline.append(('/*', '*/', formats['comment']))
             self.rules.append((r'"[^"]*"', formats['string']))
             self.rules.append((r"'.*'", formats['string']))
             self.rules.append((r'\b\d+\b', formats['number']))
@@ -820,7 +1187,7 @@ class LRDHighlighter(QSyntaxHighlighter):
             self.rules.append((r'\bclass\s+(\w+)', formats['class']))
             self.rules.append((r'\binterface\s+(\w+)', formats['class']))
             self.rules.append((r'//.*', formats['comment']))
-            self.rules.append((r'/\*[\s\S]*?\*/', formats['comment']))
+            self.multiline.append(('/*', '*/', formats['comment']))
             self.rules.append((r'"[^"]*"', formats['string']))
             self.rules.append((r"'.'", formats['string']))
             self.rules.append((r'\b\d+\b', formats['number']))
@@ -844,7 +1211,7 @@ class LRDHighlighter(QSyntaxHighlighter):
             self.rules.append((r'\bclass\s+(\w+)', formats['class']))
             self.rules.append((r'//.*', formats['comment']))
             self.rules.append((r'#.*', formats['comment']))
-            self.rules.append((r'/\*[\s\S]*?\*/', formats['comment']))
+            self.multiline.append(('/*', '*/', formats['comment']))
             self.rules.append((r'"[^"]*"', formats['string']))
             self.rules.append((r"'[^']*'", formats['string']))
             self.rules.append((r'\$\w+', formats['variable']))
@@ -867,7 +1234,7 @@ class LRDHighlighter(QSyntaxHighlighter):
             self.rules.append((r'\bclass\s+(\w+)', formats['class']))
             self.rules.append((r'\bstruct\s+(\w+)', formats['class']))
             self.rules.append((r'//.*', formats['comment']))
-            self.rules.append((r'/\*[\s\S]*?\*/', formats['comment']))
+            self.multiline.append(('/*', '*/', formats['comment']))
             self.rules.append((r'"[^"]*"', formats['string']))
             self.rules.append((r"'.'", formats['string']))
             self.rules.append((r'\b\d+\b', formats['number']))
@@ -917,7 +1284,7 @@ class LRDHighlighter(QSyntaxHighlighter):
                 self.rules.append((r'\b' + func + r'\b', formats['sql_function']))
             
             self.rules.append((r'--.*', formats['comment']))
-            self.rules.append((r'/\*[\s\S]*?\*/', formats['comment']))
+            self.multiline.append(('/*', '*/', formats['comment']))
             self.rules.append((r'"[^"]*"', formats['string']))
             self.rules.append((r"'[^']*'", formats['string']))
             self.rules.append((r'\b\d+\b', formats['number']))
@@ -926,6 +1293,33 @@ class LRDHighlighter(QSyntaxHighlighter):
         elif self.language == 'text':
             pass
     
+    def compile_rules(self):
+        """Fold the rules into one regex so each block is scanned only once"""
+        self.keywords = {}
+        self.token_formats = {}
+        self.multiline_states = {}
+        alternatives = []
+        # Openers of spans that may continue on the next block go first; the
+        # block state records which one is still open (index + 1)
+        for index, (begin, _, _) in enumerate(self.multiline):
+            name = f'm{index}'
+            self.multiline_states[name] = index + 1
+            alternatives.append(f'(?P<{name}>{re.escape(begin)})')
+        # Walk backwards: later rules used to paint over earlier ones, so they
+        # must come first in the alternation to keep winning
+        for index in range(len(self.rules) - 1, -1, -1):
+            pattern, fmt = self.rules[index]
+            keyword = KEYWORD_RULE.fullmatch(pattern)
+            if keyword:
+                self.keywords.setdefault(keyword.group(1).lower(), fmt)
+                continue
+            name = f'r{index}'
+            self.token_formats[name] = fmt
+            alternatives.append(f'(?P<{name}>{pattern})')
+        if self.keywords:
+            alternatives.append(r'(?P<word>\w+)')
+        self.pattern = re.compile('|'.join(alternatives), re.IGNORECASE) if alternatives else None
+    
     def create_format(self, color, bold=False, italic=False):
         fmt = QTextCharFormat()
         fmt.setForeground(QColor(color))
@@ -937,26 +1331,187 @@ class LRDHighlighter(QSyntaxHighlighter):
         return fmt
     
     def highlightBlock(self, text):
-        for pattern, fmt in self.rules:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                start = match.start()
-                length = match.end() - start
-                self.setFormat(start, length, fmt)
+        # Qt only moves on to the next block when this state changes, so an
+        # edit costs the blocks whose incoming state differs, not the document.
+        # Lines missing from the cache are tokenized here only up to a small
+        # budget; past it they stay pending until the worker catches up
+        state = self.previousBlockState()
+        result = None
+        if state != PENDING_STATE:
+            key = (max(state, 0), text)
+            result = self.span_cache.get(key)
+            if result is None and self.inline_budget and not self.applying_tokens:
+                result = self.span_cache[key] = self.tokenize(text, key[0])
+                self.spend_inline_budget()
+        if result is None:
+            self.setCurrentBlockState(PENDING_STATE)
+            self.request_tokens()
+            return
+        spans, state = result
+        for start, length, fmt in spans:
+            self.setFormat(start, length, fmt)
+        self.setCurrentBlockState(state)
+    
+    def spend_inline_budget(self):
+        if self.inline_budget == INLINE_TOKENIZE_LINES:
+            QTimer.singleShot(0, self.reset_inline_budget)
+        self.inline_budget -= 1
+    
+    def reset_inline_budget(self):
+        self.inline_budget = INLINE_TOKENIZE_LINES
+    
+    def request_tokens(self):
+        if not self.tokenizing and not self.tokenize_timer.isActive():
+            self.tokenize_timer.start()
+    
+    def on_contents_change(self, position, removed, added):
+        if self.document() is None:
+            return
+        if self.tokenizing or self.tokenize_timer.isActive():
+            # The job would finish on an outdated snapshot; drop it and start
+            # over once typing pauses
+            self.cancel_tokens()
+            self.tokenize_timer.start()
+    
+    def start_tokenize(self):
+        document = self.document()
+        if document is None:
+            return
+        self.tokenizing = True
+        self.worker.submit(document.toRawText().split('\u2029'), self.span_cache)
+    
+    def cancel_tokens(self):
+        self.worker.cancel()
+        self.tokenizing = False
+        self.token_chunks = []
+    
+    def queue_tokens(self, revision, first, items):
+        # Chunks arrive faster than they can be painted, so they are applied
+        # in short slices to keep the event loop responsive
+        self.token_chunks.append((revision, first, items))
+        if not self.apply_timer.isActive():
+            self.apply_timer.start()
+    
+    def finish_tokens(self, revision, results):
+        self.queue_tokens(revision, None, results)
+    
+    def apply_tokens(self):
+        """Paint the pending blocks of the chunks the worker has finished"""
+        document = self.document()
+        clock = QElapsedTimer()
+        clock.start()
+        self.applying_tokens = True
+        while self.token_chunks and clock.elapsed() < TOKENIZE_SLICE_MS:
+            revision, first, items = self.token_chunks.pop(0)
+            if revision != self.worker.revision or document is None:
+                continue
+            if first is None:
+                # The job saw every line, so its results replace entries for
+                # lines that no longer exist
+                self.span_cache = items
+                self.tokenizing = False
+                continue
+            self.span_cache.update(items)
+            block = document.findBlockByNumber(first)
+            for _ in range(len(items)):
+                if not block.isValid():
+                    break
+                if block.userState() == PENDING_STATE:
+                    self.rehighlightBlock(block)
+                block = block.next()
+        self.applying_tokens = False
+        if self.token_chunks:
+            self.apply_timer.start()
+    
+    def tokenize(self, text, state):
+        """Split one block into (start, length, format) spans and return them with its end state"""
+        spans = []
+        pos = 0
+        if 0 < state <= len(self.multiline):
+            pos, state = self.close_multiline(text, 0, 0, state, spans)
+        else:
+            state = 0
+        if self.pattern is None:
+            return spans, state
+        keywords = self.keywords
+        token_formats = self.token_formats
+        multiline_states = self.multiline_states
+        while not state:
+            match = self.pattern.search(text, pos)
+            if match is None:
+                break
+            kind = match.lastgroup
+            start = match.start()
+            pos = match.end()
+            if kind in multiline_states:
+                pos, state = self.close_multiline(text, start, pos, multiline_states[kind], spans)
+                continue
+            if kind == 'word':
+                fmt = keywords.get(match.group().lower())
+                if fmt is None:
+                    continue
+            else:
+                fmt = token_formats[kind]
+            spans.append((start, pos - start, fmt))
+        return spans, state
+    
+    def close_multiline(self, text, start, pos, state, spans):
+        """Add the span opened at start; return where scanning resumes and the state left open"""
+        _, end, fmt = self.multiline[state - 1]
+        close = text.find(end, pos)
+        if close == -1:
+            spans.append((start, len(text) - start, fmt))
+            return len(text), state
+        close += len(end)
+        spans.append((start, close - start, fmt))
+        return close, 0
 
 # ==================== ADVANCED CODE EDITOR WITH AI ====================
 
+# Files bigger than this open in lazy highlighting mode
+LARGE_FILE_BYTES = 2 * 1024 * 1024
+# Blocks painted above/below the viewport, and the idle pass time slice (ms)
+LAZY_VIEWPORT_MARGIN = 50
+LAZY_SLICE_MS = 8
+# Documents longer than this (characters) index their find matches on a thread
+FIND_INLINE_INDEX_CHARS = 512 * 1024
+# How often a background match index is checked for completion
+FIND_POLL_MS = 50
+# Quiet period after typing a query or editing before matches are indexed again
+FIND_TYPE_DELAY_MS = 150
+
 class LRDCustomEditor(QPlainTextEdit):
     text_modified = pyqtSignal()
     cursor_moved = pyqtSignal(int, int)
+    matches_counted = pyqtSignal(int)
     
     def __init__(self):
         super().__init__()
         self.line_number_area = LineNumberArea(self)
         self.highlighter = LRDHighlighter(self.document())
+        self.lazy_highlighting = False
         self.completion_active = False
         self.suggestion_list = []
         self.current_suggestion = 0
         
+        # Find highlights: match start/end positions for the whole document,
+        # but selections only for the matches on screen
+        self.find_regex = None
+        self.find_starts = array('q')
+        self.find_ends = array('q')
+        self.find_ready = False
+        self.find_revision = None
+        self.find_pass = None
+        self.find_selections = []
+        self.find_view = None
+        self.find_timer = QTimer(self)
+        self.find_timer.setSingleShot(True)
+        self.find_timer.setInterval(FIND_TYPE_DELAY_MS)
+        self.find_timer.timeout.connect(self.index_matches)
+        self.find_poll_timer = QTimer(self)
+        self.find_poll_timer.setInterval(FIND_POLL_MS)
+        self.find_poll_timer.timeout.connect(self.poll_matches)
+        
         # Setup editor
         self.setup_editor()
         self.setup_signals()
@@ -995,6 +1550,8 @@ class LRDCustomEditor(QPlainTextEdit):
         self.cursorPositionChanged.connect(self.highlight_current_line)
         self.cursorPositionChanged.connect(self.emit_cursor_position)
         self.textChanged.connect(self.emit_text_modified)
+        self.textChanged.connect(self.on_find_text_changed)
+        self.verticalScrollBar().valueChanged.connect(self.update_find_selections)
     
     def emit_cursor_position(self):
         cursor = self.textCursor()
@@ -1028,6 +1585,7 @@ class LRDCustomEditor(QPlainTextEdit):
         cr = self.contentsRect()
         width = self.line_number_area_width()
         self.line_number_area.setGeometry(QRect(cr.left(), cr.top(), width, cr.height()))
+        self.update_find_selections()
     
     def line_number_area_paint_event(self, event):
         painter = QPainter(self.line_number_area)
@@ -1063,7 +1621,280 @@ class LRDCustomEditor(QPlainTextEdit):
             selection.cursor = self.textCursor()
             selection.cursor.clearSelection()
             extra_selections.append(selection)
-        self.setExtraSelections(extra_selections)
+        self.setExtraSelections(extra_selections + self.find_selections)
+    
+    # ---- Find highlights ----
+    
+    def set_find_regex(self, regex):
+        """Highlight every match of regex, or none when it is None"""
+        self.find_regex = regex
+        if regex is None:
+            self.find_timer.stop()
+            self.index_matches()
+        else:
+            self.schedule_match_index()
+    
+    def on_find_text_changed(self):
+        # Syntax painting marks the document dirty too, but only edits bump the revision
+        if self.find_regex is not None and self.document().revision() != self.find_revision:
+            self.schedule_match_index()
+    
+    def schedule_match_index(self):
+        if self.find_regex is not None:
+            # Positions are stale until the index is rebuilt; the screen is searched directly meanwhile
+            self.find_revision = self.document().revision()
+            self.cancel_match_pass()
+            self.find_ready = False
+            self.find_view = None
+            self.update_find_selections()
+            self.find_timer.start()
+    
+    def cancel_match_pass(self):
+        if self.find_pass:
+            self.find_pass[0].set()
+            self.find_pass = None
+        self.find_poll_timer.stop()
+    
+    def index_matches(self):
+        """Find every match once; a big document is searched on a thread and the screen directly until then"""
+        self.cancel_match_pass()
+        self.find_starts, self.find_ends = array('q'), array('q')
+        self.find_ready = False
+        self.find_view = None
+        
+        if self.find_regex is not None:
+            text = document_text(self.document())
+            if len(text) <= FIND_INLINE_INDEX_CHARS:
+                self.find_starts, self.find_ends = find_match_positions(text, self.find_regex)
+                self.find_ready = True
+                self.matches_counted.emit(len(self.find_starts))
+            else:
+                stopped = threading.Event()
+                result = []
+                self.find_pass = (stopped, result)
+                regex = self.find_regex
+                threading.Thread(target=lambda: result.append(find_match_positions(text, regex, stopped)),
+                                 daemon=True).start()
+                self.find_poll_timer.start()
+        self.update_find_selections()
+    
+    def poll_matches(self):
+        if not self.find_pass or not self.find_pass[1]:
+            return
+        positions = self.find_pass[1][0]
+        self.cancel_match_pass()
+        if positions is not None:
+            self.find_starts, self.find_ends = positions
+            self.find_ready = True
+            self.find_view = None
+            self.update_find_selections()
+            self.matches_counted.emit(len(self.find_starts))
+    
+    def visible_range(self):
+        """Document positions from the first to the last block on screen"""
+        first = self.firstVisibleBlock()
+        last = self.cursorForPosition(QPoint(0, self.viewport().height())).block()
+        return first.position(), last.position() + last.length()
+    
+    def update_find_selections(self):
+        """Build selections for the matches on screen only"""
+        if self.find_regex is None:
+            if self.find_selections:
+                self.find_selections = []
+                self.find_view = None
+                self.highlight_current_line()
+            return
+        
+        start, end = self.visible_range()
+        if self.find_view == (start, end, self.find_ready):
+            return
+        self.find_view = (start, end, self.find_ready)
+        
+        if self.find_ready:
+            first = bisect_right(self.find_ends, start)
+            last = bisect_left(self.find_starts, end)
+            spans = zip(self.find_starts[first:last], self.find_ends[first:last])
+        else:
+            cursor = QTextCursor(self.document())
+            cursor.setPosition(start)
+            cursor.setPosition(min(end, self.document().characterCount() - 1), QTextCursor.MoveMode.KeepAnchor)
+            starts, ends = find_match_positions(cursor.selectedText().replace('\u2029', '\n'), self.find_regex)
+            spans = ((start + match_start, start + match_end) for match_start, match_end in zip(starts, ends))
+        
+        color = QColor(MODERN_GAMER_THEME['warning'])
+        color.setAlpha(90)
+        selections = []
+        for match_start, match_end in spans:
+            selection = QTextEdit.ExtraSelection()
+            selection.format.setBackground(color)
+            selection.cursor = QTextCursor(self.document())
+            selection.cursor.setPosition(match_start)
+            selection.cursor.setPosition(match_end, QTextCursor.MoveMode.KeepAnchor)
+            selections.append(selection)
+        self.find_selections = selections
+        self.highlight_current_line()
+    
+    def jump_to_match(self, backward=False):
+        """Select the next or previous indexed match, wrapping around; returns (number, count) or None"""
+        count = len(self.find_starts)
+        if not self.find_ready or not count:
+            return None
+        cursor = self.textCursor()
+        if backward:
+            index = bisect_left(self.find_starts, cursor.selectionStart()) - 1
+        else:
+            index = bisect_left(self.find_starts, cursor.selectionEnd())
+        index %= count
+        cursor.setPosition(self.find_starts[index])
+        cursor.setPosition(self.find_ends[index], QTextCursor.MoveMode.KeepAnchor)
+        self.setTextCursor(cursor)
+        return index + 1, count
+    
+    def set_language(self, language):
+        self.highlighter.set_language(language)
+        if self.lazy_highlighting:
+            self.lazy_sweep = 0
+            self.lazy_settle = None
+            self.lazy_painted.clear()
+            self.viewport_timer.start()
+            self.lazy_timer.start()
+    
+    def enable_lazy_highlighting(self):
+        """Large-file mode: highlight the viewport right away and the rest when idle"""
+        if self.lazy_highlighting:
+            return
+        self.lazy_highlighting = True
+        # Detached, QSyntaxHighlighter no longer walks every block on load/edit;
+        # its tokenizer is driven from here instead
+        self.highlighter.setDocument(None)
+        self.lazy_sweep = 0          # blocks before this are highlighted for good
+        self.lazy_settle = None      # (first, last) edited blocks still to settle
+        self.lazy_painted = {}       # block number -> end state, viewport paints
+        self.lazy_block_count = self.document().blockCount()
+        
+        self.lazy_timer = QTimer(self)
+        self.lazy_timer.setSingleShot(True)
+        self.lazy_timer.setInterval(0)
+        self.lazy_timer.timeout.connect(self.run_lazy_pass)
+        self.viewport_timer = QTimer(self)
+        self.viewport_timer.setSingleShot(True)
+        self.viewport_timer.setInterval(0)
+        self.viewport_timer.timeout.connect(self.highlight_viewport)
+        
+        self.document().contentsChange.connect(self.on_lazy_contents_change)
+        self.updateRequest.connect(self.schedule_viewport_highlight)
+        self.lazy_timer.start()
+    
+    def on_lazy_contents_change(self, position, removed, added):
+        document = self.document()
+        first = document.findBlock(position).blockNumber()
+        last = document.findBlock(position + added).blockNumber()
+        delta = document.blockCount() - self.lazy_block_count
+        self.lazy_block_count = document.blockCount()
+        if first < self.lazy_sweep:
+            self.lazy_sweep = max(first, self.lazy_sweep + delta)
+        self.lazy_painted.clear()
+        
+        if last - first > LAZY_VIEWPORT_MARGIN:
+            # Load or big paste: sweep again from here rather than settle now
+            self.lazy_sweep = min(self.lazy_sweep, first)
+            self.lazy_settle = None
+        else:
+            if self.lazy_settle:
+                first = min(first, self.lazy_settle[0])
+                last = max(last, self.lazy_settle[1])
+            self.lazy_settle = (first, last)
+            # Settle right away so the edited line never shows stale colors
+            self.run_lazy_pass()
+        self.viewport_timer.start()
+    
+    def schedule_viewport_highlight(self, rect=None, dy=0):
+        if self.lazy_sweep < self.blockCount() and not self.viewport_timer.isActive():
+            self.viewport_timer.start()
+    
+    def run_lazy_pass(self):
+        """Highlight for a few milliseconds, then yield back to the event loop"""
+        clock = QElapsedTimer()
+        clock.start()
+        if self.lazy_settle:
+            self.lazy_settle = self.settle_blocks(*self.lazy_settle, clock)
+        elif self.lazy_sweep < self.blockCount():
+            self.sweep_blocks(clock)
+            if self.lazy_sweep >= self.blockCount():
+                self.lazy_painted.clear()
+        if self.lazy_settle or self.lazy_sweep < self.blockCount():
+            self.lazy_timer.start()
+    
+    def sweep_blocks(self, clock):
+        block = self.document().findBlockByNumber(self.lazy_sweep)
+        start = block
+        state = max(block.previous().userState(), 0)
+        while block.isValid() and clock.elapsed() < LAZY_SLICE_MS:
+            state = self.paint_block(block, state)
+            block.setUserState(state)
+            block = block.next()
+        self.lazy_sweep = block.blockNumber() if block.isValid() else self.blockCount()
+        self.mark_blocks_dirty(start, block)
+    
+    def settle_blocks(self, first, last, clock):
+        """Re-highlight edited blocks until the state handed on stops changing"""
+        block = self.document().findBlockByNumber(first)
+        start = block
+        state = max(block.previous().userState(), 0)
+        resume = None
+        while block.isValid() and block.blockNumber() < self.lazy_sweep:
+            if clock.elapsed() >= LAZY_SLICE_MS:
+                resume = (block.blockNumber(), max(last, block.blockNumber()))
+                break
+            previous = block.userState()
+            state = self.paint_block(block, state)
+            block.setUserState(state)
+            number = block.blockNumber()
+            block = block.next()
+            if number >= last and state == previous:
+                break
+        self.mark_blocks_dirty(start, block)
+        return resume
+    
+    def highlight_viewport(self):
+        """Paint the blocks in and near the viewport that the sweep hasn't reached"""
+        top = self.firstVisibleBlock().blockNumber()
+        rows = self.viewport().height() // max(1, self.fontMetrics().height())
+        last = top + rows + LAZY_VIEWPORT_MARGIN
+        block = self.document().findBlockByNumber(max(top - LAZY_VIEWPORT_MARGIN, self.lazy_sweep))
+        start = block
+        state = max(block.previous().userState(), 0)
+        painted = False
+        while block.isValid() and block.blockNumber() <= last:
+            number = block.blockNumber()
+            if number in self.lazy_painted:
+                state = self.lazy_painted[number]
+            else:
+                state = self.paint_block(block, state)
+                self.lazy_painted[number] = state
+                painted = True
+            block = block.next()
+        if painted:
+            self.mark_blocks_dirty(start, block)
+    
+    def paint_block(self, block, state):
+        spans, state = self.highlighter.tokenize(block.text(), state)
+        ranges = []
+        for start, length, fmt in spans:
+            format_range = QTextLayout.FormatRange()
+            format_range.start = start
+            format_range.length = length
+            format_range.format = fmt
+            ranges.append(format_range)
+        block.layout().setFormats(ranges)
+        return state
+    
+    def mark_blocks_dirty(self, start, end):
+        # One relayout/repaint for the whole range instead of one per block
+        if not start.isValid():
+            return
+        stop = end.position() if end.isValid() else self.document().characterCount()
+        self.document().markContentsDirty(start.position(), stop - start.position())
     
     def insert_suggestion(self, suggestion: str):
         """Insert AI suggestion at cursor"""
@@ -1083,12 +1914,147 @@ class LineNumberArea(QWidget):
     def paintEvent(self, event):
         self.editor.line_number_area_paint_event(event)
 
+# ==================== TOOLCHAIN DETECTION ====================
+
+# Compilers and interpreters to look for, in display order:
+# name -> (commands to try in turn, arguments that make them report a version)
+TOOLCHAIN_PROBES = {
+    'python':     (['python3', 'python'], ['--version']),
+    'node':       (['node'], ['--version']),
+    'php':        (['php'], ['--version']),
+    'java':       (['java'], ['-version']),
+    'javac':      (['javac'], ['-version']),
+    'gcc':        (['gcc'], ['--version']),
+    'g++':        (['g++'], ['--version']),
+    'powershell': (['powershell'], ['-Command', 'echo test']),
+    'sqlite':     (['sqlite3'], ['--version']),
+}
+
+# Toolchains are found by looking their commands up on PATH, which starts no
+# processes; a binary is only version-probed the first time a file is run
+# with it, and the result is cached on disk per inode
+TOOLCHAIN_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".lrd_toolchains.json")
+TOOLCHAIN_PROBE_TIMEOUT = 2
+
+# Toolchains a file needs before it can run, by language
+LANGUAGE_TOOLCHAINS = {
+    'python': ['python'],
+    'javascript': ['node'],
+    'java': ['javac', 'java'],
+    'c': ['gcc'],
+    'cpp': ['g++'],
+    'php': ['php'],
+    'sql': ['sqlite'],
+}
+
+class ToolchainResolver:
+    """Resolves toolchains on PATH and version-probes each binary only once"""
+    
+    def __init__(self, probes, cache_file=TOOLCHAIN_CACHE_FILE):
+        self.probes = probes
+        self.cache_file = cache_file
+        self.versions = self.load_cache().get('binaries', {})
+    
+    def detect(self):
+        """Return {name: command} for every toolchain on PATH not known to be broken"""
+        compilers = {}
+        for name, (commands, args) in self.probes.items():
+            for cmd in commands:
+                key = self.binary_key(cmd)
+                if key and self.versions.get(key, {}).get('ok', True):
+                    compilers[name] = cmd
+                    break
+        return compilers
+    
+    def needs_probe(self, names):
+        """Whether verify(names) would have to start a binary to probe it"""
+        for name in names:
+            commands, args = self.probes.get(name, ([], []))
+            for cmd in commands:
+                key = self.binary_key(cmd)
+                if not key:
+                    continue
+                if key not in self.versions:
+                    return True
+                if self.versions[key]['ok']:
+                    break
+        return False
+    
+    def verify(self, names):
+        """Probe the binaries behind names that were never probed; returns the updated toolchains"""
+        probed = False
+        for name in names:
+            commands, args = self.probes.get(name, ([], []))
+            for cmd in commands:
+                key = self.binary_key(cmd)
+                if not key:
+                    continue
+                if key not in self.versions:
+                    self.versions[key] = self.probe(cmd, args)
+                    probed = True
+                if self.versions[key]['ok']:
+                    break
+        
+        if probed:
+            self.save_cache()
+        return self.detect()
+    
+    def binary_key(self, cmd):
+        """Identify the binary cmd resolves to by device, inode and mtime; None if it is not on PATH"""
+        path = shutil.which(cmd)
+        if not path:
+            return None
+        try:
+            info = os.stat(path)
+        except OSError:
+            return None
+        return f"{info.st_dev}:{info.st_ino}:{info.st_mtime_ns}"
+    
+    def probe(self, cmd, args):
+        try:
+            result = subprocess.run([cmd] + args, capture_output=True, text=True, errors='replace',
+                                    timeout=TOOLCHAIN_PROBE_TIMEOUT)
+        except:
+            return {'ok': False, 'version': ''}
+        output = (result.stdout or result.stderr).strip()
+        return {'ok': result.returncode == 0, 'version': output.splitlines()[0] if output else ''}
+    
+    def load_cache(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def save_cache(self):
+        cache = self.load_cache()
+        cache['binaries'] = {**cache.get('binaries', {}), **self.versions}
+        # Detection can save from several threads at once, so each writer
+        # gets a temp file of its own and os.replace keeps the cache whole
+        temp_file = f"{self.cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(temp_file, self.cache_file)
+        except OSError:
+            pass
+
 # ==================== ENHANCED TERMINAL WITH AI ====================
 
+# Program output is queued and written once per frame, a slice of lines at
+# a time within the budget; lines beyond the scrollback limit are dropped
+# from the top, including queued ones that would never be seen
+TERMINAL_FLUSH_MS = 16
+TERMINAL_FLUSH_BUDGET = 0.008
+TERMINAL_SLICE_LINES = 200
+TERMINAL_SCROLLBACK_LINES = 10000
+
 class LRDTerminal(QTextEdit):
     command_executed = pyqtSignal(str, str)
     output_received = pyqtSignal(str)
     error_received = pyqtSignal(str)
+    toolchains_verified = pyqtSignal(object, object)  # compilers, continuation
     
     def __init__(self):
         super().__init__()
@@ -1098,12 +2064,16 @@ class LRDTerminal(QTextEdit):
         self.current_dir = os.getcwd()
         self.compiler_paths = self.detect_compilers()
         self.thread_manager = ThreadManager()
+        # Version probes get a thread of their own; the job pool can be held
+        # indefinitely by long-running commands and servers
+        self.probe_pool = ThreadPoolExecutor(max_workers=1)
         self.ai_suggestions = []
         
         # Connect thread manager signals
         self.thread_manager.output_signal.connect(self.append_output)
         self.thread_manager.error_signal.connect(self.append_error)
         self.thread_manager.finished_signal.connect(self.append_finished)
+        self.toolchains_verified.connect(self.on_toolchains_verified)
         
         # Show welcome message
         self.append_welcome()
@@ -1111,6 +2081,15 @@ class LRDTerminal(QTextEdit):
     def setup_terminal(self):
         self.setReadOnly(True)
         self.setFont(QFont("'Segoe UI', 'Consolas', monospace", 10))
+        self.document().setMaximumBlockCount(TERMINAL_SCROLLBACK_LINES)
+        
+        self.pending_output = deque()
+        self.pending_lines = 0
+        self.output_line_open = False
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(TERMINAL_FLUSH_MS)
+        self.flush_timer.timeout.connect(self.flush_output)
         
         self.setStyleSheet(f"""
             QTextEdit {{
@@ -1125,91 +2104,24 @@ class LRDTerminal(QTextEdit):
     
     def detect_compilers(self):
         """Detect available compilers and interpreters"""
-        compilers = {}
-        
-        # Python
-        for cmd in ['python3', 'python']:
-            try:
-                result = subprocess.run([cmd, '--version'], 
-                                      capture_output=True, 
-                                      text=True, 
-                                      timeout=2)
-                if result.returncode == 0:
-                    compilers['python'] = cmd
-                    break
-            except:
-                continue
-        
-        # Node.js
-        try:
-            result = subprocess.run(['node', '--version'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=2)
-            if result.returncode == 0:
-                compilers['node'] = 'node'
-        except:
-            pass
-        
-        # PHP
-        try:
-            result = subprocess.run(['php', '--version'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=2)
-            if result.returncode == 0:
-                compilers['php'] = 'php'
-        except:
-            pass
-        
-        # Java
-        try:
-            result = subprocess.run(['java', '-version'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  stderr=subprocess.PIPE,
-                                  timeout=2)
-            if result.returncode == 0 or result.stderr:
-                compilers['java'] = 'java'
-                compilers['javac'] = 'javac'
-        except:
-            pass
-        
-        # GCC/G++
-        for cmd in ['gcc', 'g++']:
-            try:
-                result = subprocess.run([cmd, '--version'], 
-                                      capture_output=True, 
-                                      text=True, 
-                                      timeout=2)
-                if result.returncode == 0:
-                    compilers[cmd] = cmd
-            except:
-                pass
-        
-        # PowerShell (Windows)
-        try:
-            result = subprocess.run(['powershell', '-Command', 'echo test'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=2)
-            if result.returncode == 0:
-                compilers['powershell'] = 'powershell'
-        except:
-            pass
-        
-        # SQLite
-        try:
-            result = subprocess.run(['sqlite3', '--version'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=2)
-            if result.returncode == 0:
-                compilers['sqlite'] = 'sqlite3'
-        except:
-            pass
+        self.toolchain_resolver = ToolchainResolver(TOOLCHAIN_PROBES)
+        return self.toolchain_resolver.detect()
+    
+    def verify_compilers(self, names, on_ready):
+        """Make sure the named toolchains really work before their first use, then call on_ready"""
+        if not self.toolchain_resolver.needs_probe(names):
+            self.compiler_paths = self.toolchain_resolver.verify(names)
+            on_ready()
+            return
         
-        return compilers
+        # A version probe can take seconds, so it runs off the GUI thread and on_ready follows there
+        def probe():
+            self.toolchains_verified.emit(self.toolchain_resolver.verify(names), on_ready)
+        self.probe_pool.submit(probe)
+    
+    def on_toolchains_verified(self, compilers, on_ready):
+        self.compiler_paths = compilers
+        on_ready()
     
     def append_welcome(self):
         self.append(f"<span style='color:{MODERN_GAMER_THEME['primary']}; font-weight:bold;'>◢◤ LRD ADVANCED TERMINAL v5.0 ◥◣</span>")
@@ -1242,6 +2154,8 @@ class LRDTerminal(QTextEdit):
         
         # Special commands
         if command.lower() == 'clear':
+            self.pending_output.clear()
+            self.pending_lines = 0
             self.clear()
             self.append_welcome()
             return
@@ -1254,6 +2168,15 @@ class LRDTerminal(QTextEdit):
             self.show_history()
             return
         
+        if command.lower() == 'jobs':
+            self.show_jobs()
+            return
+        
+        # kill %ID stops one of our jobs; a plain kill PID goes to the shell
+        if command.lower().startswith('kill ') and '%' in command:
+            self.handle_kill(command)
+            return
+        
         if command.lower().startswith('cd '):
             self.handle_cd(command)
             return
@@ -1277,7 +2200,7 @@ class LRDTerminal(QTextEdit):
             return
         
         # Run command in thread
-        self.thread_manager.run_command(command, self.current_dir, f"Command: {command}")
+        self.thread_manager.run_command(command, self.current_dir, f"Command: {command}", timeout=RUN_TIMEOUT)
     
     def handle_ai_command(self, command: str):
         """Handle AI-powered commands"""
@@ -1405,7 +2328,7 @@ class LRDTerminal(QTextEdit):
             
             # Execute SQLite command
             cmd = f'{self.compiler_paths["sqlite"]} "{db_file}" "{sql_query}"'
-            self.thread_manager.run_command(cmd, self.current_dir, "SQLite query")
+            self.thread_manager.run_command(cmd, self.current_dir, "SQLite query", timeout=QUERY_TIMEOUT)
             
         except Exception as e:
             self.append(f"<span style='color:{MODERN_GAMER_THEME['error']}'>Error: {str(e)}</span>")
@@ -1428,6 +2351,8 @@ class LRDTerminal(QTextEdit):
   <span style='color:{MODERN_GAMER_THEME['text_editor']}'>pwd</span>              - Show current directory<br>
   <span style='color:{MODERN_GAMER_THEME['text_editor']}'>clear</span>            - Clear terminal<br>
   <span style='color:{MODERN_GAMER_THEME['text_editor']}'>history</span>          - Show command history<br>
+  <span style='color:{MODERN_GAMER_THEME['text_editor']}'>jobs</span>             - List running commands<br>
+  <span style='color:{MODERN_GAMER_THEME['text_editor']}'>kill %id</span>         - Stop a running command (-9 to force)<br>
   <span style='color:{MODERN_GAMER_THEME['text_editor']}'>help</span>             - Show this help<br><br>
 
 <span style='color:{MODERN_GAMER_THEME['secondary']}; font-weight:bold'>Code Execution:</span><br>
@@ -1458,6 +2383,38 @@ class LRDTerminal(QTextEdit):
             idx = start_idx + i
             self.append(f"  <span style='color:{MODERN_GAMER_THEME['text_primary']}'>{idx}:</span> {cmd}")
     
+    def show_jobs(self):
+        jobs = self.thread_manager.jobs()
+        if not jobs:
+            self.append(f"<span style='color:{MODERN_GAMER_THEME['text_tertiary']}'>No running jobs</span>")
+            return
+        
+        self.append(f"<span style='color:{MODERN_GAMER_THEME['secondary']}; font-weight:bold'>Running Jobs:</span>")
+        for task_id, command, elapsed in jobs:
+            self.append(f"  <span style='color:{MODERN_GAMER_THEME['text_primary']}'>[{task_id}]</span> {command} <span style='color:{MODERN_GAMER_THEME['text_tertiary']}'>({elapsed:.0f}s)</span>")
+        self.append(f"<span style='color:{MODERN_GAMER_THEME['text_tertiary']}'>Use 'kill %ID' to stop a job, 'kill -9 %ID' to force it</span>")
+    
+    def handle_kill(self, command: str):
+        args = command.split()[1:]
+        force = '-9' in args or '-KILL' in args
+        for arg in args:
+            if not arg.startswith('%'):
+                continue
+            try:
+                task_id = int(arg[1:])
+            except ValueError:
+                self.append(f"<span style='color:{MODERN_GAMER_THEME['error']}'>kill: {arg}: invalid job id</span>")
+                continue
+            
+            if force:
+                stopped = self.thread_manager.kill(task_id)
+            else:
+                stopped = self.thread_manager.terminate(task_id)
+            if stopped:
+                self.append(f"<span style='color:{MODERN_GAMER_THEME['warning']}'>[{task_id}] {'Killed' if force else 'Terminating'}</span>")
+            else:
+                self.append(f"<span style='color:{MODERN_GAMER_THEME['error']}'>kill: {arg}: no such job</span>")
+    
     def get_previous_command(self):
         if self.history_index > 0:
             self.history_index -= 1
@@ -1477,31 +2434,948 @@ class LRDTerminal(QTextEdit):
         return ""
     
     def append_output(self, text):
-        self.append(f"<span style='color:{MODERN_GAMER_THEME['text_editor']}'>{text}</span>")
+        self.queue_output(text, MODERN_GAMER_THEME['text_editor'])
     
     def append_error(self, text):
-        self.append(f"<span style='color:{MODERN_GAMER_THEME['error']}'>{text}</span>")
+        self.queue_output(text, MODERN_GAMER_THEME['error'])
     
     def append_finished(self, text):
         self.append(f"<span style='color:{MODERN_GAMER_THEME['success']}'>{text}</span>")
     
+    def queue_output(self, text, color):
+        """Buffer program output until the next frame; a color of None marks an HTML message"""
+        if not text:
+            return
+        self.pending_output.append((text, color))
+        self.pending_lines += text.count('\n')
+        
+        # Everything already shown would be scrolled out by what is queued
+        while self.pending_lines - self.pending_output[0][0].count('\n') >= TERMINAL_SCROLLBACK_LINES:
+            self.pending_lines -= self.pending_output.popleft()[0].count('\n')
+        
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+    
+    def flush_output(self, budget=TERMINAL_FLUSH_BUDGET):
+        """Write queued output to the document, one edit per slice of lines"""
+        self.flush_timer.stop()
+        if not self.pending_output:
+            return
+        deadline = time.monotonic() + budget
+        
+        scrollbar = self.verticalScrollBar()
+        follow = scrollbar.value() >= scrollbar.maximum() - 4
+        
+        # No surrounding edit block: layout then happens per slice, inside
+        # the budget, instead of all at once afterwards
+        cursor = QTextCursor(self.document())
+        while self.pending_output and time.monotonic() < deadline:
+            text, color = self.pending_output[0]
+            if color is None:
+                self.pending_output.popleft()
+                self.insert_message(text)
+                continue
+            
+            end = -1
+            for _ in range(TERMINAL_SLICE_LINES):
+                end = text.find('\n', end + 1)
+                if end < 0:
+                    break
+            if 0 <= end < len(text) - 1:
+                self.pending_output[0] = (text[end + 1:], color)
+                text = text[:end + 1]
+            else:
+                self.pending_output.popleft()
+            self.pending_lines -= text.count('\n')
+            
+            # Output may stop mid-line; the next batch carries on from there
+            if not self.output_line_open and not self.document().isEmpty():
+                text = '\n' + text
+            self.output_line_open = not text.endswith('\n')
+            if not self.output_line_open:
+                text = text[:-1]
+            char_format = QTextCharFormat()
+            char_format.setForeground(QColor(color))
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(text, char_format)
+        
+        # Only follow the output if the user has not scrolled up to read
+        if follow:
+            scrollbar.setValue(scrollbar.maximum())
+        if self.pending_output:
+            self.flush_timer.start()
+    
     def append(self, text: str):
+        if self.pending_output:
+            # Keep messages in order with the output still waiting to be shown
+            self.queue_output(text, None)
+        else:
+            self.insert_message(text)
+    
+    def insert_message(self, text: str):
+        self.output_line_open = False
+        
         cursor = self.textCursor()
         cursor.movePosition(QTextCursor.MoveOperation.End)
+        # One block per message so the scrollback limit can drop old ones
+        if not self.document().isEmpty():
+            cursor.insertBlock()
         self.setTextCursor(cursor)
         
         if "<" in text and ">" in text and ("span" in text or "br" in text):
-            self.insertHtml(text + "<br>")
+            self.insertHtml(text)
         else:
             # Escape HTML and add as plain text
             plain_text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-            self.insertHtml(f"<span style='color:{MODERN_GAMER_THEME['text_editor']}'>{plain_text}</span><br>")
+            self.insertHtml(f"<span style='color:{MODERN_GAMER_THEME['text_editor']}'>{plain_text}</span>")
         
         # Scroll to bottom
         self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
 
 # ==================== ENHANCED FILE EXPLORER ====================
 
+# Directories the explorer never lists or descends into
+EXPLORER_SKIP_DIRS = {'.git', '.hg', '.svn', 'node_modules', 'venv', '.venv', '__pycache__',
+                      '.mypy_cache', '.pytest_cache', '.tox', 'build', 'dist', 'target'}
+# Rows handed to the view per event loop turn while a big directory loads
+EXPLORER_FETCH_BATCH = 1000
+# Quiet period before a watched directory is re-read after a change
+EXPLORER_REFRESH_DELAY = 200
+
+class ExplorerNode:
+    """One file or directory in the explorer tree"""
+    
+    __slots__ = ('name', 'path', 'is_dir', 'enabled', 'parent', 'row', 'children', 'pending')
+    
+    def __init__(self, name, path, is_dir, enabled=True, parent=None, row=0):
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self.enabled = enabled
+        self.parent = parent
+        self.row = row
+        # None until the directory is listed for the first time
+        self.children = None if is_dir else []
+        self.pending = []
+
+class ProjectFileModel(QAbstractItemModel):
+    """Lazy file tree rooted at the project, with the QFileSystemModel calls the explorer uses"""
+    
+    # Views ask for flags on every layout pass, so build them once
+    ITEM_FLAGS = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+    NO_FLAGS = Qt.ItemFlag.NoItemFlags
+    # Listings made on the refresh thread: refresh serial, [(path, entries)]
+    directories_scanned = pyqtSignal(int, object)
+    
+    def __init__(self, skip_dirs=EXPLORER_SKIP_DIRS, parent=None):
+        super().__init__(parent)
+        self.skip_dirs = set(skip_dirs)
+        self.name_filter = None
+        self.name_filter_disables = True
+        self.show_hidden = False
+        self.root = ExplorerNode("", "", True)
+        
+        self.icon_provider = QFileIconProvider()
+        self.icons = {}
+        
+        # Directories still handing rows to the view
+        self.feeding = []
+        self.feed_timer = QTimer(self)
+        self.feed_timer.setInterval(0)
+        self.feed_timer.timeout.connect(self.feed)
+        
+        # Only directories that have been listed are watched
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_refresh)
+        self.changed_dirs = set()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(EXPLORER_REFRESH_DELAY)
+        self.refresh_timer.timeout.connect(self.refresh_changed)
+        self.refresh_serial = 0
+        # Directories re-read since the running refresh listed them
+        self.refreshed_since = set()
+        self.directories_scanned.connect(self.apply_scans)
+    
+    # ---- QFileSystemModel compatible API ----
+    
+    def setRootPath(self, path):
+        self.reload(os.path.abspath(path) if path else "")
+        return QModelIndex()
+    
+    def rootPath(self):
+        return self.root.path
+    
+    def setNameFilters(self, patterns):
+        self.name_filter = re.compile("|".join(fnmatch.translate(p) for p in patterns), re.IGNORECASE) if patterns else None
+        self.reload(self.root.path)
+    
+    def setNameFilterDisables(self, disables):
+        self.name_filter_disables = disables
+        self.reload(self.root.path)
+    
+    def setFilter(self, filters):
+        # NoFilter is -1, so it carries every flag including Hidden
+        self.show_hidden = filters != QDir.Filter.NoFilter and bool(filters & QDir.Filter.Hidden)
+        self.reload(self.root.path)
+    
+    def set_skip_dirs(self, names):
+        self.skip_dirs = set(names)
+        self.reload(self.root.path)
+    
+    def filePath(self, index):
+        return self.node(index).path
+    
+    def fileName(self, index):
+        return self.node(index).name
+    
+    def isDir(self, index):
+        return self.node(index).is_dir
+    
+    # ---- QAbstractItemModel ----
+    
+    def index(self, row, column=0, parent=QModelIndex()):
+        # Like QFileSystemModel, index(path) looks a path up
+        if isinstance(row, str):
+            return self.path_index(row)
+        node = self.node(parent)
+        if column != 0 or not node.children or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+    
+    def parent(self, index=None):
+        if index is None:
+            return super().parent()
+        if not index.isValid():
+            return QModelIndex()
+        return self.node_index(index.internalPointer().parent)
+    
+    def rowCount(self, parent=QModelIndex()):
+        children = self.node(parent).children
+        return len(children) if children else 0
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+    
+    def hasChildren(self, parent=QModelIndex()):
+        # Directories get an expand arrow without being scanned
+        node = self.node(parent)
+        return node.is_dir and (node.children is None or bool(node.children) or bool(node.pending))
+    
+    def canFetchMore(self, parent):
+        return self.node(parent).children is None
+    
+    def fetchMore(self, parent):
+        node = self.node(parent)
+        if node.children is None:
+            self.load(node)
+            self.insert_batch(node)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.name
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.icon_for(node)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return node.path
+        return None
+    
+    def flags(self, index):
+        if index.isValid() and index.internalPointer().enabled:
+            return self.ITEM_FLAGS
+        return self.NO_FLAGS
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole and section == 0:
+            return "Name"
+        return None
+    
+    # ---- Tree ----
+    
+    def node(self, index):
+        return index.internalPointer() if index.isValid() else self.root
+    
+    def node_index(self, node):
+        if node is None or node is self.root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+    
+    def reload(self, path):
+        self.beginResetModel()
+        self.refresh_serial += 1
+        self.feeding.clear()
+        self.feed_timer.stop()
+        self.changed_dirs.clear()
+        watched = self.watcher.directories()
+        if watched:
+            self.watcher.removePaths(watched)
+        self.root = ExplorerNode(path, path, True)
+        self.endResetModel()
+    
+    def scan(self, path):
+        """List one directory as (name, is_dir, enabled) in display order, skipping heavy folders"""
+        if not path:
+            return [(info.absolutePath(), True, True) for info in QDir.drives()]
+        
+        entries = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    name = entry.name
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        continue
+                    if is_dir and name in self.skip_dirs:
+                        continue
+                    if not self.show_hidden and self.is_hidden(entry):
+                        continue
+                    enabled = True
+                    if not is_dir and self.name_filter and not self.name_filter.match(name):
+                        if not self.name_filter_disables:
+                            continue
+                        enabled = False
+                    entries.append((name, is_dir, enabled))
+        except OSError:
+            return []
+        
+        entries.sort(key=lambda entry: (not entry[1], entry[0].casefold(), entry[0]))
+        return entries
+    
+    def is_hidden(self, entry):
+        if entry.name.startswith('.'):
+            return True
+        if os.name == 'nt':
+            try:
+                return bool(entry.stat(follow_symlinks=False).st_file_attributes & 0x2)
+            except OSError:
+                return False
+        return False
+    
+    def load(self, node):
+        node.children = []
+        node.pending = self.scan(node.path)
+        if node.path:
+            self.watcher.addPath(node.path)
+    
+    def make_child(self, node, entry, row):
+        name, is_dir, enabled = entry
+        path = os.path.join(node.path, name) if node.path else name
+        return ExplorerNode(name, path, is_dir, enabled, node, row)
+    
+    def insert_batch(self, node, size=EXPLORER_FETCH_BATCH):
+        batch, node.pending = node.pending[:size], node.pending[size:]
+        if batch:
+            start = len(node.children)
+            self.beginInsertRows(self.node_index(node), start, start + len(batch) - 1)
+            node.children.extend(self.make_child(node, entry, start + i) for i, entry in enumerate(batch))
+            self.endInsertRows()
+        
+        if node.pending and node not in self.feeding:
+            self.feeding.append(node)
+            self.feed_timer.start()
+        elif not node.pending and node in self.feeding:
+            self.feeding.remove(node)
+    
+    def feed(self):
+        for node in list(self.feeding):
+            self.insert_batch(node)
+        if not self.feeding:
+            self.feed_timer.stop()
+    
+    def load_all(self, node):
+        if node.children is None:
+            self.load(node)
+        if node.pending:
+            self.insert_batch(node, len(node.pending))
+    
+    def find_node(self, path, load=False):
+        """Walk down from the root to path, listing directories on the way when load is set"""
+        path = os.path.normpath(os.path.abspath(path))
+        node = self.root
+        while not node.path or os.path.normpath(node.path) != path:
+            if node.children is None or node.pending:
+                if not load:
+                    return None
+                self.load_all(node)
+            for child in node.children:
+                child_path = os.path.normpath(child.path)
+                if child_path == path or path.startswith(child_path.rstrip(os.sep) + os.sep):
+                    node = child
+                    break
+            else:
+                return None
+        return node
+    
+    def path_index(self, path):
+        if not path:
+            return QModelIndex()
+        return self.node_index(self.find_node(path, load=True))
+    
+    # ---- Refresh ----
+    
+    def refresh(self):
+        """Re-read every directory that has been listed so far, listing them on a thread"""
+        self.refresh_serial += 1
+        self.refreshed_since = set()
+        paths = []
+        self.collect_listed(self.root, paths)
+        threading.Thread(target=self.scan_directories, args=(self.refresh_serial, paths), daemon=True).start()
+    
+    def collect_listed(self, node, paths):
+        if node.children is None:
+            return
+        paths.append(node.path)
+        for child in node.children:
+            if child.is_dir:
+                self.collect_listed(child, paths)
+    
+    def scan_directories(self, serial, paths):
+        self.directories_scanned.emit(serial, [(path, self.scan(path)) for path in paths])
+    
+    def apply_scans(self, serial, listings):
+        # A reload or a newer refresh has made these listings stale
+        if serial != self.refresh_serial:
+            return
+        for path, entries in listings:
+            if path in self.refreshed_since:
+                continue
+            node = self.root if path == self.root.path else self.find_node(path)
+            if node is not None and node.children is not None:
+                self.refresh_directory(node, entries)
+    
+    def refresh_path(self, path):
+        """Re-read one listed directory right away"""
+        node = self.find_node(path)
+        if node is not None and node.children is not None:
+            self.refresh_directory(node)
+    
+    def schedule_refresh(self, path):
+        self.changed_dirs.add(path)
+        self.refresh_timer.start()
+    
+    def refresh_changed(self):
+        paths, self.changed_dirs = self.changed_dirs, set()
+        for path in paths:
+            self.refresh_path(path)
+    
+    def refresh_directory(self, node, entries=None):
+        """Bring one listed directory up to date with removes and inserts instead of a reset"""
+        if entries is None:
+            entries = self.scan(node.path)
+        self.refreshed_since.add(node.path)
+        if node in self.feeding:
+            self.feeding.remove(node)
+        node.pending = []
+        parent_index = self.node_index(node)
+        wanted = {(name, is_dir): enabled for name, is_dir, enabled in entries}
+        
+        # Gone rows leave in runs, bottom up so the rows above stay put
+        row = len(node.children)
+        while row > 0:
+            end = row
+            while row > 0 and wanted.get((node.children[row - 1].name, node.children[row - 1].is_dir)) != node.children[row - 1].enabled:
+                row -= 1
+            if row == end:
+                row -= 1
+                continue
+            removed = node.children[row:end]
+            self.beginRemoveRows(parent_index, row, end - 1)
+            del node.children[row:end]
+            self.endRemoveRows()
+            for child in removed:
+                self.unwatch(child)
+        
+        # Both lists share one sort order, so the new entries that sort before
+        # each kept row go in as one run; kept rows are renumbered on the way
+        row = 0
+        position = 0
+        while position < len(entries):
+            kept = node.children[row] if row < len(node.children) else None
+            end = position
+            while end < len(entries) and (kept is None or entries[end][:2] != (kept.name, kept.is_dir)):
+                end += 1
+            if end > position:
+                self.beginInsertRows(parent_index, row, row + end - position - 1)
+                node.children[row:row] = [self.make_child(node, entry, row + i) for i, entry in enumerate(entries[position:end])]
+                self.endInsertRows()
+                row += end - position
+                position = end
+            if kept is not None:
+                kept.row = row
+                row += 1
+                position += 1
+    
+    def unwatch(self, node):
+        if node.is_dir and node.children is not None:
+            self.watcher.removePath(node.path)
+            for child in node.children:
+                self.unwatch(child)
+    
+    def icon_for(self, node):
+        if node.is_dir:
+            key = 'drive' if node.parent is self.root and not self.root.path else 'folder'
+        else:
+            key = os.path.splitext(node.name)[1].lower()
+        icon = self.icons.get(key)
+        if icon is None:
+            if key == 'drive':
+                icon = self.icon_provider.icon(QFileIconProvider.IconType.Drive)
+            elif key == 'folder':
+                icon = self.icon_provider.icon(QFileIconProvider.IconType.Folder)
+            else:
+                icon = self.icon_provider.icon(QFileInfo(node.path))
+            self.icons[key] = icon
+        return icon
+
+# Threads that list folders in parallel for the Properties size
+DISK_USAGE_WORKERS = 4
+# How often Properties shows the running totals
+DISK_USAGE_REPORT_MS = 100
+# Folders remembered between scans before the memo starts over
+DISK_USAGE_MEMO_LIMIT = 200000
+
+class DiskUsageScanner(QObject):
+    """Adds up a folder tree on a thread pool and reports running totals"""
+    
+    # qint64 because a plain int signal argument is 32-bit
+    progress = pyqtSignal('qint64', 'qint64', 'qint64')  # bytes, files, folders
+    finished = pyqtSignal('qint64', 'qint64', 'qint64', bool)  # bytes, files, folders, cancelled
+    
+    # (path, mtime_ns) -> (bytes, files, subfolders) of one folder's own entries,
+    # so an unchanged folder is not listed again on the next query
+    memo = {}
+    
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.cancelled = threading.Event()
+        self.totals = (0, 0, 0)
+        self.done = False
+        
+        # Totals are read on the GUI thread, so the signals never cross threads
+        self.report_timer = QTimer(self)
+        self.report_timer.setInterval(DISK_USAGE_REPORT_MS)
+        self.report_timer.timeout.connect(self.report)
+    
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        self.report_timer.start()
+    
+    def cancel(self):
+        self.cancelled.set()
+    
+    def run(self):
+        size = files = folders = 0
+        pool = ThreadPoolExecutor(max_workers=DISK_USAGE_WORKERS)
+        pending = {pool.submit(self.scan_folder, self.path)}
+        while pending and not self.cancelled.is_set():
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                folder_size, folder_files, subfolders = future.result()
+                size += folder_size
+                files += folder_files
+                folders += len(subfolders)
+                for subfolder in subfolders:
+                    pending.add(pool.submit(self.scan_folder, subfolder))
+            self.totals = (size, files, folders)
+        pool.shutdown(wait=False, cancel_futures=True)
+        self.done = True
+    
+    def scan_folder(self, path):
+        if self.cancelled.is_set():
+            return 0, 0, []
+        try:
+            key = (path, os.stat(path, follow_symlinks=False).st_mtime_ns)
+        except OSError:
+            return 0, 0, []
+        cached = self.memo.get(key)
+        if cached is not None:
+            return cached
+        
+        size = files = 0
+        subfolders = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subfolders.append(entry.path)
+                        else:
+                            size += entry.stat(follow_symlinks=False).st_size
+                            files += 1
+                    except OSError:
+                        continue
+        except OSError:
+            return 0, 0, []
+        
+        if len(self.memo) >= DISK_USAGE_MEMO_LIMIT:
+            self.memo.clear()
+        self.memo[key] = (size, files, subfolders)
+        return size, files, subfolders
+    
+    def report(self):
+        self.progress.emit(*self.totals)
+        if self.done:
+            self.report_timer.stop()
+            self.finished.emit(*self.totals, self.cancelled.is_set())
+
+# Journal kept in the trash folder, one JSON record per line
+TRASH_INDEX_NAME = "index.jsonl"
+# Trash folders on other filesystems, remembered in the home trash
+TRASH_MOUNTS_NAME = "mounts.txt"
+# Names in a trash folder that are bookkeeping, not trashed items
+TRASH_RESERVED_NAMES = {"files", "expunged", TRASH_INDEX_NAME, TRASH_INDEX_NAME + ".tmp", TRASH_MOUNTS_NAME}
+# Dead journal records tolerated before the journal is rewritten
+TRASH_COMPACT_THRESHOLD = 500
+# Size one trash folder may reach before its oldest items are purged
+TRASH_QUOTA_BYTES = 10 * 1024 ** 3
+# Trash folder created at the top of other filesystems, like XDG's .Trash-$uid
+TRASH_MOUNT_DIR_NAME = ".lrd_trash-{}".format(
+    os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', ''))
+# Ids of trashed items; an item always lives at files/<id>
+TRASH_ID = re.compile(r'[0-9a-f]{32}')
+
+def make_private_dir(path, tighten=False):
+    """Create path as a folder only this user can enter, or raise OSError when what is there is not one"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if os.name == 'nt':
+        return
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise OSError(f"{path} is not a folder owned by this user")
+    if stat.S_IMODE(info.st_mode) != 0o700:
+        if not tighten:
+            raise OSError(f"{path} is open to other users")
+        os.chmod(path, 0o700)
+
+class TrashIndex:
+    """Trash folder with an append-only journal of what was deleted, from where and when"""
+    
+    def __init__(self, trash_path, tighten=False):
+        self.trash_path = trash_path
+        self.files_path = os.path.join(trash_path, "files")
+        self.expunged_path = os.path.join(trash_path, "expunged")
+        self.journal_path = os.path.join(trash_path, TRASH_INDEX_NAME)
+        # Nobody else may read trashed files or write the journal we act on
+        make_private_dir(trash_path, tighten)
+        make_private_dir(self.files_path, tighten)
+        # id -> entry, oldest deletion first
+        self.entries = {}
+        self.dead = 0
+        # The journal is also written by the maintenance thread
+        self.lock = threading.RLock()
+        self.maintenance = threading.Lock()
+        self.load()
+    
+    def load(self):
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self.apply(json.loads(line))
+                    except (ValueError, KeyError):
+                        # A line cut short by a crash
+                        self.dead += 1
+        except FileNotFoundError:
+            pass
+        
+        self.adopt_untracked()
+        if self.dead >= TRASH_COMPACT_THRESHOLD:
+            self.compact()
+    
+    def apply(self, record):
+        op = record.pop('op')
+        if op == 'add':
+            # Restore and eviction move whatever path_of names, so nothing outside files/ is taken
+            if not TRASH_ID.fullmatch(record['id']) or record['item'] != os.path.join("files", record['id']):
+                raise ValueError(f"journal item outside the trash: {record['item']!r}")
+            self.entries[record['id']] = record
+        elif op == 'size':
+            entry = self.entries.get(record['id'])
+            if entry is not None:
+                entry['size'] = record['size']
+            self.dead += 1
+        elif self.entries.pop(record['id'], None) is not None:
+            self.dead += 2
+    
+    def append(self, record):
+        with self.lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+            self.apply(record)
+            if self.dead >= TRASH_COMPACT_THRESHOLD:
+                self.compact()
+    
+    def compact(self):
+        """Rewrite the journal with only the items still in the trash"""
+        with self.lock:
+            temp_path = self.journal_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(dict(entry, op='add')) + "\n")
+            os.replace(temp_path, self.journal_path)
+            self.dead = 0
+    
+    def adopt_untracked(self):
+        """Index items trashed before the journal existed, moving them under files/; where they came from is unknown"""
+        for name in os.listdir(self.trash_path):
+            if name in TRASH_RESERVED_NAMES:
+                continue
+            path = os.path.join(self.trash_path, name)
+            try:
+                deleted = os.lstat(path).st_ctime
+            except OSError:
+                continue
+            entry_id = uuid.uuid4().hex
+            self.append({'op': 'add', 'id': entry_id, 'item': os.path.join("files", entry_id), 'name': name,
+                         'original': None, 'deleted': deleted, 'size': None})
+            try:
+                os.rename(path, os.path.join(self.files_path, entry_id))
+            except OSError:
+                self.forget(entry_id)
+    
+    def measure(self, path):
+        if not os.path.isdir(path) or os.path.islink(path):
+            return os.lstat(path).st_size
+        size = 0
+        for root, dirs, files in os.walk(path):
+            for name in files:
+                try:
+                    size += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    pass
+        return size
+    
+    def path_of(self, entry):
+        path = os.path.normpath(os.path.join(self.trash_path, entry['item']))
+        if os.path.dirname(path) != os.path.normpath(self.files_path):
+            raise ValueError(f"trash item outside the trash: {entry['item']!r}")
+        return path
+    
+    def get(self, entry_id):
+        return self.entries.get(entry_id)
+    
+    def latest(self):
+        with self.lock:
+            return next(reversed(self.entries.values()), None)
+    
+    def snapshot(self):
+        with self.lock:
+            return list(self.entries.values())
+    
+    def items(self):
+        """Entries oldest first, dropping any whose file was removed behind our back"""
+        for entry in self.snapshot():
+            if not os.path.lexists(self.path_of(entry)):
+                self.forget(entry['id'])
+        return self.snapshot()
+    
+    def add(self, path):
+        """Move path into the trash under a fresh id and return its entry"""
+        path = os.path.abspath(path)
+        entry_id = uuid.uuid4().hex
+        # Sizing a big folder would undo the cheap rename, so maintain() measures it later
+        entry = {'id': entry_id, 'item': os.path.join("files", entry_id), 'name': os.path.basename(path),
+                 'original': path, 'deleted': time.time(), 'size': None}
+        # Journal first, so a crash mid-move never leaves an item nobody can trace
+        self.append(dict(entry, op='add'))
+        try:
+            shutil.move(path, self.path_of(entry))
+        except Exception:
+            self.forget(entry_id)
+            raise
+        return entry
+    
+    def forget(self, entry_id):
+        self.append({'op': 'remove', 'id': entry_id})
+    
+    def restore(self, entry_id):
+        entry = self.entries[entry_id]
+        os.makedirs(os.path.dirname(entry['original']), exist_ok=True)
+        shutil.move(self.path_of(entry), entry['original'])
+        self.forget(entry_id)
+        return entry['original']
+    
+    def purge(self, entry_id):
+        self.remove_path(self.path_of(self.entries[entry_id]))
+        self.forget(entry_id)
+    
+    def clear(self):
+        with self.lock:
+            for entry in self.entries.values():
+                self.remove_path(self.path_of(entry))
+            shutil.rmtree(self.files_path, ignore_errors=True)
+            os.makedirs(self.files_path, exist_ok=True)
+            self.entries.clear()
+            self.compact()
+    
+    def remove_path(self, path):
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        elif os.path.lexists(path):
+            os.remove(path)
+    
+    def start_maintenance(self, quota):
+        threading.Thread(target=self.maintain, args=(quota,), daemon=True).start()
+    
+    def maintain(self, quota):
+        """Measure new items and purge the oldest ones over quota; runs off the GUI thread"""
+        with self.maintenance:
+            for entry in self.snapshot():
+                if entry['size'] is None:
+                    try:
+                        size = self.measure(self.path_of(entry))
+                    except OSError:
+                        size = 0
+                    self.append({'op': 'size', 'id': entry['id'], 'size': size})
+            
+            # Evicted items are renamed aside first, so the slow delete happens outside the lock
+            with self.lock:
+                entries = list(self.entries.values())
+                total = sum(entry['size'] or 0 for entry in entries)
+                # The newest item is kept even when it alone is over quota
+                for entry in entries[:-1]:
+                    if total <= quota:
+                        break
+                    try:
+                        os.makedirs(self.expunged_path, exist_ok=True)
+                        os.rename(self.path_of(entry), os.path.join(self.expunged_path, entry['id']))
+                    except OSError:
+                        continue
+                    self.forget(entry['id'])
+                    total -= entry['size'] or 0
+            
+            if os.path.isdir(self.expunged_path):
+                for name in os.listdir(self.expunged_path):
+                    try:
+                        self.remove_path(os.path.join(self.expunged_path, name))
+                    except OSError:
+                        pass
+
+class TrashBin:
+    """Home trash plus one trash folder per filesystem, so trashing is a rename instead of a copy"""
+    
+    def __init__(self, home_path, quota=TRASH_QUOTA_BYTES):
+        self.quota = quota
+        # Earlier versions left the home trash readable by everyone
+        self.home = TrashIndex(home_path, tighten=True)
+        self.mounts_path = os.path.join(home_path, TRASH_MOUNTS_NAME)
+        # st_dev -> trash folder on that filesystem
+        self.indexes = {os.stat(home_path).st_dev: self.home}
+        # entry id -> the trash folder holding it
+        self.owners = {}
+        
+        try:
+            with open(self.mounts_path, 'r', encoding='utf-8') as f:
+                roots = [line.rstrip("\n") for line in f if line.strip()]
+        except FileNotFoundError:
+            roots = []
+        for root in roots:
+            # A drive that is not mounted right now keeps its trash to itself
+            if os.path.isdir(root):
+                try:
+                    self.indexes.setdefault(os.stat(root).st_dev, TrashIndex(root))
+                except (OSError, ValueError):
+                    pass
+        
+        for index in set(self.indexes.values()):
+            self.owners.update(dict.fromkeys(index.entries, index))
+            index.start_maintenance(self.quota)
+    
+    def mount_point(self, path):
+        path = os.path.abspath(path)
+        while not os.path.ismount(path):
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+        return path
+    
+    def trash_root(self, top):
+        """Our trash folder on the filesystem mounted at top, by XDG's rules for shared folders"""
+        info = os.lstat(top)
+        if stat.S_ISLNK(info.st_mode):
+            raise OSError(f"{top} is a symlink")
+        if os.name == 'nt':
+            return os.path.join(top, TRASH_MOUNT_DIR_NAME)
+        
+        # An admin-made .Trash is only used if it is a real folder with the sticky bit set,
+        # so no user can rename or delete another's folder inside it
+        try:
+            shared = os.lstat(os.path.join(top, ".Trash"))
+        except FileNotFoundError:
+            shared = None
+        if shared is not None and stat.S_ISDIR(shared.st_mode) and shared.st_mode & stat.S_ISVTX:
+            return os.path.join(top, ".Trash", TRASH_MOUNT_DIR_NAME)
+        
+        # Without the sticky bit, anyone who can write top could swap our folder out
+        if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH) and not info.st_mode & stat.S_ISVTX:
+            raise OSError(f"{top} is writable by other users")
+        return os.path.join(top, TRASH_MOUNT_DIR_NAME)
+    
+    def trash_for(self, path):
+        device = os.lstat(path).st_dev
+        index = self.indexes.get(device)
+        if index is None:
+            try:
+                root = self.trash_root(self.mount_point(os.path.realpath(os.path.dirname(os.path.abspath(path)))))
+                # Checked before the index creates or reads anything there
+                if os.lstat(root if os.path.lexists(root) else os.path.dirname(root)).st_dev != device:
+                    raise OSError("trash folder is on another filesystem")
+                index = TrashIndex(root)
+                with open(self.mounts_path, 'a', encoding='utf-8') as f:
+                    f.write(root + "\n")
+                self.owners.update(dict.fromkeys(index.entries, index))
+            except (OSError, ValueError):
+                # Read-only, foreign or shared filesystem: fall back to copying into the home trash
+                index = self.home
+            self.indexes[device] = index
+        return index
+    
+    def add(self, path):
+        index = self.trash_for(path)
+        entry = index.add(path)
+        self.owners[entry['id']] = index
+        index.start_maintenance(self.quota)
+        return entry
+    
+    def get(self, entry_id):
+        index = self.owners.get(entry_id)
+        return index.get(entry_id) if index else None
+    
+    def latest(self):
+        entries = [entry for entry in (index.latest() for index in set(self.indexes.values())) if entry]
+        return max(entries, key=lambda entry: entry['deleted'], default=None)
+    
+    def items(self):
+        """Entries from every trash folder, newest first"""
+        entries = [entry for index in set(self.indexes.values()) for entry in index.items()]
+        return sorted(entries, key=lambda entry: entry['deleted'], reverse=True)
+    
+    def path_of(self, entry):
+        return self.owners[entry['id']].path_of(entry)
+    
+    def forget(self, entry_id):
+        self.owners.pop(entry_id).forget(entry_id)
+    
+    def restore(self, entry_id):
+        original_path = self.owners[entry_id].restore(entry_id)
+        del self.owners[entry_id]
+        return original_path
+    
+    def purge(self, entry_id):
+        self.owners[entry_id].purge(entry_id)
+        del self.owners[entry_id]
+    
+    def clear(self):
+        for index in set(self.indexes.values()):
+            index.clear()
+        self.owners.clear()
+
 class LRDFileExplorer(QTreeView):
     file_double_clicked = pyqtSignal(str)
     folder_opened = pyqtSignal(str)
@@ -1513,13 +3387,15 @@ class LRDFileExplorer(QTreeView):
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
         self.doubleClicked.connect(self.on_double_click)
-        self.deleted_files = {}
         self.trash_path = os.path.join(os.path.expanduser("~"), ".lrd_trash")
-        os.makedirs(self.trash_path, exist_ok=True)
+        self.trash = TrashBin(self.trash_path)
     
     def setup_explorer(self):
-        self.model = QFileSystemModel()
-        self.model.setRootPath("")
+        self.model = ProjectFileModel(parent=self)
+        # Rooted at the working folder until a project is opened; the
+        # filesystem root is only listed on request
+        self.project_root = os.getcwd()
+        self.model.setRootPath(self.project_root)
         self.model.setNameFilterDisables(False)
         self.model.setNameFilters(["*.py", "*.js", "*.html", "*.css", "*.java", "*.cpp", "*.c", "*.php", "*.sh", "*.sql", "*.txt"])
         self.setModel(self.model)
@@ -1552,6 +3428,8 @@ class LRDFileExplorer(QTreeView):
         """)
     
     def set_root_path(self, path: str):
+        if path:
+            self.project_root = path
         self.model.setRootPath(path)
         self.setRootIndex(self.model.index(path))
     
@@ -1651,6 +3529,15 @@ class LRDFileExplorer(QTreeView):
         refresh_action.triggered.connect(self.refresh)
         menu.addAction(refresh_action)
         
+        # Switch between the project and the whole filesystem
+        if self.model.rootPath():
+            browse_action = QAction("💽 Browse Filesystem", self)
+            browse_action.triggered.connect(lambda: self.set_root_path(""))
+        else:
+            browse_action = QAction("📁 Back to Project", self)
+            browse_action.triggered.connect(lambda: self.set_root_path(self.project_root))
+        menu.addAction(browse_action)
+        
         # Open in terminal
         open_terminal_action = QAction("💻 Open in Terminal", self)
         if index.isValid():
@@ -1823,16 +3710,7 @@ ORDER BY column_name;
                 return
             
             basename = os.path.basename(path)
-            trash_item_path = os.path.join(self.trash_path, basename)
-            
-            counter = 1
-            while os.path.exists(trash_item_path):
-                name, ext = os.path.splitext(basename)
-                trash_item_path = os.path.join(self.trash_path, f"{name}_{counter}{ext}")
-                counter += 1
-            
-            self.deleted_files[trash_item_path] = path
-            shutil.move(path, trash_item_path)
+            self.trash.add(path)
             
             QMessageBox.information(self, "Moved to Trash", 
                                   f"'{basename}' has been moved to trash.\nYou can restore it from Trash Management.")
@@ -1845,44 +3723,48 @@ ORDER BY column_name;
     def restore_last_deleted(self):
         """Restore the last deleted file/folder"""
         try:
-            if not self.deleted_files:
+            entry = self.trash.latest()
+            if entry is None:
                 QMessageBox.information(self, "No Deleted Files", "No files to restore.")
                 return
             
-            trash_path, original_path = list(self.deleted_files.items())[-1]
-            
-            if not os.path.exists(trash_path):
-                QMessageBox.warning(self, "File Not Found", "The file no longer exists in trash.")
-                del self.deleted_files[trash_path]
-                return
-            
-            if os.path.exists(original_path):
-                reply = QMessageBox.question(
-                    self,
-                    "File Exists",
-                    f"A file already exists at '{original_path}'. Overwrite?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                )
-                if reply == QMessageBox.StandardButton.No:
-                    return
-            
-            shutil.move(trash_path, original_path)
-            del self.deleted_files[trash_path]
-            
-            QMessageBox.information(self, "Restored", f"File restored to: {original_path}")
-            self.refresh()
+            original_path = self.restore_trash_entry(entry)
+            if original_path:
+                QMessageBox.information(self, "Restored", f"File restored to: {original_path}")
+                self.refresh()
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to restore file: {str(e)}")
     
+    def restore_trash_entry(self, entry):
+        """Move a trash entry back to where it was deleted from; returns that path, or None"""
+        if not os.path.lexists(self.trash.path_of(entry)):
+            QMessageBox.warning(self, "File Not Found", "The file no longer exists in trash.")
+            self.trash.forget(entry['id'])
+            return None
+        
+        original_path = entry['original']
+        if not original_path:
+            QMessageBox.warning(self, "Unknown Location",
+                                f"'{entry['name']}' was trashed before locations were recorded and cannot be restored automatically.")
+            return None
+        
+        if os.path.exists(original_path):
+            reply = QMessageBox.question(
+                self,
+                "File Exists",
+                f"A file already exists at '{original_path}'. Overwrite?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply == QMessageBox.StandardButton.No:
+                return None
+        
+        return self.trash.restore(entry['id'])
+    
     def view_trash(self):
         """Show contents of trash folder"""
         try:
-            if not os.path.exists(self.trash_path):
-                QMessageBox.information(self, "Trash Empty", "The trash folder is empty.")
-                return
-            
-            items = os.listdir(self.trash_path)
+            items = self.trash.items()
             if not items:
                 QMessageBox.information(self, "Trash Empty", "The trash folder is empty.")
                 return
@@ -1894,11 +3776,12 @@ ORDER BY column_name;
             layout = QVBoxLayout(dialog)
             list_widget = QListWidget()
             
-            for item in items:
-                item_path = os.path.join(self.trash_path, item)
-                original_path = self.deleted_files.get(item_path, "Unknown")
-                list_item = QListWidgetItem(f"🗑️ {item} (from: {original_path})")
-                list_item.setData(Qt.ItemDataRole.UserRole, (item_path, original_path))
+            for entry in items:
+                deleted = datetime.fromtimestamp(entry['deleted']).strftime("%Y-%m-%d %H:%M")
+                list_item = QListWidgetItem(f"🗑️ {entry['name']} (from: {entry['original'] or 'Unknown'})")
+                size = self.format_size(entry['size']) if entry['size'] is not None else "Size not measured yet"
+                list_item.setToolTip(f"{size}, deleted {deleted}")
+                list_item.setData(Qt.ItemDataRole.UserRole, entry['id'])
                 list_widget.addItem(list_item)
             
             button_layout = QHBoxLayout()
@@ -1931,27 +3814,14 @@ ORDER BY column_name;
             QMessageBox.warning(self, "No Selection", "Please select an item to restore.")
             return
         
-        data = current_item.data(Qt.ItemDataRole.UserRole)
-        if not data:
+        entry = self.trash.get(current_item.data(Qt.ItemDataRole.UserRole))
+        if not entry:
             return
         
-        trash_path, original_path = data
-        
         try:
-            if os.path.exists(original_path):
-                reply = QMessageBox.question(
-                    self,
-                    "File Exists",
-                    f"A file already exists at '{original_path}'. Overwrite?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                )
-                if reply == QMessageBox.StandardButton.No:
-                    return
-            
-            shutil.move(trash_path, original_path)
-            
-            if trash_path in self.deleted_files:
-                del self.deleted_files[trash_path]
+            original_path = self.restore_trash_entry(entry)
+            if not original_path:
+                return
             
             list_widget.takeItem(list_widget.row(current_item))
             
@@ -1967,28 +3837,20 @@ ORDER BY column_name;
             QMessageBox.warning(self, "No Selection", "Please select an item to delete.")
             return
         
-        data = current_item.data(Qt.ItemDataRole.UserRole)
-        if not data:
+        entry = self.trash.get(current_item.data(Qt.ItemDataRole.UserRole))
+        if not entry:
             return
         
-        trash_path, original_path = data
-        
         reply = QMessageBox.question(
             self,
             "Permanent Delete",
-            f"Permanently delete '{os.path.basename(trash_path)}'?\nThis action cannot be undone!",
+            f"Permanently delete '{entry['name']}'?\nThis action cannot be undone!",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                if os.path.isdir(trash_path):
-                    shutil.rmtree(trash_path)
-                else:
-                    os.remove(trash_path)
-                
-                if trash_path in self.deleted_files:
-                    del self.deleted_files[trash_path]
+                self.trash.purge(entry['id'])
                 
                 list_widget.takeItem(list_widget.row(current_item))
                 
@@ -1997,7 +3859,7 @@ ORDER BY column_name;
     
     def empty_trash(self):
         """Empty the entire trash folder"""
-        if not os.path.exists(self.trash_path):
+        if not self.trash.items():
             QMessageBox.information(self, "Trash Empty", "The trash folder is already empty.")
             return
         
@@ -2010,14 +3872,7 @@ ORDER BY column_name;
         
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                for item in os.listdir(self.trash_path):
-                    item_path = os.path.join(self.trash_path, item)
-                    if os.path.isdir(item_path):
-                        shutil.rmtree(item_path)
-                    else:
-                        os.remove(item_path)
-                
-                self.deleted_files.clear()
+                self.trash.clear()
                 
                 QMessageBox.information(self, "Trash Emptied", "All items have been permanently deleted.")
                 
@@ -2086,7 +3941,7 @@ ORDER BY column_name;
                 try:
                     with open(file_path, 'w') as f:
                         f.write("")
-                    self.refresh()
+                    self.model.refresh_path(parent_dir)
                     new_index = self.model.index(file_path)
                     self.setCurrentIndex(new_index)
                 except Exception as e:
@@ -2114,18 +3969,26 @@ ORDER BY column_name;
                 folder_path = os.path.join(parent_dir, foldername)
                 try:
                     os.makedirs(folder_path, exist_ok=True)
-                    self.refresh()
+                    self.model.refresh_path(parent_dir)
                     new_index = self.model.index(folder_path)
                     self.setCurrentIndex(new_index)
                 except Exception as e:
                     QMessageBox.critical(self, "Error", f"Failed to create folder: {str(e)}")
     
     def refresh(self):
-        self.model.setRootPath(self.model.rootPath())
+        self.model.refresh()
     
     def open_in_terminal(self, path):
         return path
     
+    def format_size(self, size):
+        # Convert size to human readable format
+        for unit in ['B', 'KB', 'MB', 'GB']:
+            if size < 1024.0:
+                return f"{size:.2f} {unit}"
+            size /= 1024.0
+        return f"{size:.2f} TB"
+    
     def show_properties(self, path):
         """Show file/folder properties"""
         try:
@@ -2137,17 +4000,11 @@ ORDER BY column_name;
             is_dir = os.path.isdir(path)
             item_type = "Directory" if is_dir else "File"
             
-            if is_dir:
-                file_count = sum(1 for _ in os.listdir(path))
-                size_info = f"{file_count} items"
-            else:
-                for unit in ['B', 'KB', 'MB', 'GB']:
-                    if size < 1024.0:
-                        size_info = f"{size:.2f} {unit}"
-                        break
-                    size /= 1024.0
+            # Folder totals are added up in the background while the dialog is open
+            size_info = "Calculating..." if is_dir else self.format_size(size)
             
-            properties_text = f"""
+            def properties_html(size_info):
+                return f"""
 <span style='color:{MODERN_GAMER_THEME['primary']}; font-size:14px;'>📊 Properties</span><br><br>
 <span style='color:{MODERN_GAMER_THEME['secondary']}'>Name:</span> {os.path.basename(path)}<br>
 <span style='color:{MODERN_GAMER_THEME['secondary']}'>Type:</span> {item_type}<br>
@@ -2158,6 +4015,8 @@ ORDER BY column_name;
 <span style='color:{MODERN_GAMER_THEME['secondary']}'>Permissions:</span> {oct(stats.st_mode)[-3:]}<br>
 """
             
+            properties_text = properties_html(size_info)
+            
             dialog = QDialog(self)
             dialog.setWindowTitle("Properties")
             dialog.setFixedSize(350, 250)
@@ -2174,11 +4033,778 @@ ORDER BY column_name;
             layout.addWidget(text_edit)
             layout.addWidget(close_btn)
             
+            if is_dir:
+                scanner = DiskUsageScanner(path, dialog)
+                
+                def show_totals(size, files, folders, state="counting..."):
+                    text_edit.setHtml(properties_html(
+                        f"{self.format_size(size)} in {files:,} files, {folders:,} folders ({state})"))
+                
+                scanner.progress.connect(show_totals)
+                scanner.finished.connect(lambda size, files, folders, cancelled: show_totals(
+                    size, files, folders, "stopped" if cancelled else "done"))
+                # Closing the dialog stops the scan
+                dialog.finished.connect(scanner.cancel)
+                scanner.start()
+            
             dialog.exec()
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to get properties: {str(e)}")
 
+# ==================== FIND IN FILES ====================
+
+# Per-project search indexes live here, one file per project folder
+SEARCH_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".lrd_index")
+SEARCH_INDEX_VERSION = 1
+# Bigger files are still searched, just read on every query instead of indexed
+SEARCH_INDEX_MAX_FILE_BYTES = 1024 * 1024
+# Cap on (trigram, file) pairs per project, roughly 4 bytes each on disk
+SEARCH_INDEX_MAX_POSTINGS = 30000000
+# Posting lists this many times longer than the candidate set are probed instead of intersected
+SEARCH_PROBE_RATIO = 16
+# Matching lines shown per query
+SEARCH_MAX_RESULTS = 2000
+# Seconds before a query also kicks off a rescan for files changed outside the editor
+SEARCH_RESCAN_INTERVAL = 30
+# How often the panel picks up new results
+SEARCH_POLL_MS = 50
+# Quiet period after typing before the query runs
+SEARCH_TYPE_DELAY_MS = 300
+# Files handed to a worker process at a time when searching without an index
+GREP_BATCH_FILES = 64
+# Worker processes for searches without an index
+GREP_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+# Replace All rewrites matches closer together than this as one edit
+REPLACE_MERGE_GAP = 256
+# Characters QTextDocument counts as two positions, since it indexes UTF-16 code units
+ASTRAL_CHAR = re.compile('[\U00010000-\U0010FFFF]')
+# Inline flags such as (?x) or (?a:...); only i, m and s leave literal text as it is
+INLINE_FLAGS = re.compile(r'\(\?([aiLmsux-]+)[:)]')
+
+def required_literals(pattern):
+    """Literal runs every match of a regex must contain, or [] when none can be proven"""
+    # Verbose mode turns whitespace and # comments into syntax; with it or the
+    # rarer flags no literal is promised, so every file gets searched
+    if any(set(flags) - set('ims-') for flags in INLINE_FLAGS.findall(pattern)):
+        return []
+    runs, run = [], ""
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            escaped = pattern[i + 1:i + 2]
+            i += 2
+            if not escaped or escaped.isalnum():
+                # \d, \b, \1 and friends are not literal text; skip the arguments of \x41, \u.., \N{..}, \12
+                if escaped in 'xuU':
+                    i += {'x': 2, 'u': 4, 'U': 8}[escaped]
+                elif escaped == 'N':
+                    i = pattern.find('}', i) + 1 or len(pattern)
+                elif escaped.isdigit():
+                    while pattern[i:i + 1].isdigit():
+                        i += 1
+                runs.append(run)
+                run = ""
+                continue
+            c = escaped
+        elif c == '|' and depth == 0:
+            # With a top-level alternation no single literal is required
+            return []
+        elif c in '()':
+            depth += 1 if c == '(' else -1
+            runs.append(run)
+            run = ""
+            i += 1
+            continue
+        elif c == '[':
+            # A ] right after [ or [^ is a literal member of the class
+            i += 2 if pattern[i + 1:i + 2] == '^' else 1
+            i += 1 if pattern[i:i + 1] == ']' else 0
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            i += 1
+            runs.append(run)
+            run = ""
+            continue
+        elif c in '.^$':
+            runs.append(run)
+            run = ""
+            i += 1
+            continue
+        elif c in '*?{+':
+            # The quantified character may be absent (or repeated, for +)
+            if c != '+':
+                run = run[:-1]
+            if c == '{':
+                i = pattern.find('}', i) + 1 or len(pattern)
+            else:
+                i += 1
+            runs.append(run)
+            run = ""
+            continue
+        else:
+            i += 1
+        # Characters inside groups may be optional or alternated, so only top level counts
+        if depth == 0:
+            run += c
+    runs.append(run)
+    return [run for run in runs if len(run) >= 3]
+
+def walk_project(root, skip_dirs, stopped):
+    """Yield a DirEntry for every file under root, never entering skip_dirs"""
+    stack = [root]
+    while stack and not stopped.is_set():
+        folder = stack.pop()
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in skip_dirs:
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+def match_lines(regex, text, limit):
+    """(line number, line) for each line of text with a match, at most limit of them"""
+    # Newlines are counted only between matches, and each line is reported once
+    lines = []
+    line_no, counted, line_end = 1, 0, -1
+    for match in regex.finditer(text):
+        start = match.start()
+        if start <= line_end:
+            continue
+        line_no += text.count('\n', counted, start)
+        counted = start
+        line_start = text.rfind('\n', 0, start) + 1
+        line_end = text.find('\n', start)
+        if line_end < 0:
+            line_end = len(text)
+        lines.append((line_no, text[line_start:line_end]))
+        if len(lines) >= limit:
+            break
+    return lines
+
+def grep_file(path, regex, limit):
+    """Matching lines of one file and the bytes read; binary files are skipped after their first 8 KB"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(8192)
+            if b'\0' in data:
+                return [], 0
+            data += f.read()
+    except OSError:
+        return [], 0
+    return match_lines(regex, data.decode('utf-8', errors='replace'), limit), len(data)
+
+def grep_batch(paths, pattern, flags, limit):
+    """Worker process entry point: search a batch of files"""
+    regex = re.compile(pattern, flags)
+    matches, files, size = [], 0, 0
+    for path in paths:
+        lines, read = grep_file(path, regex, limit - len(matches))
+        if read:
+            files += 1
+            size += read
+        matches.extend((path, line_no, line) for line_no, line in lines)
+        if len(matches) >= limit:
+            break
+    return matches, files, size
+
+def compile_query(query, regex=False, case_sensitive=False):
+    """Compile a Find in Files query; raises re.error for a bad pattern"""
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    return re.compile(query if regex else re.escape(query), flags)
+
+def document_position(text):
+    """Function mapping an index into text to a QTextDocument position"""
+    astral = [] if text.isascii() else [match.start() for match in ASTRAL_CHAR.finditer(text)]
+    if not astral:
+        return lambda index: index
+    return lambda index: index + bisect_left(astral, index)
+
+def find_match_positions(text, regex, stopped=None):
+    """Start and end document positions of every match in text; None once stopped is set"""
+    position = document_position(text)
+    starts, ends = array('q'), array('q')
+    for count, match in enumerate(regex.finditer(text)):
+        if stopped is not None and count % 4096 == 0 and stopped.is_set():
+            return None
+        starts.append(position(match.start()))
+        ends.append(position(match.end()))
+    return starts, ends
+
+def plan_replacements(text, regex, template, expand=False):
+    """Every match in text as (start, end, new text) document edits, nearby matches merged; raises re.error for a bad template"""
+    position = document_position(text)
+    edits = []
+    count = 0
+    start = end = None
+    pieces = []
+    for match in regex.finditer(text):
+        if end is not None and match.start() - end <= REPLACE_MERGE_GAP:
+            pieces.append(text[end:match.start()])
+        else:
+            if end is not None:
+                edits.append((position(start), position(end), "".join(pieces)))
+            start = match.start()
+            pieces = []
+        pieces.append(match.expand(template) if expand else template)
+        end = match.end()
+        count += 1
+    if end is not None:
+        edits.append((position(start), position(end), "".join(pieces)))
+    return edits, count
+
+def document_text(document):
+    """A QTextDocument's text as stored; toPlainText turns no-break spaces and line separators into spaces and newlines"""
+    # Paragraph separators become newlines one for one, so positions still line up
+    return document.toRawText().replace('\u2029', '\n')
+
+def apply_replacements(document, edits):
+    """Apply plan_replacements edits to document as a single undo step"""
+    cursor = QTextCursor(document)
+    cursor.beginEditBlock()
+    # Back to front, so the positions still to come are not shifted
+    for start, end, new_text in reversed(edits):
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(new_text)
+    cursor.endEditBlock()
+
+class FileSearch:
+    """One query over index candidates, run on a background thread; matches pile up in results for the panel"""
+    
+    indexed = True
+    
+    def __init__(self, root, paths, regex):
+        self.root = root
+        self.paths = paths
+        self.regex = regex
+        self.results = []  # (path, line number, line text)
+        self.files_read = 0
+        self.bytes_read = 0
+        self.cancelled = threading.Event()
+        self.done = False
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+    
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+    
+    def cancel(self):
+        self.cancelled.set()
+    
+    def run(self):
+        for rel_path in self.paths:
+            if self.cancelled.is_set() or len(self.results) >= SEARCH_MAX_RESULTS:
+                break
+            path = os.path.join(self.root, rel_path)
+            lines, size = grep_file(path, self.regex, SEARCH_MAX_RESULTS - len(self.results))
+            if size:
+                self.files_read += 1
+                self.bytes_read += size
+            self.results.extend((path, line_no, line) for line_no, line in lines)
+        self.elapsed = time.perf_counter() - self.started
+        self.done = True
+
+class ParallelGrep:
+    """Search without an index: walk the tree and fan file reads out over worker processes, streaming matches back"""
+    
+    indexed = False
+    # Shared by every search and started on first use
+    pool = None
+    
+    def __init__(self, root, regex, skip_dirs=EXPLORER_SKIP_DIRS):
+        self.root = root
+        self.regex = regex
+        self.skip_dirs = set(skip_dirs)
+        self.results = []  # (path, line number, line text)
+        self.files_read = 0
+        self.bytes_read = 0
+        self.cancelled = threading.Event()
+        self.done = False
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.pending = set()
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def get_pool(cls):
+        if cls.pool is None:
+            # Workers are forked from a single-threaded fork server, never from this process
+            # with its GUI and pool threads; spawn where there is no fork server
+            method = 'forkserver' if sys.platform.startswith('linux') else 'spawn'
+            cls.pool = ProcessPoolExecutor(max_workers=GREP_WORKERS, mp_context=multiprocessing.get_context(method))
+            if method == 'forkserver':
+                multiprocessing.forkserver.ensure_running()
+        return cls.pool
+    
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+    
+    def cancel(self):
+        self.cancelled.set()
+        with self.lock:
+            pending = list(self.pending)
+        for future in pending:
+            future.cancel()
+    
+    def run(self):
+        try:
+            pool = self.get_pool()
+            batch = []
+            for entry in walk_project(self.root, self.skip_dirs, self.cancelled):
+                batch.append(entry.path)
+                if len(batch) >= GREP_BATCH_FILES:
+                    self.submit(pool, batch)
+                    batch = []
+            if batch and not self.cancelled.is_set():
+                self.submit(pool, batch)
+            with self.lock:
+                pending = list(self.pending)
+            wait(pending)
+        except Exception as e:
+            print(f"Error searching files: {e}")
+        finally:
+            self.elapsed = time.perf_counter() - self.started
+            self.done = True
+    
+    def submit(self, pool, batch):
+        # A short queue keeps the walk just ahead of the workers, so cancelling leaves little behind
+        while not self.cancelled.is_set():
+            with self.lock:
+                pending = list(self.pending)
+            if len(pending) < GREP_WORKERS * 2:
+                break
+            wait(pending, return_when=FIRST_COMPLETED)
+        if self.cancelled.is_set():
+            return
+        future = pool.submit(grep_batch, batch, self.regex.pattern, self.regex.flags, SEARCH_MAX_RESULTS)
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self.collect)
+    
+    def collect(self, future):
+        with self.lock:
+            self.pending.discard(future)
+        if future.cancelled() or self.cancelled.is_set():
+            return
+        try:
+            matches, files, size = future.result()
+        except Exception:
+            return
+        self.results.extend(matches[:SEARCH_MAX_RESULTS - len(self.results)])
+        self.files_read += files
+        self.bytes_read += size
+        if len(self.results) >= SEARCH_MAX_RESULTS:
+            self.cancelled.set()
+
+class TrigramIndex:
+    """On-disk trigram index of a project folder; queries narrow to candidate files before any are read"""
+    
+    def __init__(self, root, skip_dirs=EXPLORER_SKIP_DIRS):
+        self.root = os.path.abspath(root)
+        self.skip_dirs = set(skip_dirs)
+        name = hashlib.sha1(self.root.encode('utf-8')).hexdigest()[:16]
+        self.index_path = os.path.join(SEARCH_INDEX_DIR, name + ".idx")
+        
+        # File ids only grow; a changed file gets a new id and its old one is marked dead
+        self.paths = []  # id -> path relative to root, None once dead
+        self.ids = {}  # path -> current id
+        self.stamps = {}  # path -> (mtime_ns, size) when last looked at
+        self.postings = {}  # casefolded trigram -> ascending array of ids
+        # Too big, or past the postings cap: read on every query instead
+        self.unindexed = set()
+        self.total_postings = 0
+        self.dead = 0
+        
+        self.lock = threading.RLock()
+        self.stopped = threading.Event()
+        self.building = False
+        # Set once the saved index is loaded or a first scan finished; until then queries grep instead
+        self.ready = False
+        self.last_scan = 0.0
+        self.progress = 0
+    
+    # ---- Building ----
+    
+    def start(self):
+        """Load the saved index, then bring it up to date, all off the GUI thread"""
+        self.building = True
+        threading.Thread(target=self.run, args=(True,), daemon=True).start()
+    
+    def rescan(self):
+        if not self.building:
+            self.building = True
+            threading.Thread(target=self.run, args=(False,), daemon=True).start()
+    
+    def stop(self):
+        self.stopped.set()
+    
+    def run(self, load):
+        try:
+            if load:
+                self.load()
+            if self.refresh():
+                self.save()
+        except Exception as e:
+            print(f"Error updating search index: {e}")
+        finally:
+            self.last_scan = time.time()
+            self.ready = not self.stopped.is_set()
+            self.building = False
+    
+    def load(self):
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ValueError):
+            return
+        if data.get('version') != SEARCH_INDEX_VERSION or data.get('root') != self.root:
+            return
+        with self.lock:
+            self.paths = data['paths']
+            self.ids = {path: file_id for file_id, path in enumerate(self.paths) if path is not None}
+            self.stamps = data['stamps']
+            self.postings = data['postings']
+            self.unindexed = data['unindexed']
+            self.total_postings = sum(len(ids) for ids in self.postings.values())
+            self.dead = self.paths.count(None)
+            self.ready = True
+    
+    def save(self):
+        with self.lock:
+            data = pickle.dumps({'version': SEARCH_INDEX_VERSION, 'root': self.root, 'paths': self.paths,
+                                 'stamps': self.stamps, 'postings': self.postings, 'unindexed': self.unindexed},
+                                protocol=pickle.HIGHEST_PROTOCOL)
+        os.makedirs(SEARCH_INDEX_DIR, exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, self.index_path)
+    
+    def walk(self):
+        """Yield (relative path, stat) for every file under the root outside skipped folders"""
+        for entry in walk_project(self.root, self.skip_dirs, self.stopped):
+            try:
+                yield os.path.relpath(entry.path, self.root), entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+    
+    def refresh(self):
+        """Index new and changed files and forget deleted ones; returns whether anything changed"""
+        changed = False
+        seen = set()
+        self.progress = 0
+        for rel_path, st in self.walk():
+            seen.add(rel_path)
+            if self.stamps.get(rel_path) != (st.st_mtime_ns, st.st_size):
+                self.index_file(rel_path, st)
+                changed = True
+                self.progress += 1
+        if self.stopped.is_set():
+            return changed
+        
+        with self.lock:
+            for rel_path in set(self.stamps) - seen:
+                self.drop(rel_path)
+                changed = True
+            if self.dead > len(self.ids):
+                self.compact()
+        return changed
+    
+    def update_file(self, path):
+        """Re-index one file right away, e.g. after the editor saved it"""
+        path = os.path.abspath(path)
+        if not path.startswith(self.root + os.sep):
+            return
+        rel_path = os.path.relpath(path, self.root)
+        try:
+            st = os.stat(path)
+        except OSError:
+            with self.lock:
+                self.drop(rel_path)
+            return
+        if any(part in self.skip_dirs for part in rel_path.split(os.sep)[:-1]):
+            return
+        self.index_file(rel_path, st)
+    
+    def index_file(self, rel_path, st):
+        try:
+            with open(os.path.join(self.root, rel_path), 'rb') as f:
+                data = f.read(SEARCH_INDEX_MAX_FILE_BYTES + 1)
+        except OSError:
+            return
+        # Binary files are never searched
+        if b'\0' in data[:8192]:
+            with self.lock:
+                self.drop(rel_path)
+                self.stamps[rel_path] = (st.st_mtime_ns, st.st_size)
+            return
+        
+        grams = None
+        if len(data) <= SEARCH_INDEX_MAX_FILE_BYTES:
+            text = data.decode('utf-8', errors='replace').casefold()
+            grams = {text[i:i + 3] for i in range(len(text) - 2)}
+        with self.lock:
+            self.drop(rel_path)
+            self.stamps[rel_path] = (st.st_mtime_ns, st.st_size)
+            if grams is None or self.total_postings + len(grams) > SEARCH_INDEX_MAX_POSTINGS:
+                self.unindexed.add(rel_path)
+                return
+            file_id = len(self.paths)
+            self.paths.append(rel_path)
+            self.ids[rel_path] = file_id
+            postings = self.postings
+            for gram in grams:
+                ids = postings.get(gram)
+                if ids is None:
+                    postings[gram] = array('I', (file_id,))
+                else:
+                    ids.append(file_id)
+            self.total_postings += len(grams)
+    
+    def drop(self, rel_path):
+        self.stamps.pop(rel_path, None)
+        self.unindexed.discard(rel_path)
+        file_id = self.ids.pop(rel_path, None)
+        if file_id is not None:
+            self.paths[file_id] = None
+            self.dead += 1
+    
+    def compact(self):
+        """Renumber live files and drop dead ids from every posting list"""
+        renumber = {}
+        paths = []
+        for file_id, path in enumerate(self.paths):
+            if path is not None:
+                renumber[file_id] = len(paths)
+                paths.append(path)
+        postings = {}
+        total = 0
+        for gram, ids in self.postings.items():
+            live = array('I', (renumber[file_id] for file_id in ids if file_id in renumber))
+            if live:
+                postings[gram] = live
+                total += len(live)
+        self.paths = paths
+        self.ids = {path: file_id for file_id, path in enumerate(paths)}
+        self.postings = postings
+        self.total_postings = total
+        self.dead = 0
+    
+    # ---- Querying ----
+    
+    def candidates(self, literals):
+        """Relative paths of files that may contain every literal, in path order"""
+        grams = {literal[i:i + 3] for literal in literals for i in range(len(literal) - 2)}
+        with self.lock:
+            if not grams:
+                paths = list(self.ids)
+            else:
+                empty = array('I')
+                lists = sorted((self.postings.get(gram, empty) for gram in grams), key=len)
+                ids = set(lists[0])
+                for more in lists[1:]:
+                    if not ids:
+                        break
+                    if len(more) > SEARCH_PROBE_RATIO * len(ids):
+                        ids = {file_id for file_id in ids if self.contains(more, file_id)}
+                    else:
+                        ids.intersection_update(more)
+                paths = [self.paths[file_id] for file_id in ids if self.paths[file_id] is not None]
+            paths.extend(self.unindexed)
+        paths.sort()
+        return paths
+    
+    def contains(self, ids, file_id):
+        pos = bisect_left(ids, file_id)
+        return pos < len(ids) and ids[pos] == file_id
+    
+    def search(self, query, regex=False, case_sensitive=False):
+        """Start a FileSearch for query; raises re.error for a bad pattern"""
+        compiled = compile_query(query, regex, case_sensitive)
+        literals = required_literals(query) if regex else [query]
+        if time.time() - self.last_scan > SEARCH_RESCAN_INTERVAL:
+            self.rescan()
+        paths = self.candidates([literal.casefold() for literal in literals])
+        return FileSearch(self.root, paths, compiled).start()
+
+class FindInFilesPanel(QDockWidget):
+    """Project-wide search panel backed by the project's TrigramIndex"""
+    
+    open_location = pyqtSignal(str, int)  # path, line
+    
+    def __init__(self, root_path=None, parent=None):
+        super().__init__("🔎 Find in Files", parent)
+        # Where to grep while there is no index, usually the explorer's root
+        self.root_path = root_path or (lambda: "")
+        self.index = None
+        self.search = None
+        self.shown = 0
+        self.file_items = {}
+        
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(SEARCH_POLL_MS)
+        self.poll_timer.timeout.connect(self.poll)
+        
+        # Search as you type, once typing pauses; a new query cancels the running one
+        self.type_timer = QTimer(self)
+        self.type_timer.setSingleShot(True)
+        self.type_timer.setInterval(SEARCH_TYPE_DELAY_MS)
+        self.type_timer.timeout.connect(self.start_search)
+        
+        self.setup_ui()
+    
+    def setup_ui(self):
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        
+        query_layout = QHBoxLayout()
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("Search in project files...")
+        self.query_input.setStyleSheet(f"""
+            QLineEdit {{
+                background-color: {MODERN_GAMER_THEME['bg_darker']};
+                color: {MODERN_GAMER_THEME['text_editor']};
+                border: 1px solid {MODERN_GAMER_THEME['border']};
+                padding: 6px;
+                font-family: 'Segoe UI', 'Consolas', monospace;
+                font-size: 11px;
+            }}
+        """)
+        self.regex_check = QCheckBox(".*")
+        self.regex_check.setToolTip("Regular expression")
+        self.case_check = QCheckBox("Aa")
+        self.case_check.setToolTip("Match case")
+        query_layout.addWidget(self.query_input, 1)
+        query_layout.addWidget(self.regex_check)
+        query_layout.addWidget(self.case_check)
+        
+        self.results_tree = QTreeWidget()
+        self.results_tree.setHeaderHidden(True)
+        self.results_tree.setUniformRowHeights(True)
+        self.results_tree.setStyleSheet(f"""
+            QTreeWidget {{
+                background-color: {MODERN_GAMER_THEME['bg_dark']};
+                color: {MODERN_GAMER_THEME['text_editor']};
+                border: 1px solid {MODERN_GAMER_THEME['border']};
+                font-family: 'Consolas', monospace;
+                font-size: 11px;
+            }}
+            QTreeWidget::item:selected {{
+                background-color: {MODERN_GAMER_THEME['selection']};
+                color: #ffffff;
+            }}
+        """)
+        
+        self.status_label = QLabel("Open a folder to search it")
+        self.status_label.setStyleSheet(f"color: {MODERN_GAMER_THEME['text_secondary']}; padding: 2px;")
+        
+        layout.addLayout(query_layout)
+        layout.addWidget(self.results_tree, 1)
+        layout.addWidget(self.status_label)
+        self.setWidget(widget)
+        
+        self.query_input.returnPressed.connect(self.start_search)
+        self.query_input.textChanged.connect(self.type_timer.start)
+        self.regex_check.toggled.connect(self.start_search)
+        self.case_check.toggled.connect(self.start_search)
+        self.results_tree.itemActivated.connect(self.open_result)
+    
+    def set_index(self, index):
+        self.cancel_search()
+        self.index = index
+        self.results_tree.clear()
+        self.status_label.setText("Type to search the project" if index else "Type to search the explorer's folder")
+        if index:
+            self.poll_timer.start()
+    
+    def focus_query(self, text=""):
+        if text:
+            self.query_input.setText(text)
+        self.query_input.setFocus()
+        self.query_input.selectAll()
+    
+    def cancel_search(self):
+        if self.search:
+            self.search.cancel()
+            self.search = None
+    
+    def start_search(self):
+        self.type_timer.stop()
+        self.cancel_search()
+        self.results_tree.clear()
+        self.file_items = {}
+        self.shown = 0
+        query = self.query_input.text()
+        if not query:
+            return
+        try:
+            if self.index and self.index.ready:
+                self.search = self.index.search(query, self.regex_check.isChecked(), self.case_check.isChecked())
+            else:
+                root = self.index.root if self.index else self.root_path()
+                if not root:
+                    self.status_label.setText("Open a folder to search it")
+                    return
+                regex = compile_query(query, self.regex_check.isChecked(), self.case_check.isChecked())
+                self.search = ParallelGrep(root, regex).start()
+        except re.error as e:
+            self.status_label.setText(f"Invalid regular expression: {e}")
+            return
+        self.poll_timer.start()
+    
+    def poll(self):
+        search = self.search
+        if search:
+            results = search.results[self.shown:]
+            self.shown += len(results)
+            for path, line_no, line in results:
+                file_item = self.file_items.get(path)
+                if file_item is None:
+                    file_item = QTreeWidgetItem(self.results_tree, [os.path.relpath(path, search.root)])
+                    file_item.setData(0, Qt.ItemDataRole.UserRole, (path, 1))
+                    file_item.setExpanded(True)
+                    self.file_items[path] = file_item
+                item = QTreeWidgetItem(file_item, [f"{line_no}: {line.strip()[:200]}"])
+                item.setData(0, Qt.ItemDataRole.UserRole, (path, line_no))
+        
+        status = ""
+        if search:
+            elapsed = search.elapsed if search.done else time.perf_counter() - search.started
+            megabytes = search.bytes_read / (1024 * 1024)
+            status = f"{self.shown} matches in {len(self.file_items)} files"
+            if not search.indexed:
+                status += " (no index yet, scanning)"
+            status += (f" · {search.files_read} files, {megabytes:.1f} MB read at "
+                       f"{megabytes / max(elapsed, 0.001):.0f} MB/s")
+            if search.done:
+                status += f" in {elapsed * 1000:.0f} ms"
+                if self.shown >= SEARCH_MAX_RESULTS:
+                    status += ", showing the first results only"
+        if self.index and self.index.building:
+            status += f"{' · ' if status else ''}Indexing project ({self.index.progress} files)..."
+        if status:
+            self.status_label.setText(status)
+        
+        if (not search or search.done) and not (self.index and self.index.building):
+            self.poll_timer.stop()
+    
+    def open_result(self, item):
+        data = item.data(0, Qt.ItemDataRole.UserRole)
+        if data:
+            self.open_location.emit(*data)
+
 # ==================== AI ASSISTANT PANEL ====================
 
 class AIAssistantPanel(QDockWidget):
@@ -2362,6 +4988,23 @@ class AIAssistantPanel(QDockWidget):
         for suggestion in suggestions:
             self.suggestions_list.addItem(suggestion)
 
+# ==================== LAZY WIDGETS ====================
+
+class LazyWidget:
+    """Builds a rarely used widget on first use and hands back the same one afterwards"""
+    
+    def __init__(self, factory):
+        self.factory = factory
+        self.widget = None
+    
+    def get(self):
+        if self.widget is None:
+            self.widget = self.factory()
+        return self.widget
+    
+    def is_created(self):
+        return self.widget is not None
+
 # ==================== MAIN WINDOW WITH ADVANCED FEATURES ====================
 
 class LRDCodeEditor(QMainWindow):
@@ -2433,6 +5076,14 @@ class LRDCodeEditor(QMainWindow):
         self.replace_dialog = None
         self.find_text_input = ""  # Changed from find_text to avoid conflict
         self.replace_text_input = ""  # Changed from replace_text to avoid conflict
+        self.search_index = None
+        
+        # Rarely used UI, built on first use
+        self.ai_assistant = LazyWidget(self.create_ai_assistant)
+        self.find_in_files = LazyWidget(self.create_find_in_files)
+        self.documentation_dialog = LazyWidget(self.create_documentation_dialog)
+        self.shortcuts_dialog = LazyWidget(self.create_shortcuts_dialog)
+        self.about_dialog = LazyWidget(self.create_about_dialog)
     
     def setup_ui(self):
         main_widget = QWidget()
@@ -2453,9 +5104,6 @@ class LRDCodeEditor(QMainWindow):
         
         # Status bar
         self.create_status_bar()
-        
-        # AI Assistant Panel
-        self.create_ai_assistant()
     
     def create_title_bar(self, parent_layout):
         title_bar = QWidget()
@@ -2790,16 +5438,17 @@ class LRDCodeEditor(QMainWindow):
     
     def create_ai_assistant(self):
         """Create AI Assistant dock widget"""
-        self.ai_assistant = AIAssistantPanel()
-        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.ai_assistant)
-        self.ai_assistant.setVisible(True)
+        ai_assistant = AIAssistantPanel()
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, ai_assistant)
+        ai_assistant.setVisible(True)
         
         # Connect AI assistant to editor
-        self.ai_assistant.suggestion_requested.connect(self.handle_ai_suggestion_request)
+        ai_assistant.suggestion_requested.connect(self.handle_ai_suggestion_request)
+        return ai_assistant
     
     def handle_ai_suggestion_request(self, language: str, context: str):
         """Handle AI suggestion requests"""
-        self.ai_assistant.update_suggestions(language, context)
+        self.ai_assistant.get().update_suggestions(language, context)
     
     def suggest_terminal_command(self):
         """AI suggest terminal commands"""
@@ -2993,6 +5642,11 @@ class LRDCodeEditor(QMainWindow):
         replace_action.triggered.connect(self.show_replace_dialog)  # Fixed: Changed from replace_text to show_replace_dialog
         edit_menu.addAction(replace_action)
         
+        find_in_files_action = QAction("🔎 Find in Files...", self)
+        find_in_files_action.setShortcut("Ctrl+Alt+F")
+        find_in_files_action.triggered.connect(self.show_find_in_files)
+        edit_menu.addAction(find_in_files_action)
+        
         # AI Edit submenu
         ai_edit_menu = QMenu("🤖 AI Edit", self)
         
@@ -3333,19 +5987,34 @@ class LRDCodeEditor(QMainWindow):
             return
         
         language = info['language']
-        content = editor.toPlainText()
         cursor = editor.textCursor()
-        cursor_pos = cursor.position()
+        # Only the current line is read; the document's words are counted in the background
+        line = cursor.block().text()
+        column = cursor.positionInBlock()
         
-        suggestions = self.ai_completion.get_suggestions(content, language, cursor_pos)
+        suggestions = self.ai_completion.get_suggestions(line, column, language, editor.document())
         
         if suggestions:
             # Show suggestions in AI panel
-            self.ai_assistant.update_suggestions(language, content[max(0, cursor_pos-50):cursor_pos])
+            self.ai_assistant.get().update_suggestions(language, line[max(0, column-50):column])
             self.ai_status_bar.setText("🤖 AI: Suggestions available")
+            
+            menu = QMenu(editor)
+            for suggestion in suggestions:
+                menu.addAction(suggestion, lambda word=suggestion: self.accept_completion(editor, language, word))
+            menu.popup(editor.viewport().mapToGlobal(editor.cursorRect().bottomLeft()))
         else:
             self.ai_status_bar.setText("🤖 AI: No suggestions")
     
+    def accept_completion(self, editor, language, word):
+        """Replace the word fragment before the cursor with a chosen suggestion"""
+        cursor = editor.textCursor()
+        typed = self.ai_completion.get_current_word(cursor.block().text(), cursor.positionInBlock())
+        cursor.movePosition(QTextCursor.MoveOperation.Left, QTextCursor.MoveMode.KeepAnchor, len(typed))
+        cursor.insertText(word)
+        editor.setTextCursor(cursor)
+        self.ai_completion.note_used(word, language)
+    
     def ai_refactor_code(self):
         """AI code refactoring"""
         editor = self.get_current_editor()
@@ -3382,10 +6051,10 @@ class LRDCodeEditor(QMainWindow):
     def update_ai_suggestions(self):
         """Update AI suggestions periodically"""
         editor = self.get_current_editor()
-        if editor:
+        if editor and self.ai_assistant.is_created():
             info = self.open_files.get(editor)
             if info:
-                self.ai_assistant.update_suggestions(info['language'], "")
+                self.ai_assistant.get().update_suggestions(info['language'], "")
     
     # ==================== DATABASE FUNCTIONS ====================
     
@@ -3568,6 +6237,7 @@ class LRDCodeEditor(QMainWindow):
         if os.path.isdir(path):
             self.project_path = path
             self.file_explorer.set_root_path(path)
+            self.set_search_root(path)
             self.update_status(f"Opened folder: {os.path.basename(path)}", "ready")
     
     def open_folder(self):
@@ -3575,6 +6245,7 @@ class LRDCodeEditor(QMainWindow):
         if folder:
             self.project_path = folder
             self.file_explorer.set_root_path(folder)
+            self.set_search_root(folder)
             self.update_status(f"Project: {os.path.basename(folder)}", "ready")
             self.terminal.current_dir = folder
             self.terminal.append(f"<span style='color:{MODERN_GAMER_THEME['success']}'>Terminal directory changed to: {folder}</span>")
@@ -3601,6 +6272,7 @@ class LRDCodeEditor(QMainWindow):
         
         editor.cursorPositionChanged.connect(lambda: self.update_cursor_position(editor))
         editor.textChanged.connect(lambda: self.on_text_changed(editor))
+        editor.matches_counted.connect(lambda count: self.show_match_count(editor, count))
         
         self.update_status("New file created", "ready")
         self.file_label.setText("📄 Untitled")
@@ -3636,6 +6308,18 @@ class LRDCodeEditor(QMainWindow):
         if file_path:
             self.open_file(file_path)
     
+    def open_paths(self, paths):
+        """Open files given on the command line or handed over by a second launch"""
+        if not paths:
+            return
+        for path in paths:
+            if os.path.isfile(path):
+                self.open_file(path)
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+    
     def open_file(self, file_path: str):
         # Check if file is already open
         for editor, info in self.open_files.items():
@@ -3647,8 +6331,11 @@ class LRDCodeEditor(QMainWindow):
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
+            large_file = os.path.getsize(file_path) > LARGE_FILE_BYTES
             
             editor = LRDCustomEditor()
+            if large_file:
+                editor.enable_lazy_highlighting()
             editor.setPlainText(content)
             
             filename = os.path.basename(file_path)
@@ -3664,6 +6351,7 @@ class LRDCodeEditor(QMainWindow):
             
             editor.cursorPositionChanged.connect(lambda: self.update_cursor_position(editor))
             editor.textChanged.connect(lambda: self.on_text_changed(editor))
+            editor.matches_counted.connect(lambda count: self.show_match_count(editor, count))
             
             self.set_editor_language(editor, self.open_files[editor]['language'])
             
@@ -3690,6 +6378,7 @@ class LRDCodeEditor(QMainWindow):
                 
                 info['saved'] = True
                 info['modified'] = False
+                self.update_search_index(info['path'])
                 
                 self.update_status(f"Saved: {os.path.basename(info['path'])}", "ready")
                 self.update_tab_title(editor)
@@ -3707,6 +6396,7 @@ class LRDCodeEditor(QMainWindow):
                         f.write(editor.toPlainText())
                     info['saved'] = True
                     info['modified'] = False
+                    self.update_search_index(info['path'])
                     self.update_tab_title(editor)
                 except:
                     pass
@@ -3740,6 +6430,7 @@ class LRDCodeEditor(QMainWindow):
             try:
                 with open(file_path, 'w', encoding='utf-8') as f:
                     f.write(editor.toPlainText())
+                self.update_search_index(file_path)
                 
                 info = self.open_files.get(editor)
                 if info:
@@ -3823,6 +6514,9 @@ class LRDCodeEditor(QMainWindow):
                     
                     self.update_cursor_position(widget)
                     widget.setFocus()
+                    
+                    if self.find_dialog and self.find_dialog.isVisible():
+                        self.highlight_find_matches()
     
     def update_tab_title(self, editor):
         info = self.open_files.get(editor)
@@ -3842,6 +6536,7 @@ class LRDCodeEditor(QMainWindow):
             info['modified'] = True
             self.update_tab_title(editor)
             self.update_line_count(editor)
+            self.ai_completion.note_edited(editor.document())
     
     def update_cursor_position(self, editor=None):
         if not editor:
@@ -3889,6 +6584,46 @@ class LRDCodeEditor(QMainWindow):
         if editor:
             editor.selectAll()
     
+    def create_find_in_files(self):
+        """Create the Find in Files dock, tabbed with the terminal"""
+        panel = FindInFilesPanel(self.file_explorer.model.rootPath, self)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, panel)
+        self.tabifyDockWidget(self.terminal_dock, panel)
+        panel.open_location.connect(self.open_location)
+        panel.set_index(self.search_index)
+        return panel
+    
+    def show_find_in_files(self):
+        panel = self.find_in_files.get()
+        panel.show()
+        panel.raise_()
+        editor = self.get_current_editor()
+        panel.focus_query(editor.textCursor().selectedText() if editor else "")
+    
+    def set_search_root(self, path):
+        """Index the opened folder for Find in Files"""
+        if self.search_index and self.search_index.root == os.path.abspath(path):
+            return
+        if self.search_index:
+            self.search_index.stop()
+        self.search_index = TrigramIndex(path)
+        self.search_index.start()
+        if self.find_in_files.is_created():
+            self.find_in_files.get().set_index(self.search_index)
+    
+    def update_search_index(self, path):
+        if self.search_index:
+            self.search_index.update_file(path)
+    
+    def open_location(self, path, line):
+        self.open_file(path)
+        editor = self.get_current_editor()
+        if editor and self.open_files[editor]['path'] == path:
+            block = editor.document().findBlockByNumber(line - 1)
+            editor.setTextCursor(QTextCursor(block))
+            editor.centerCursor()
+            editor.setFocus()
+    
     def show_find_dialog(self):  # Fixed: Renamed from find_text
         editor = self.get_current_editor()
         if not editor:
@@ -3913,6 +6648,10 @@ class LRDCodeEditor(QMainWindow):
             find_next_btn.clicked.connect(self.find_next)
             find_prev_btn.clicked.connect(self.find_previous)
             close_btn.clicked.connect(self.find_dialog.close)
+            # Search as you type; highlights go away with the dialog
+            self.find_input.textChanged.connect(self.highlight_find_matches)
+            self.find_input.returnPressed.connect(self.find_next)
+            self.find_dialog.finished.connect(self.clear_find_matches)
             
             button_box.addWidget(find_next_btn)
             button_box.addWidget(find_prev_btn)
@@ -3926,6 +6665,39 @@ class LRDCodeEditor(QMainWindow):
         self.find_dialog.raise_()
         self.find_dialog.activateWindow()
         self.find_input.setFocus()
+        self.highlight_find_matches()
+    
+    def highlight_find_matches(self):
+        """Highlight the Find query's matches in the current editor only"""
+        editor = self.get_current_editor()
+        for other in self.open_files:
+            if other is not editor and other.find_regex is not None:
+                other.set_find_regex(None)
+        if not editor:
+            return
+        
+        self.find_text_input = self.find_input.text()
+        # Case-insensitive and literal, like editor.find
+        editor.set_find_regex(compile_query(self.find_text_input) if self.find_text_input else None)
+    
+    def clear_find_matches(self):
+        for editor in self.open_files:
+            if editor.find_regex is not None:
+                editor.set_find_regex(None)
+    
+    def show_match_count(self, editor, count):
+        if editor is self.get_current_editor() and self.find_text_input:
+            self.update_status(f"{count} match{'es' if count != 1 else ''} for '{self.find_text_input}'",
+                               "ready" if count else "warning")
+    
+    def jump_to_match(self, editor, backward=False):
+        """Move to the next or previous match through the editor's match index; False until it is built"""
+        if editor.find_regex is None:
+            self.highlight_find_matches()
+        found = editor.jump_to_match(backward)
+        if found:
+            self.update_status(f"Match {found[0]} of {found[1]}", "ready")
+        return found is not None
     
     def find_next(self):
         editor = self.get_current_editor()
@@ -3935,6 +6707,8 @@ class LRDCodeEditor(QMainWindow):
         self.find_text_input = self.find_input.text()
         if not self.find_text_input:
             return
+        if self.jump_to_match(editor):
+            return
         
         cursor = editor.textCursor()
         found = editor.find(self.find_text_input)
@@ -3951,6 +6725,8 @@ class LRDCodeEditor(QMainWindow):
         self.find_text_input = self.find_input.text()
         if not self.find_text_input:
             return
+        if self.jump_to_match(editor, backward=True):
+            return
         
         cursor = editor.textCursor()
         flags = QTextDocument.FindFlag.FindBackward
@@ -3968,7 +6744,7 @@ class LRDCodeEditor(QMainWindow):
         if not self.replace_dialog:
             self.replace_dialog = QDialog(self)
             self.replace_dialog.setWindowTitle("Replace")
-            self.replace_dialog.setFixedSize(300, 200)
+            self.replace_dialog.setFixedSize(300, 230)
             
             layout = QVBoxLayout(self.replace_dialog)
             
@@ -3978,6 +6754,15 @@ class LRDCodeEditor(QMainWindow):
             replace_label = QLabel("Replace with:")
             self.replace_with_input = QLineEdit()
             
+            options_box = QHBoxLayout()
+            self.replace_case_check = QCheckBox("Match case")
+            self.replace_case_check.setChecked(True)
+            self.replace_regex_check = QCheckBox("Regex")
+            self.replace_regex_check.setToolTip("Regular expression; use \\1 or \\g<name> in the replacement for groups")
+            options_box.addWidget(self.replace_case_check)
+            options_box.addWidget(self.replace_regex_check)
+            options_box.addStretch()
+            
             button_box = QHBoxLayout()
             find_next_btn = QPushButton("Find Next")
             replace_btn = QPushButton("Replace")
@@ -3998,6 +6783,7 @@ class LRDCodeEditor(QMainWindow):
             layout.addWidget(self.replace_find_input)
             layout.addWidget(replace_label)
             layout.addWidget(self.replace_with_input)
+            layout.addLayout(options_box)
             layout.addLayout(button_box)
         
         self.replace_dialog.show()
@@ -4011,15 +6797,31 @@ class LRDCodeEditor(QMainWindow):
             return
         
         find_text = self.replace_find_input.text()
-        if not find_text:
+        if not find_text or self.replace_pattern() is None:
             return
         
+        # Qt's own search, so the same matches are found as Replace All's
+        pattern = find_text if self.replace_regex_check.isChecked() else QRegularExpression.escape(find_text)
+        options = QRegularExpression.PatternOption.MultilineOption
+        if not self.replace_case_check.isChecked():
+            options |= QRegularExpression.PatternOption.CaseInsensitiveOption
+        query = QRegularExpression(pattern, options)
+        
         cursor = editor.textCursor()
-        found = editor.find(find_text)
+        found = editor.find(query)
         if not found:
             cursor.movePosition(QTextCursor.MoveOperation.Start)
             editor.setTextCursor(cursor)
-            editor.find(find_text)
+            editor.find(query)
+    
+    def replace_pattern(self):
+        """The Replace dialog's query compiled for Python, or None with the error shown"""
+        try:
+            return compile_query(self.replace_find_input.text(), self.replace_regex_check.isChecked(),
+                                 self.replace_case_check.isChecked())
+        except re.error as e:
+            self.update_status(f"Invalid regex: {e}", "error")
+            return None
     
     def replace_current(self):
         editor = self.get_current_editor()
@@ -4032,9 +6834,19 @@ class LRDCodeEditor(QMainWindow):
         if not find_text:
             return
         
+        regex = self.replace_pattern()
+        if regex is None:
+            return
+        
         cursor = editor.textCursor()
-        if cursor.hasSelection() and cursor.selectedText() == find_text:
-            cursor.insertText(replace_text)
+        if cursor.hasSelection():
+            match = regex.fullmatch(cursor.selectedText().replace('\u2029', '\n'))
+            if match:
+                try:
+                    cursor.insertText(match.expand(replace_text) if self.replace_regex_check.isChecked() else replace_text)
+                except (re.error, IndexError) as e:
+                    self.update_status(f"Invalid replacement: {e}", "error")
+                    return
         
         self.replace_find_next()
     
@@ -4049,9 +6861,37 @@ class LRDCodeEditor(QMainWindow):
         if not find_text:
             return
         
-        all_text = editor.toPlainText()
-        new_text = all_text.replace(find_text, replace_text)
-        editor.setPlainText(new_text)
+        regex = self.replace_pattern()
+        if regex is None:
+            return
+        
+        # Matches are found once in a copy of the text, then applied as edits so undo and highlighting stay incremental
+        expand = self.replace_regex_check.isChecked() and '\\' in replace_text
+        try:
+            edits, count = plan_replacements(document_text(editor.document()), regex, replace_text, expand)
+        except (re.error, IndexError) as e:
+            self.update_status(f"Invalid replacement: {e}", "error")
+            return
+        
+        if not edits:
+            self.update_status(f"No matches for '{find_text}'", "warning")
+            return
+        
+        # A merged edit can swallow the caret, so it goes back to the same line and column afterwards
+        caret = editor.textCursor()
+        line, column = caret.blockNumber(), caret.positionInBlock()
+        scroll = editor.verticalScrollBar().value()
+        
+        # One edit block, so a single undo brings everything back
+        apply_replacements(editor.document(), edits)
+        
+        block = editor.document().findBlockByNumber(line)
+        if block.isValid():
+            caret.setPosition(block.position() + min(column, block.length() - 1))
+            editor.setTextCursor(caret)
+            editor.verticalScrollBar().setValue(scroll)
+        
+        self.update_status(f"Replaced {count} occurrence{'s' if count != 1 else ''}", "ready")
     
     def duplicate_line(self):
         editor = self.get_current_editor()
@@ -4214,7 +7054,7 @@ class LRDCodeEditor(QMainWindow):
     
     def set_editor_language(self, editor, language):
         if isinstance(editor, LRDCustomEditor):
-            editor.highlighter.set_language(language)
+            editor.set_language(language)
             icons = {
                 'python': '🐍',
                 'javascript': '📜',
@@ -4302,7 +7142,7 @@ class LRDCodeEditor(QMainWindow):
         
         try:
             cmd = f'{self.terminal.compiler_paths["sqlite"]} "{db_file}" ".read {temp_sql_file}"'
-            self.terminal.thread_manager.run_command(cmd, os.path.dirname(db_file), "SQL execution")
+            self.terminal.thread_manager.run_command(cmd, os.path.dirname(db_file), "SQL execution", timeout=QUERY_TIMEOUT)
         finally:
             try:
                 os.unlink(temp_sql_file)
@@ -4342,6 +7182,12 @@ class LRDCodeEditor(QMainWindow):
         self.is_running = True
         self.update_status(f"Running {info['language']} file...", "running")
         
+        # The first run with a toolchain checks that it really works
+        self.terminal.verify_compilers(LANGUAGE_TOOLCHAINS.get(info['language'], []),
+                                       lambda: self.start_file_run(info))
+    
+    def start_file_run(self, info):
+        """Build and start the command for a file once its toolchain is known to work"""
         cmd = ""
         if info['language'] == 'python':
             python_cmd = self.terminal.compiler_paths.get('python', 'python')
@@ -4387,7 +7233,8 @@ class LRDCodeEditor(QMainWindow):
             return
         
         if cmd:
-            self.terminal.thread_manager.run_command(cmd, os.path.dirname(info['path']), f"Running {info['language']} file")
+            self.terminal.thread_manager.run_command(cmd, os.path.dirname(info['path']), f"Running {info['language']} file",
+                                                     timeout=RUN_TIMEOUT)
         
         self.terminal_input.setFocus()
     
@@ -4455,7 +7302,7 @@ class LRDCodeEditor(QMainWindow):
         if cmd:
             self.is_running = True
             self.update_status("Running selected code...", "running")
-            self.terminal.thread_manager.run_command(cmd, os.getcwd(), "Running selected code")
+            self.terminal.thread_manager.run_command(cmd, os.getcwd(), "Running selected code", timeout=RUN_TIMEOUT)
         
         self.terminal_input.setFocus()
     
@@ -4481,10 +7328,14 @@ class LRDCodeEditor(QMainWindow):
             QTimer.singleShot(50, lambda: self.terminal_input.setFocus())
     
     def toggle_ai_assistant(self):
-        if self.ai_assistant.isVisible():
-            self.ai_assistant.hide()
+        # The first toggle builds the panel, which starts out visible
+        if not self.ai_assistant.is_created():
+            self.ai_assistant.get()
+            self.update_ai_suggestions()
+        elif self.ai_assistant.get().isVisible():
+            self.ai_assistant.get().hide()
         else:
-            self.ai_assistant.show()
+            self.ai_assistant.get().show()
     
     def increase_font_size(self):
         editor = self.get_current_editor()
@@ -4566,8 +7417,11 @@ class LRDCodeEditor(QMainWindow):
     # ==================== HELP & ABOUT ====================
     
     def show_documentation(self):
-        QMessageBox.information(
-            self,
+        self.documentation_dialog.get().exec()
+    
+    def create_documentation_dialog(self):
+        return QMessageBox(
+            QMessageBox.Icon.Information,
             "Documentation",
             """◢◤ LRD CODE EDITOR - AI POWERED EDITION v5.0 ◥◣
 
@@ -4611,10 +7465,15 @@ class LRDCodeEditor(QMainWindow):
 • db connect [file] - Connect to database
 • db tables - List database tables
 • db query [sql] - Execute SQL query
-            """
+            """,
+            QMessageBox.StandardButton.Ok,
+            self
         )
     
     def show_shortcuts(self):
+        self.shortcuts_dialog.get().exec()
+    
+    def create_shortcuts_dialog(self):
         shortcuts_text = f"""
 <span style='color:{MODERN_GAMER_THEME['primary']}; font-weight:bold'>⌨️ KEYBOARD SHORTCUTS v5.0</span><br><br>
 
@@ -4685,9 +7544,12 @@ class LRDCodeEditor(QMainWindow):
         layout.addWidget(text_edit, 1)
         layout.addWidget(close_btn)
         
-        dialog.exec()
+        return dialog
     
     def show_about(self):
+        self.about_dialog.get().exec()
+    
+    def create_about_dialog(self):
         about_dialog = QDialog(self)
         about_dialog.setWindowTitle("◢◤ ABOUT LRD AI EDITION ◥◣")
         about_dialog.setFixedSize(500, 450)
@@ -4753,7 +7615,7 @@ class LRDCodeEditor(QMainWindow):
         layout.addWidget(about_text, 1)
         layout.addWidget(close_btn)
         
-        about_dialog.exec()
+        return about_dialog
     
     def closeEvent(self, event):
         unsaved = any(info.get('modified', False) for info in self.open_files.values())
@@ -4805,14 +7667,185 @@ class TerminalLineEdit(QLineEdit):
         else:
             super().keyPressEvent(event)
 
+# ==================== SINGLE INSTANCE ====================
+
+# Every launch of this edition by the same user meets on this local socket
+INSTANCE_SERVER_NAME = "lrd-{}-{}".format(
+    os.path.splitext(os.path.basename(__file__))[0],
+    os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', ''))
+INSTANCE_TIMEOUT_MS = 250
+
+class SingleInstance(QObject):
+    """Local socket server that lets a second launch hand its files to the running editor"""
+    
+    files_received = pyqtSignal(list)
+    
+    def __init__(self):
+        super().__init__()
+        self.server = None
+    
+    def forward(self, paths):
+        """Send paths to the running instance, returns False when nobody is listening"""
+        client = QLocalSocket()
+        client.connectToServer(INSTANCE_SERVER_NAME)
+        if not client.waitForConnected(INSTANCE_TIMEOUT_MS):
+            return False
+        client.write(json.dumps(paths).encode('utf-8'))
+        client.waitForBytesWritten(INSTANCE_TIMEOUT_MS)
+        client.disconnectFromServer()
+        return True
+    
+    def listen(self):
+        self.server = QLocalServer(self)
+        if not self.server.listen(INSTANCE_SERVER_NAME):
+            if self.forward([]):
+                # Another instance owns the name, this one just runs on its own
+                self.server = None
+                return False
+            # A crashed instance left its socket behind
+            QLocalServer.removeServer(INSTANCE_SERVER_NAME)
+            if not self.server.listen(INSTANCE_SERVER_NAME):
+                self.server = None
+                return False
+        self.server.newConnection.connect(self.accept)
+        return True
+    
+    def accept(self):
+        while self.server.hasPendingConnections():
+            client = self.server.nextPendingConnection()
+            data = bytearray()
+            client.readyRead.connect(lambda client=client, data=data: data.extend(client.readAll().data()))
+            client.disconnected.connect(lambda client=client, data=data: self.receive(client, data))
+    
+    def receive(self, client, data):
+        data.extend(client.readAll().data())
+        client.deleteLater()
+        try:
+            paths = json.loads(data.decode('utf-8'))
+        except:
+            return
+        if paths:
+            self.files_received.emit(paths)
+
+# ==================== STARTUP PROFILER ====================
+
+class StartupProfiler(QObject):
+    """Times startup phases for --profile-startup[=DIR] and writes a JSON report plus a Chrome trace"""
+    
+    def __init__(self, argv):
+        super().__init__()
+        self.output_dir = None
+        for arg in argv[1:]:
+            if arg == '--profile-startup' or arg.startswith('--profile-startup='):
+                self.output_dir = arg.partition('=')[2] or os.getcwd()
+        self.phases = []
+        self.depth = 0
+        self.paint_phase = None
+        if self.output_dir:
+            self.phases.append(['imports', IMPORT_STARTED, time.perf_counter(), 0])
+    
+    def begin(self, name):
+        if not self.output_dir:
+            return None
+        self.phases.append([name, time.perf_counter(), None, self.depth])
+        self.depth += 1
+        return len(self.phases) - 1
+    
+    def end(self, phase):
+        if phase is not None:
+            self.depth -= 1
+            self.phases[phase][2] = time.perf_counter()
+    
+    def wrap(self, cls, *names):
+        """Time every call of the named methods as a phase of its own"""
+        if not self.output_dir:
+            return
+        for name in names:
+            setattr(cls, name, self.timed(name, getattr(cls, name)))
+    
+    def timed(self, name, method):
+        def wrapper(*args, **kwargs):
+            phase = self.begin(name)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.end(phase)
+        return wrapper
+    
+    def watch_first_paint(self, window):
+        """Close the profile once the window has painted for the first time"""
+        if not self.output_dir:
+            return
+        self.paint_phase = self.begin('first paint')
+        window.installEventFilter(self)
+    
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            # Let the paint finish before taking the time
+            QTimer.singleShot(0, self.finish)
+        return False
+    
+    def finish(self):
+        self.end(self.paint_phase)
+        self.write_report()
+        # exit() rather than quit(): quit() closes the window and can stop on the unsaved-changes prompt
+        QApplication.exit(0)
+    
+    def write_report(self):
+        edition = os.path.splitext(os.path.basename(__file__))[0]
+        origin = self.phases[0][1]
+        report = {
+            'edition': edition,
+            'python': sys.version.split()[0],
+            'qt': QT_VERSION_STR,
+            'platform': sys.platform,
+            'total_ms': round((max(end for _, _, end, _ in self.phases) - origin) * 1000, 3),
+            'phases': [{'name': name, 'depth': depth,
+                        'start_ms': round((start - origin) * 1000, 3),
+                        'duration_ms': round((end - start) * 1000, 3)}
+                       for name, start, end, depth in self.phases],
+        }
+        trace = {
+            'traceEvents': [{'name': name, 'cat': 'startup', 'ph': 'X', 'pid': os.getpid(), 'tid': 1,
+                             'ts': round((start - origin) * 1e6), 'dur': round((end - start) * 1e6)}
+                            for name, start, end, depth in self.phases],
+            'displayTimeUnit': 'ms',
+        }
+        
+        base = os.path.join(self.output_dir, f"{edition}_startup")
+        for path, data in ((base + '.json', report), (base + '.trace.json', trace)):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+        
+        for phase in report['phases']:
+            print(f"{'  ' * phase['depth']}{phase['name']:<{24 - 2 * phase['depth']}} {phase['duration_ms']:9.1f} ms")
+        print(f"{'total':<24} {report['total_ms']:9.1f} ms")
+        print(f"Startup profile written to {base}.json and {base}.trace.json")
+
 # ==================== APPLICATION ====================
 
 def main():
+    profiler = StartupProfiler(sys.argv)
+    profiler.wrap(LRDCodeEditor, 'setup_ui', 'setup_menu', 'create_terminal')
+    profiler.wrap(LRDTerminal, 'detect_compilers')
+    
+    # Hand files to an already running editor instead of starting another one
+    instance = SingleInstance()
+    files = [os.path.abspath(arg) for arg in sys.argv[1:] if not arg.startswith('-') and os.path.isfile(arg)]
+    if files and instance.forward(files):
+        sys.exit(0)
+    
+    # Start the grep fork server while this process has only one thread
+    ParallelGrep.get_pool()
+    
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
     )
     
+    phase = profiler.begin('QApplication')
     app = QApplication(sys.argv)
+    profiler.end(phase)
     
     app.setStyle("Fusion")
     app.setApplicationName("LRD Code Editor - AI Powered Edition")
@@ -4827,9 +7860,16 @@ def main():
         except:
             pass
     
+    phase = profiler.begin('window')
     window = LRDCodeEditor()
+    profiler.end(phase)
+    profiler.watch_first_paint(window)
     window.show()
     
+    instance.files_received.connect(window.open_paths)
+    instance.listen()
+    window.open_paths(files)
+    
     sys.exit(app.exec())
 
 if __name__ == "__main__":
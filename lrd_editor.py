@@ -2,8 +2,12 @@
 import sys
 import os
 import subprocess
+import signal
 import json
 import re
+import io
+import codecs
+import locale
 import threading
 import time
 import webbrowser
@@ -11,9 +15,13 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, List
 
+# Start of the Qt imports, which are most of the import time; for --profile-startup
+IMPORT_STARTED = time.perf_counter()
+
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
 
 # ==================== CONSTANTS & THEME ====================
 
@@ -88,11 +96,13 @@ class LRDHighlighter(QSyntaxHighlighter):
         super().__init__(document)
         self.language = language
         self.rules = []
+        self.multiline = []
         self.setup_rules()
     
     def set_language(self, language):
         self.language = language
         self.rules = []
+        self.multiline = []
         self.setup_rules()
         self.rehighlight()
     
@@ -146,6 +156,8 @@ class LRDHighlighter(QSyntaxHighlighter):
             # Strings
             self.rules.append((r'"[^"\\]*(\\.[^"\\]*)*"', formats['string']))
             self.rules.append((r"'[^'\\]*(\\.[^'\\]*)*'", formats['string']))
+            self.multiline.append(('"""', '"""', formats['string']))
+            self.multiline.append(("'''", "'''", formats['string']))
             
             # Numbers
             self.rules.append((r'\b\d+\b', formats['number']))
@@ -155,12 +167,12 @@ class LRDHighlighter(QSyntaxHighlighter):
             self.rules.append((r'</?\w+', formats['tag']))
             self.rules.append((r'\b\w+\s*=', formats['attribute']))
             self.rules.append((r'"[^"]*"', formats['string']))
-            self.rules.append((r'<!--.*-->', formats['comment']))
+            self.multiline.append(('<!--', '-->', formats['comment']))
         
         # CSS rules
         elif self.language == 'css':
             self.rules.append((r'\b[\w-]+\s*:', formats['attribute']))
-            self.rules.append((r'/\*.*\*/', formats['comment']))
+            self.multiline.append(('/*', '*/', formats['comment']))
             self.rules.append((r'"[^"]*"', formats['string']))
             self.rules.append((r'\b\d+\b', formats['number']))
         
@@ -178,7 +190,7 @@ class LRDHighlighter(QSyntaxHighlighter):
                 self.rules.append((r'\b' + kw + r'\b', formats['keyword']))
             
             self.rules.append((r'//.*', formats['comment']))
-            self.rules.append((r'/\*[\s\S]*?\*/', formats['comment']))
+            self.multiline.append(('/*', '*/', formats['comment']))
             self.rules.append((r'"[^"]*"', formats['string']))
             self.rules.append((r"'[^']*'", formats['string']))
             self.rules.append((r'\b\d+\b', formats['number']))
@@ -198,6 +210,37 @@ class LRDHighlighter(QSyntaxHighlighter):
                 start = match.start()
                 length = match.end() - start
                 self.setFormat(start, length, fmt)
+        self.highlight_multiline(text)
+    
+    def highlight_multiline(self, text):
+        """Paint strings/comments that span blocks, carrying them in the block state"""
+        # Qt only moves on to the next block when this state changes, so an
+        # edit costs the blocks whose incoming state differs, not the document
+        self.setCurrentBlockState(0)
+        state = self.previousBlockState()
+        if 0 < state <= len(self.multiline):
+            start = pos = 0
+        else:
+            state, start, pos = self.find_multiline_start(text, 0)
+        while state:
+            _, end, fmt = self.multiline[state - 1]
+            close = text.find(end, pos)
+            if close == -1:
+                self.setFormat(start, len(text) - start, fmt)
+                self.setCurrentBlockState(state)
+                return
+            close += len(end)
+            self.setFormat(start, close - start, fmt)
+            state, start, pos = self.find_multiline_start(text, close)
+    
+    def find_multiline_start(self, text, pos):
+        """Return (state, start, end of opener) for the first opener at or after pos"""
+        found = (0, -1, -1)
+        for index, (begin, _, _) in enumerate(self.multiline):
+            start = text.find(begin, pos)
+            if start != -1 and (found[1] == -1 or start < found[1]):
+                found = (index + 1, start, start + len(begin))
+        return found
 
 # ==================== CODE EDITOR ====================
 
@@ -313,6 +356,147 @@ class LineNumberArea(QWidget):
     def paintEvent(self, event):
         self.editor.line_number_area_paint_event(event)
 
+# ==================== ASYNC PROCESS RUNNER ====================
+
+class ProcessRunner(QObject):
+    """Runs commands with QProcess one after another, streaming their output"""
+    output_received = pyqtSignal(str)
+    error_received = pyqtSignal(str)
+    command_failed = pyqtSignal(str)
+    command_finished = pyqtSignal(int, bool)  # exit code, timed out
+    all_finished = pyqtSignal()
+    # Qt 6.7+ can start a command in a session of its own, which makes it the
+    # leader of a process group that can be stopped as a whole
+    NEW_SESSION = getattr(getattr(QProcess, 'UnixProcessFlag', None), 'CreateNewSession', None)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.process = None
+        self.queue = []
+        self.on_finished = None
+        self.timed_out = False
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setSingleShot(True)
+        self.timeout_timer.timeout.connect(self.on_timeout)
+    
+    def is_running(self):
+        return self.process is not None
+    
+    def run(self, command, cwd, timeout=None, on_finished=None, on_started=None):
+        """Queue a shell command string or an argument list; returns immediately"""
+        self.queue.append((command, cwd, timeout, on_started, on_finished))
+        if self.process is None:
+            self.start_next()
+    
+    def kill(self):
+        """Stop the running command and drop the queued ones"""
+        # Dropped commands still get their callback (as an abnormal exit) so they can clean up
+        dropped, self.queue = self.queue, []
+        for command, cwd, timeout, on_started, on_finished in dropped:
+            if on_finished is not None:
+                on_finished(-1)
+        if self.process is not None:
+            self.stop_process()
+    
+    def stop_process(self):
+        """Kill the running command together with every process it started"""
+        pid = self.process.processId()
+        try:
+            if os.name == 'nt':
+                if pid:
+                    subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            elif pid and os.getpgid(pid) == pid:
+                os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            pass  # Already gone
+        # Left to QProcess so it notices the exit; also covers a Qt without sessions
+        self.process.kill()
+    
+    def start_next(self):
+        command, cwd, timeout, on_started, self.on_finished = self.queue.pop(0)
+        self.timed_out = False
+        self.stdout_decoder = self.create_decoder()
+        self.stderr_decoder = self.create_decoder()
+        
+        process = QProcess(self)
+        process.setWorkingDirectory(cwd)
+        if isinstance(command, list):
+            process.setProgram(command[0])
+            process.setArguments(command[1:])
+        elif os.name == 'nt':
+            # Same command line subprocess builds for shell=True
+            process.setProgram(os.environ.get('COMSPEC', 'cmd.exe'))
+            process.setNativeArguments(f'/c "{command}"')
+        else:
+            process.setProgram('/bin/sh')
+            process.setArguments(['-c', command])
+        if os.name != 'nt' and self.NEW_SESSION is not None:
+            process.setUnixProcessParameters(self.NEW_SESSION)
+        process.readyReadStandardOutput.connect(self.read_output)
+        process.readyReadStandardError.connect(self.read_error)
+        process.finished.connect(self.on_process_finished)
+        process.errorOccurred.connect(self.on_process_error)
+        self.process = process
+        if on_started is not None:
+            on_started()
+        process.start()
+        # A command that failed to start has already been finished
+        if timeout and self.process is process:
+            self.timeout_timer.start(timeout * 1000)
+    
+    def create_decoder(self):
+        # Output arrives in arbitrary chunks, so multi-byte characters and
+        # \r\n pairs may be split between two reads
+        decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors='replace')
+        return io.IncrementalNewlineDecoder(decoder, translate=True)
+    
+    def read_output(self):
+        text = self.stdout_decoder.decode(bytes(self.process.readAllStandardOutput()))
+        if text:
+            self.output_received.emit(text)
+    
+    def read_error(self):
+        text = self.stderr_decoder.decode(bytes(self.process.readAllStandardError()))
+        if text:
+            self.error_received.emit(text)
+    
+    def on_timeout(self):
+        self.timed_out = True
+        self.stop_process()
+    
+    def on_process_error(self, error):
+        # Every other error is followed by finished()
+        if error == QProcess.ProcessError.FailedToStart:
+            self.command_failed.emit(self.process.errorString())
+            self.finish(-1)
+    
+    def on_process_finished(self, exit_code, exit_status):
+        self.read_output()
+        self.read_error()
+        for decoder, signal in ((self.stdout_decoder, self.output_received),
+                                (self.stderr_decoder, self.error_received)):
+            text = decoder.decode(b'', final=True)
+            if text:
+                signal.emit(text)
+        if exit_status != QProcess.ExitStatus.NormalExit:
+            exit_code = -1
+        self.finish(exit_code)
+    
+    def finish(self, exit_code):
+        self.timeout_timer.stop()
+        self.process.deleteLater()
+        self.process = None
+        on_finished = self.on_finished
+        self.on_finished = None
+        self.command_finished.emit(exit_code, self.timed_out)
+        if on_finished is not None:
+            on_finished(exit_code)
+        if self.queue:
+            self.start_next()
+        else:
+            self.all_finished.emit()
+
 # ==================== TERMINAL ====================
 
 class LRDTerminal(QTextEdit):
@@ -324,6 +508,15 @@ class LRDTerminal(QTextEdit):
         self.command_history = []
         self.history_index = -1
         self.current_dir = os.getcwd()
+        self.output_started = False
+        
+        # External commands run without blocking the window; commands
+        # entered meanwhile are queued behind the running one
+        self.runner = ProcessRunner(self)
+        self.runner.output_received.connect(lambda text: self.insert_output(text, LRD_THEME['terminal_fg']))
+        self.runner.error_received.connect(lambda text: self.insert_output(text, LRD_THEME['status_error']))
+        self.runner.command_failed.connect(lambda message: self.append(f"<span style='color:{LRD_THEME['status_error']}'>Error: {message}</span>"))
+        self.runner.command_finished.connect(self.on_command_finished)
         
         # Show welcome message
         self.append_welcome()
@@ -400,34 +593,33 @@ class LRDTerminal(QTextEdit):
             self.append(f"<span style='color:{LRD_THEME['status_error']}'>Error: {str(e)}</span>")
     
     def run_external_command(self, command: str):
-        try:
-            # Run command
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd=self.current_dir,
-                timeout=30
-            )
-            
-            # Display output
-            if result.stdout:
-                self.append(result.stdout)
-            if result.stderr:
-                self.append(f"<span style='color:{LRD_THEME['status_error']}'>Error: {result.stderr}</span>")
-            
-            if result.returncode != 0:
-                self.append(f"<span style='color:{LRD_THEME['status_warning']}'>Process exited with code: {result.returncode}</span>")
-        
-        except subprocess.TimeoutExpired:
-            self.append(f"<span style='color:{LRD_THEME['status_warning']}'>Command timed out after 30 seconds</span>")
-        except Exception as e:
-            self.append(f"<span style='color:{LRD_THEME['status_error']}'>Error: {str(e)}</span>")
+        self.runner.run(command, self.current_dir, timeout=30)
+    
+    def insert_output(self, text, color):
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if not self.output_started:
+            self.output_started = True
+            # Start on a fresh line unless append() already left one
+            line = cursor.block().text()
+            if line and not line.endswith('\u2028'):
+                cursor.insertBlock()
+        # Plain text with a colour format, so output is never parsed as HTML
+        fmt = QTextCharFormat()
+        fmt.setForeground(QColor(color))
+        cursor.insertText(text, fmt)
+        self.setTextCursor(cursor)
         
         # Scroll to bottom
         self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
     
+    def on_command_finished(self, exit_code, timed_out):
+        self.output_started = False
+        if timed_out:
+            self.append(f"<span style='color:{LRD_THEME['warning']}'>Command timed out after 30 seconds</span>")
+        elif exit_code != 0:
+            self.append(f"<span style='color:{LRD_THEME['warning']}'>Process exited with code: {exit_code}</span>")
+    
     def show_help(self):
         help_text = """
 <strong>Available Commands:</strong>
@@ -1181,6 +1373,18 @@ class LRDCodeEditorWindow(QMainWindow):
         if file_path:
             self.open_file(file_path)
     
+    def open_paths(self, paths):
+        """Open files given on the command line or handed over by a second launch"""
+        if not paths:
+            return
+        for path in paths:
+            if os.path.isfile(path):
+                self.open_file(path)
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+    
     def open_file(self, file_path: str):
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -1742,10 +1946,177 @@ and VS Code-like interface with LRD holographic theme.
         else:
             event.accept()
 
+# ==================== SINGLE INSTANCE ====================
+
+# Every launch of this edition by the same user meets on this local socket
+INSTANCE_SERVER_NAME = "lrd-{}-{}".format(
+    os.path.splitext(os.path.basename(__file__))[0],
+    os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', ''))
+INSTANCE_TIMEOUT_MS = 250
+
+class SingleInstance(QObject):
+    """Local socket server that lets a second launch hand its files to the running editor"""
+    
+    files_received = pyqtSignal(list)
+    
+    def __init__(self):
+        super().__init__()
+        self.server = None
+    
+    def forward(self, paths):
+        """Send paths to the running instance, returns False when nobody is listening"""
+        client = QLocalSocket()
+        client.connectToServer(INSTANCE_SERVER_NAME)
+        if not client.waitForConnected(INSTANCE_TIMEOUT_MS):
+            return False
+        client.write(json.dumps(paths).encode('utf-8'))
+        client.waitForBytesWritten(INSTANCE_TIMEOUT_MS)
+        client.disconnectFromServer()
+        return True
+    
+    def listen(self):
+        self.server = QLocalServer(self)
+        if not self.server.listen(INSTANCE_SERVER_NAME):
+            if self.forward([]):
+                # Another instance owns the name, this one just runs on its own
+                self.server = None
+                return False
+            # A crashed instance left its socket behind
+            QLocalServer.removeServer(INSTANCE_SERVER_NAME)
+            if not self.server.listen(INSTANCE_SERVER_NAME):
+                self.server = None
+                return False
+        self.server.newConnection.connect(self.accept)
+        return True
+    
+    def accept(self):
+        while self.server.hasPendingConnections():
+            client = self.server.nextPendingConnection()
+            data = bytearray()
+            client.readyRead.connect(lambda client=client, data=data: data.extend(client.readAll().data()))
+            client.disconnected.connect(lambda client=client, data=data: self.receive(client, data))
+    
+    def receive(self, client, data):
+        data.extend(client.readAll().data())
+        client.deleteLater()
+        try:
+            paths = json.loads(data.decode('utf-8'))
+        except:
+            return
+        if paths:
+            self.files_received.emit(paths)
+
+# ==================== STARTUP PROFILER ====================
+
+class StartupProfiler(QObject):
+    """Times startup phases for --profile-startup[=DIR] and writes a JSON report plus a Chrome trace"""
+    
+    def __init__(self, argv):
+        super().__init__()
+        self.output_dir = None
+        for arg in argv[1:]:
+            if arg == '--profile-startup' or arg.startswith('--profile-startup='):
+                self.output_dir = arg.partition('=')[2] or os.getcwd()
+        self.phases = []
+        self.depth = 0
+        self.paint_phase = None
+        if self.output_dir:
+            self.phases.append(['imports', IMPORT_STARTED, time.perf_counter(), 0])
+    
+    def begin(self, name):
+        if not self.output_dir:
+            return None
+        self.phases.append([name, time.perf_counter(), None, self.depth])
+        self.depth += 1
+        return len(self.phases) - 1
+    
+    def end(self, phase):
+        if phase is not None:
+            self.depth -= 1
+            self.phases[phase][2] = time.perf_counter()
+    
+    def wrap(self, cls, *names):
+        """Time every call of the named methods as a phase of its own"""
+        if not self.output_dir:
+            return
+        for name in names:
+            setattr(cls, name, self.timed(name, getattr(cls, name)))
+    
+    def timed(self, name, method):
+        def wrapper(*args, **kwargs):
+            phase = self.begin(name)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.end(phase)
+        return wrapper
+    
+    def watch_first_paint(self, window):
+        """Close the profile once the window has painted for the first time"""
+        if not self.output_dir:
+            return
+        self.paint_phase = self.begin('first paint')
+        window.installEventFilter(self)
+    
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            # Let the paint finish before taking the time
+            QTimer.singleShot(0, self.finish)
+        return False
+    
+    def finish(self):
+        self.end(self.paint_phase)
+        self.write_report()
+        # exit() rather than quit(): quit() closes the window and can stop on the unsaved-changes prompt
+        QApplication.exit(0)
+    
+    def write_report(self):
+        edition = os.path.splitext(os.path.basename(__file__))[0]
+        origin = self.phases[0][1]
+        report = {
+            'edition': edition,
+            'python': sys.version.split()[0],
+            'qt': QT_VERSION_STR,
+            'platform': sys.platform,
+            'total_ms': round((max(end for _, _, end, _ in self.phases) - origin) * 1000, 3),
+            'phases': [{'name': name, 'depth': depth,
+                        'start_ms': round((start - origin) * 1000, 3),
+                        'duration_ms': round((end - start) * 1000, 3)}
+                       for name, start, end, depth in self.phases],
+        }
+        trace = {
+            'traceEvents': [{'name': name, 'cat': 'startup', 'ph': 'X', 'pid': os.getpid(), 'tid': 1,
+                             'ts': round((start - origin) * 1e6), 'dur': round((end - start) * 1e6)}
+                            for name, start, end, depth in self.phases],
+            'displayTimeUnit': 'ms',
+        }
+        
+        base = os.path.join(self.output_dir, f"{edition}_startup")
+        for path, data in ((base + '.json', report), (base + '.trace.json', trace)):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+        
+        for phase in report['phases']:
+            print(f"{'  ' * phase['depth']}{phase['name']:<{24 - 2 * phase['depth']}} {phase['duration_ms']:9.1f} ms")
+        print(f"{'total':<24} {report['total_ms']:9.1f} ms")
+        print(f"Startup profile written to {base}.json and {base}.trace.json")
+
 # ==================== APPLICATION ====================
 
 def main():
+    profiler = StartupProfiler(sys.argv)
+    profiler.wrap(LRDCodeEditorWindow, 'setup_ui', 'setup_menu', 'create_terminal')
+    
+    # Hand files to an already running editor instead of starting another one
+    instance = SingleInstance()
+    files = [os.path.abspath(arg) for arg in sys.argv[1:] if not arg.startswith('-') and os.path.isfile(arg)]
+    if files and instance.forward(files):
+        sys.exit(0)
+    
+    phase = profiler.begin('QApplication')
     app = QApplication(sys.argv)
+    profiler.end(phase)
     
     # Set application style
     app.setStyle("Fusion")
@@ -1753,9 +2124,16 @@ def main():
     app.setOrganizationName("LRD-TECH")
     
     # Create and show main window
+    phase = profiler.begin('window')
     window = LRDCodeEditorWindow()
+    profiler.end(phase)
+    profiler.watch_first_paint(window)
     window.show()
     
+    instance.files_received.connect(window.open_paths)
+    instance.listen()
+    window.open_paths(files)
+    
     # Start application
     sys.exit(app.exec())
 
@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PyQt6.QtWidgets")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QModelIndex
+from PyQt6.QtTest import QAbstractItemModelTester
+from PyQt6.QtWidgets import QApplication
+
+import half_ai
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def wait_for(app, condition, seconds):
+    deadline = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def listed_model(tmp_path, names):
+    for name in names:
+        (tmp_path / name).write_text("")
+    model = half_ai.ProjectFileModel()
+    model.setRootPath(str(tmp_path))
+    model.fetchMore(QModelIndex())
+    return model
+
+
+def rows(model):
+    children = model.root.children
+    assert [child.row for child in children] == list(range(len(children)))
+    return [child.name for child in children]
+
+
+def test_refresh_inserts_new_files_in_runs(app, tmp_path):
+    model = listed_model(tmp_path, ["b.txt", "d.txt", "f.txt"])
+    tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+    inserts = []
+    model.rowsInserted.connect(lambda parent, first, last: inserts.append((first, last)))
+    removes = []
+    model.rowsRemoved.connect(lambda parent, first, last: removes.append((first, last)))
+
+    (tmp_path / "d.txt").unlink()
+    (tmp_path / "f.txt").unlink()
+    for i in range(50):
+        (tmp_path / f"c{i:02}.txt").write_text("")
+        (tmp_path / f"x{i:02}.txt").write_text("")
+    model.refresh_path(str(tmp_path))
+
+    assert rows(model) == ["b.txt"] + [f"c{i:02}.txt" for i in range(50)] + [f"x{i:02}.txt" for i in range(50)]
+    assert removes == [(1, 2)]
+    assert inserts == [(1, 100)]
+
+
+def test_refresh_renumbers_kept_rows(app, tmp_path):
+    model = listed_model(tmp_path, ["b.txt", "d.txt", "f.txt"])
+    QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+    inserts = []
+    model.rowsInserted.connect(lambda parent, first, last: inserts.append((first, last)))
+
+    for name in ["a1.txt", "a2.txt", "c.txt", "g1.txt", "g2.txt"]:
+        (tmp_path / name).write_text("")
+    model.refresh_path(str(tmp_path))
+
+    assert rows(model) == ["a1.txt", "a2.txt", "b.txt", "c.txt", "d.txt", "f.txt", "g1.txt", "g2.txt"]
+    assert inserts == [(0, 1), (3, 3), (6, 7)]
+
+
+def test_refresh_lists_directories_off_the_gui_thread(app, tmp_path):
+    model = listed_model(tmp_path, ["a.txt"])
+    scanned_on = []
+    scan = model.scan
+    model.scan = lambda path: (scanned_on.append(half_ai.threading.current_thread()), scan(path))[1]
+
+    (tmp_path / "b.txt").write_text("")
+    model.refresh()
+
+    assert wait_for(app, lambda: len(model.root.children) == 2, 5)
+    assert rows(model) == ["a.txt", "b.txt"]
+    assert scanned_on and half_ai.threading.main_thread() not in scanned_on
+
+
+def test_explorer_starts_at_the_working_folder(app, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "main.py").write_text("")
+    explorer = half_ai.LRDFileExplorer()
+    assert explorer.model.rootPath() == str(tmp_path)
+    explorer.model.fetchMore(QModelIndex())
+    assert rows(explorer.model) == ["main.py"]
+
+    explorer.set_root_path("")
+    assert explorer.model.rootPath() == ""
+    explorer.set_root_path(explorer.project_root)
+    assert explorer.model.rootPath() == str(tmp_path)
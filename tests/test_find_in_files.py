@@ -0,0 +1,31 @@
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+pytest.importorskip("PyQt6.QtWidgets")
+
+import half_ai
+
+
+def test_verbose_pattern_promises_no_literals():
+    assert half_ai.required_literals("(?x) foo \\s bar  # the bar part") == []
+    assert half_ai.required_literals("(?ix)foo bar") == []
+    assert half_ai.required_literals("(?i)foobar") == ["foobar"]
+
+
+def test_verbose_pattern_finds_indexed_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(half_ai, "SEARCH_INDEX_DIR", str(tmp_path / "index"))
+    project = tmp_path / "project"
+    project.mkdir()
+    source = project / "main.py"
+    source.write_text("value = foo_bar()\n")
+    index = half_ai.TrigramIndex(str(project))
+    index.update_file(str(source))
+
+    pattern = "(?x) foo _ bar  # the call"
+    assert re.search(pattern, source.read_text())
+    literals = half_ai.required_literals(pattern)
+    assert index.candidates([literal.casefold() for literal in literals]) == ["main.py"]
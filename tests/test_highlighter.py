@@ -0,0 +1,49 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PyQt6.QtWidgets")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtGui import QTextDocument
+from PyQt6.QtWidgets import QApplication
+
+import half_ai
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def wait_for(app, condition, seconds):
+    deadline = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_long_job_in_one_tab_does_not_hold_up_another(app):
+    documents = [QTextDocument("x = 1"), QTextDocument("y = 2")]
+    busy = half_ai.LRDHighlighter(documents[0])
+    quick = half_ai.LRDHighlighter(documents[1])
+    release = threading.Event()
+
+    def stuck(text, state):
+        release.wait(10)
+        return [], 0
+    busy.worker.tokenize = stuck
+    finished = []
+    quick.worker.job_finished.connect(lambda revision, results: finished.append(revision))
+
+    busy.worker.submit(["x = 1"], {})
+    quick.worker.submit(["y = 2"], {})
+    try:
+        assert wait_for(app, lambda: finished, 5)
+    finally:
+        release.set()
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PyQt6.QtWidgets")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication
+
+import fast_teditor
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def wait_for(app, condition, seconds):
+    deadline = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="uses a POSIX shell")
+def test_queued_command_does_not_relabel_running_errors(app, tmp_path):
+    terminal = fast_teditor.LRDTypableTerminal()
+    terminal.current_dir = str(tmp_path)
+    terminal.compiler_paths['python'] = sys.executable
+    script = tmp_path / "fails.py"
+    script.write_text("import sys\nsys.stderr.write('second\\n')\n")
+
+    terminal.run_command("sleep 0.3; echo first >&2")
+    terminal.run_command(str(script))
+    assert wait_for(app, lambda: not terminal.runner.is_running(), 10)
+
+    output = terminal.toPlainText()
+    assert "> Error: first" in output
+    assert "Python Error: second" in output
+
+
+def process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def start_grandchild(app, runner, tmp_path, **options):
+    pid_file = tmp_path / "grandchild.pid"
+    runner.run(f"sleep 30 & echo $! > {pid_file}; wait", str(tmp_path), **options)
+    assert wait_for(app, lambda: pid_file.exists() and pid_file.read_text().strip(), 5)
+    return int(pid_file.read_text())
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="uses a POSIX shell")
+@pytest.mark.skipif(fast_teditor.ProcessRunner.NEW_SESSION is None, reason="needs Qt 6.7 sessions")
+def test_kill_stops_the_processes_a_command_started(app, tmp_path):
+    runner = fast_teditor.ProcessRunner()
+    pid = start_grandchild(app, runner, tmp_path)
+    runner.kill()
+    assert wait_for(app, lambda: not runner.is_running() and not process_exists(pid), 5)
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="uses a POSIX shell")
+@pytest.mark.skipif(fast_teditor.ProcessRunner.NEW_SESSION is None, reason="needs Qt 6.7 sessions")
+def test_timeout_stops_the_processes_a_command_started(app, tmp_path):
+    runner = fast_teditor.ProcessRunner()
+    timed_out = []
+    runner.command_finished.connect(lambda exit_code, timed: timed_out.append(timed))
+    pid = start_grandchild(app, runner, tmp_path, timeout=1)
+    assert wait_for(app, lambda: timed_out and not process_exists(pid), 6)
+    assert timed_out == [True]
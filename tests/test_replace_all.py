@@ -0,0 +1,51 @@
+import os
+import re
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PyQt6.QtWidgets")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication, QPlainTextEdit
+
+import half_ai
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def replace_all(editor, pattern, template, regex=False):
+    query = half_ai.compile_query(pattern, regex, case_sensitive=True)
+    edits, count = half_ai.plan_replacements(half_ai.document_text(editor.document()), query, template,
+                                             regex and '\\' in template)
+    half_ai.apply_replacements(editor.document(), edits)
+    return count
+
+
+def test_no_break_spaces_between_matches_survive(app):
+    editor = QPlainTextEdit()
+    editor.setPlainText("foo\xa0bar foo foo")
+    assert replace_all(editor, "foo", "X") == 3
+    assert editor.document().toRawText() == "X\xa0bar X X"
+
+
+def test_matches_only_what_the_document_holds(app):
+    editor = QPlainTextEdit()
+    editor.setPlainText("foo\xa0bar")
+    assert replace_all(editor, "foo bar", "X") == 0
+    assert editor.document().toRawText() == "foo\xa0bar"
+
+
+def test_capture_groups_and_single_undo(app):
+    editor = QPlainTextEdit()
+    original = "\n".join(f"value_{i} = f(a, b)  # \U0001F600" for i in range(500))
+    editor.setPlainText(original)
+    pattern, template = r"f\((\w+), (\w+)\)", r"f(\2, \1)"
+    assert replace_all(editor, pattern, template, regex=True) == 500
+    assert editor.toPlainText() == re.sub(pattern, template, original)
+    editor.undo()
+    assert editor.toPlainText() == original
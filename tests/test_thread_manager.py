@@ -0,0 +1,95 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PyQt6.QtWidgets")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication
+
+import half_ai
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def wait_for(app, condition, seconds):
+    deadline = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="uses sleep from a POSIX shell")
+def test_task_is_stopped_at_its_own_timeout(app):
+    manager = half_ai.ThreadManager()
+    errors = []
+    manager.error_signal.connect(errors.append)
+    started = time.monotonic()
+    manager.run_command("sleep 30", task_name="Sleep", timeout=1)
+    assert wait_for(app, lambda: errors, 10)
+    assert "Sleep timed out after 1 seconds" in errors[0]
+    assert time.monotonic() - started < 10
+
+
+def test_callers_pass_per_task_timeouts(app):
+    terminal = half_ai.LRDTerminal()
+    calls = []
+    terminal.thread_manager.run_command = lambda command, cwd=None, task_name="Command", **kwargs: \
+        calls.append((task_name, kwargs.get('timeout', half_ai.COMMAND_TIMEOUT)))
+    terminal.compiler_paths['sqlite'] = 'sqlite3'
+
+    terminal.execute_command("make all")
+    terminal.execute_command('sqlite test.db "SELECT 1"')
+
+    assert calls == [("Command: make all", half_ai.RUN_TIMEOUT), ("SQLite query", half_ai.QUERY_TIMEOUT)]
+    assert half_ai.RUN_TIMEOUT is None
+
+
+def test_toolchain_probe_does_not_wait_for_busy_job_pool(app, tmp_path):
+    terminal = half_ai.LRDTerminal()
+    terminal.toolchain_resolver = half_ai.ToolchainResolver(
+        {'python': ([sys.executable], ['--version'])}, cache_file=str(tmp_path / "toolchains.json"))
+    release = threading.Event()
+    for _ in range(terminal.thread_manager.thread_pool._max_workers):
+        terminal.thread_manager.thread_pool.submit(release.wait, 10)
+    ready = []
+    try:
+        terminal.verify_compilers(['python'], lambda: ready.append(True))
+        assert wait_for(app, lambda: ready, 5)
+    finally:
+        release.set()
+    assert terminal.compiler_paths == {'python': sys.executable}
+
+
+def test_toolchain_cache_survives_concurrent_saves(tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "toolchains.json")
+    resolvers = [half_ai.ToolchainResolver({}, cache_file=cache_file) for _ in range(2)]
+    resolvers[0].versions = {"short": {'ok': True, 'version': "1"}}
+    resolvers[1].versions = {"long": {'ok': True, 'version': "x" * 1000}}
+    # Both saves are halfway through writing at the same time
+    both_writing = threading.Barrier(2)
+    def dump(cache, f):
+        text = json.dumps(cache)
+        f.write(text[:len(text) // 2])
+        f.flush()
+        both_writing.wait(5)
+        f.write(text[len(text) // 2:])
+    monkeypatch.setattr(half_ai.json, "dump", dump)
+
+    threads = [threading.Thread(target=resolver.save_cache) for resolver in resolvers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert half_ai.ToolchainResolver({}, cache_file=cache_file).load_cache().get('binaries')
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
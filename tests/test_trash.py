@@ -0,0 +1,31 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+pytest.importorskip("PyQt6.QtWidgets")
+
+import half_ai
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs a second filesystem")
+def test_trash_folder_on_another_filesystem_is_never_created(tmp_path, monkeypatch):
+    home = tempfile.mkdtemp(dir="/dev/shm")
+    if os.stat(home).st_dev == os.stat(tmp_path).st_dev:
+        pytest.skip("/dev/shm is on the same filesystem")
+    # The victim's filesystem resolves to a mount point on the home trash's filesystem
+    other = os.path.join(home, "other")
+    os.mkdir(other, 0o700)
+    trash = half_ai.TrashBin(os.path.join(home, "trash"))
+    monkeypatch.setattr(trash, "mount_point", lambda path: other)
+    victim = tmp_path / "victim.txt"
+    victim.write_text("")
+
+    try:
+        assert trash.trash_for(str(victim)) is trash.home
+        assert os.listdir(other) == []
+    finally:
+        shutil.rmtree(home)
@@ -1,3 +1,10 @@
+import sys
+import time
+import json
+
+# Start of the imports, most of them Tk's; for --profile-startup
+IMPORT_STARTED = time.perf_counter()
+
 import tkinter as tk
 from tkinter import scrolledtext, filedialog, messagebox, font, ttk
 import re
@@ -226,45 +233,86 @@ class LRDCodeEditor:
                 'keywords': r'\b(def|class|import|from|if|elif|else|for|while|try|except|finally|with|as|return|break|continue|pass|raise|yield|lambda|and|or|not|in|is|None|True|False|async|await|global|nonlocal|assert|del)\b',
                 'builtins': r'\b(print|len|range|str|int|float|list|dict|set|tuple|open|input|type|isinstance|enumerate|zip|map|filter|sorted|sum|min|max|abs|round|all|any|dir|help|super|property|staticmethod|classmethod)\b',
                 'comments': r'#.*$',
-                'strings': r'(["\'])(?:(?=(\\?))\2.)*?\1|"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'',
-                'numbers': r'\b\d+\.?\d*\b'
+                'strings': r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'',
+                'numbers': r'\b\d+\.?\d*\b',
+                'functions': r'\bdef\s+\w+',
+                'classes': r'\bclass\s+\w+'
             },
             'java': {
                 'keywords': r'\b(public|private|protected|static|final|abstract|class|interface|extends|implements|import|package|new|return|if|else|for|while|do|switch|case|break|continue|try|catch|finally|throw|throws|void|int|double|float|boolean|char|String|this|super|null|true|false)\b',
                 'builtins': r'\b(System|Math|String|Integer|Double|Boolean|ArrayList|HashMap|List|Set|Map|Exception|Thread|Object)\b',
-                'comments': r'//.*$|/\*[\s\S]*?\*/',
-                'strings': r'"(?:[^"\\]|\\.)*"',
+                'comments': r'//.*$',
+                'strings': r'"(?:[^"\\\n]|\\.)*"',
                 'numbers': r'\b\d+\.?\d*[fFdDlL]?\b'
             },
             'php': {
                 'keywords': r'\b(function|class|public|private|protected|static|final|abstract|interface|extends|implements|namespace|use|new|return|if|else|elseif|for|foreach|while|do|switch|case|break|continue|try|catch|finally|throw|echo|print|isset|empty|array|true|false|null|const|var|global|require|include|require_once|include_once)\b',
                 'builtins': r'\b(strlen|strpos|substr|str_replace|explode|implode|array_push|array_pop|count|in_array|array_merge|json_encode|json_decode|file_get_contents|file_put_contents|preg_match|preg_replace|mysqli_connect|PDO)\b',
-                'comments': r'//.*$|/\*[\s\S]*?\*/|#.*$',
-                'strings': r'(["\'])(?:(?=(\\?))\2.)*?\1',
+                'comments': r'//.*$|#.*$',
+                'strings': r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'',
                 'numbers': r'\b\d+\.?\d*\b',
                 'variables': r'\$\w+'
             },
             'javascript': {
                 'keywords': r'\b(function|class|const|let|var|if|else|for|while|do|switch|case|break|continue|return|try|catch|finally|throw|new|this|super|extends|import|export|default|async|await|yield|typeof|instanceof|in|of|null|undefined|true|false)\b',
                 'builtins': r'\b(console|document|window|Array|Object|String|Number|Boolean|Date|Math|JSON|Promise|setTimeout|setInterval|addEventListener|querySelector|getElementById)\b',
-                'comments': r'//.*$|/\*[\s\S]*?\*/',
-                'strings': r'(["\'])(?:(?=(\\?))\2.)*?\1|`[\s\S]*?`',
+                'comments': r'//.*$',
+                'strings': r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'',
                 'numbers': r'\b\d+\.?\d*\b'
             },
             'html': {
                 'tags': r'</?[a-zA-Z][\w]*(?:\s|>|/>)',
                 'attributes': r'\b[\w-]+(?==)',
-                'strings': r'(["\'])(?:(?=(\\?))\2.)*?\1',
-                'comments': r'<!--[\s\S]*?-->'
+                'strings': r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\''
             },
             'css': {
                 'keywords': r'\b(background|color|font|margin|padding|border|width|height|display|position|float|clear|text-align|line-height|opacity|transition|transform|animation)\b',
-                'comments': r'/\*[\s\S]*?\*/',
-                'strings': r'(["\'])(?:(?=(\\?))\2.)*?\1',
+                'strings': r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'',
                 'numbers': r'\b\d+\.?\d*(?:px|em|rem|%|vh|vw)?\b'
             }
         }
         
+        # Spans that can run over several lines: (opener, closer, tag)
+        self.multiline_patterns = {
+            'python': [('"""', '"""', 'string'), ("'''", "'''", 'string')],
+            'java': [('/*', '*/', 'comment')],
+            'php': [('/*', '*/', 'comment')],
+            'javascript': [('/*', '*/', 'comment'), ('`', '`', 'string')],
+            'html': [('<!--', '-->', 'comment')],
+            'css': [('/*', '*/', 'comment')]
+        }
+        
+        # Pattern key -> tag, in priority order for the combined regex
+        self.token_tags = {
+            'comments': 'comment',
+            'strings': 'string',
+            'functions': 'function',
+            'classes': 'class',
+            'tags': 'tag',
+            'attributes': 'attribute',
+            'variables': 'builtin',
+            'keywords': 'keyword',
+            'builtins': 'builtin',
+            'numbers': 'number'
+        }
+        self.token_patterns = {lang: self.compile_syntax(lang) for lang in self.syntax_patterns}
+        
+        # Incremental highlighting: the open multi-line span (index + 1) at the
+        # end of each line, plus the dirty line range waiting for the next pass
+        self.line_states = []
+        self.dirty_lines = None
+        self.highlight_job = None
+    
+    def compile_syntax(self, lang):
+        # One alternation per language, multi-line openers first
+        alternatives = [f"(?P<open{i}>{re.escape(opener)})"
+                        for i, (opener, _, _) in enumerate(self.multiline_patterns.get(lang, []))]
+        patterns = self.syntax_patterns[lang]
+        for key in self.token_tags:
+            if key in patterns:
+                alternatives.append(f"(?P<{key}>{patterns[key]})")
+        return re.compile('|'.join(alternatives))
+        
     def bind_events(self):
         self.text_editor.bind("<KeyRelease>", self.on_key_release)
         self.text_editor.bind("<Button-1>", self.update_cursor_info)
@@ -276,87 +324,109 @@ class LRDCodeEditor:
         self.text_editor.bind("<Control-y>", lambda e: self.text_editor.edit_redo())
         
     def highlight_syntax(self):
+        # Full pass, for when the whole buffer or the language changes
+        if self.highlight_job is not None:
+            self.root.after_cancel(self.highlight_job)
+            self.highlight_job = None
+        self.dirty_lines = None
+        self.line_states = [None] * self.get_line_count()
+        self.highlight_lines(1, len(self.line_states))
+    
+    def get_line_count(self):
+        return int(self.text_editor.index("end-1c").split('.')[0])
+    
+    def schedule_highlight(self):
+        # Mark the lines around the edit dirty; bursts of typing share one pass
+        line = int(self.text_editor.index(tk.INSERT).split('.')[0])
+        line_count = self.get_line_count()
+        delta = line_count - len(self.line_states)
+        if delta > 0:
+            at = max(0, line - 1 - delta)
+            self.line_states[at:at] = [None] * delta
+        elif delta < 0 and line - delta <= len(self.line_states):
+            # The joined line now ends where the last removed line used to
+            self.line_states[line - 1] = self.line_states[line - 1 - delta]
+            del self.line_states[line:line - delta]
+        
+        first, last = max(1, line - max(delta, 0)), line
+        if len(self.line_states) != line_count:
+            # Edit happened away from the cursor (undo, drag and drop...)
+            self.line_states = [None] * line_count
+            first, last = 1, line_count
+        elif self.dirty_lines:
+            old_first, old_last = self.dirty_lines
+            if old_last > first:
+                old_last += delta
+            first, last = min(first, old_first), max(last, old_last)
+        self.dirty_lines = (first, last)
+        
+        if self.highlight_job is not None:
+            self.root.after_cancel(self.highlight_job)
+        self.highlight_job = self.root.after(50, self.flush_highlight)
+    
+    def flush_highlight(self):
+        self.highlight_job = None
+        if self.dirty_lines:
+            first, last = self.dirty_lines
+            self.dirty_lines = None
+            self.highlight_lines(first, min(last, len(self.line_states)))
+    
+    def highlight_lines(self, first, last):
+        # Retokenize lines first..last, then keep going while the state carried
+        # out of the last line differs from the one it had before the edit
         lang = self.current_language.lower()
         if lang not in self.syntax_patterns:
             lang = 'python'
+        pattern = self.token_patterns[lang]
+        multiline = self.multiline_patterns.get(lang, [])
+        total = len(self.line_states)
+        state = (self.line_states[first - 2] or 0) if first > 1 else 0
+        
+        while first <= last:
+            spans = {tag: [] for tag in self.token_tags.values()}
+            text = self.text_editor.get(f"{first}.0", f"{last}.end")
+            for number, line in enumerate(text.split('\n'), first):
+                state = self.highlight_line(pattern, multiline, number, line, state, spans)
+                previous = self.line_states[number - 1]
+                self.line_states[number - 1] = state
             
-        content = self.text_editor.get("1.0", tk.END)
-        
-        # Remove old tags
-        for tag in ["keyword", "builtin", "string", "comment", "function", "number", "class", "operator", "tag", "attribute", "variable"]:
-            self.text_editor.tag_remove(tag, "1.0", tk.END)
-        
-        patterns = self.syntax_patterns[lang]
-        
-        # Highlight comments first (so they override other patterns)
-        if 'comments' in patterns:
-            for match in re.finditer(patterns['comments'], content, re.MULTILINE):
-                start = f"1.0+{match.start()}c"
-                end = f"1.0+{match.end()}c"
-                self.text_editor.tag_add("comment", start, end)
-        
-        # Highlight strings
-        if 'strings' in patterns:
-            for match in re.finditer(patterns['strings'], content, re.DOTALL):
-                start = f"1.0+{match.start()}c"
-                end = f"1.0+{match.end()}c"
-                self.text_editor.tag_add("string", start, end)
-        
-        # Highlight keywords
-        if 'keywords' in patterns:
-            for match in re.finditer(patterns['keywords'], content):
-                start = f"1.0+{match.start()}c"
-                end = f"1.0+{match.end()}c"
-                self.text_editor.tag_add("keyword", start, end)
-        
-        # Highlight builtins
-        if 'builtins' in patterns:
-            for match in re.finditer(patterns['builtins'], content):
-                start = f"1.0+{match.start()}c"
-                end = f"1.0+{match.end()}c"
-                self.text_editor.tag_add("builtin", start, end)
-        
-        # Highlight numbers
-        if 'numbers' in patterns:
-            for match in re.finditer(patterns['numbers'], content):
-                start = f"1.0+{match.start()}c"
-                end = f"1.0+{match.end()}c"
-                self.text_editor.tag_add("number", start, end)
-        
-        # Language-specific highlighting
-        if lang == 'python':
-            # Function definitions
-            for match in re.finditer(r'\bdef\s+(\w+)', content):
-                start = f"1.0+{match.start(1)}c"
-                end = f"1.0+{match.end(1)}c"
-                self.text_editor.tag_add("function", start, end)
+            for tag, indices in spans.items():
+                self.text_editor.tag_remove(tag, f"{first}.0", f"{last}.end")
+                if indices:
+                    self.text_editor.tag_add(tag, *indices)
             
-            # Class definitions
-            for match in re.finditer(r'\bclass\s+(\w+)', content):
-                start = f"1.0+{match.start(1)}c"
-                end = f"1.0+{match.end(1)}c"
-                self.text_editor.tag_add("class", start, end)
-                
-        elif lang == 'php' and 'variables' in patterns:
-            for match in re.finditer(patterns['variables'], content):
-                start = f"1.0+{match.start()}c"
-                end = f"1.0+{match.end()}c"
-                self.text_editor.tag_add("builtin", start, end)
-                
-        elif lang == 'html':
-            # Tags
-            if 'tags' in patterns:
-                for match in re.finditer(patterns['tags'], content):
-                    start = f"1.0+{match.start()}c"
-                    end = f"1.0+{match.end()}c"
-                    self.text_editor.tag_add("tag", start, end)
+            if previous == state:
+                break
+            first, last = last + 1, min(total, last + 200)
+    
+    def highlight_line(self, pattern, multiline, number, line, state, spans):
+        # Collect "line.col" index pairs per tag for one line and return the
+        # multi-line state it hands to the next line
+        start = pos = 0
+        while True:
+            if state:
+                closer, tag = multiline[state - 1][1:]
+                end = line.find(closer, pos)
+                if end == -1:
+                    spans[tag] += (f"{number}.{start}", f"{number}.{len(line)}")
+                    return state
+                pos = end + len(closer)
+                spans[tag] += (f"{number}.{start}", f"{number}.{pos}")
+                state = 0
             
-            # Attributes
-            if 'attributes' in patterns:
-                for match in re.finditer(patterns['attributes'], content):
-                    start = f"1.0+{match.start()}c"
-                    end = f"1.0+{match.end()}c"
-                    self.text_editor.tag_add("attribute", start, end)
+            match = pattern.search(line, pos)
+            if match is None:
+                return 0
+            kind = match.lastgroup
+            start, pos = match.span()
+            if kind.startswith('open'):
+                state = int(kind[4:]) + 1
+                continue
+            if kind in ('functions', 'classes'):
+                head, name = match.group().split(None, 1)
+                spans['keyword'] += (f"{number}.{start}", f"{number}.{start + len(head)}")
+                start = pos - len(name)
+            spans[self.token_tags[kind]] += (f"{number}.{start}", f"{number}.{pos}")
     
     def update_line_numbers(self):
         line_count = self.text_editor.get("1.0", tk.END).count('\n')
@@ -378,7 +448,7 @@ class LRDCodeEditor:
         self.char_count.config(text=f"Characters: {char_count}")
     
     def on_key_release(self, event):
-        self.highlight_syntax()
+        self.schedule_highlight()
         self.update_line_numbers()
         self.update_cursor_info()
         self.status_label.config(text="● MODIFIED", fg=self.colors['status_modified'])
@@ -649,7 +719,109 @@ class LRDCodeEditor:
         if messagebox.askyesno("Exit", "◢ Exit LRD Code Editor? ◣"):
             self.root.quit()
 
-if __name__ == "__main__":
+class StartupProfiler:
+    """Times startup phases for --profile-startup[=DIR] and writes a JSON report plus a Chrome trace"""
+    
+    def __init__(self, argv):
+        self.output_dir = None
+        for arg in argv[1:]:
+            if arg == '--profile-startup' or arg.startswith('--profile-startup='):
+                self.output_dir = arg.partition('=')[2] or os.getcwd()
+        self.phases = []
+        self.depth = 0
+        self.paint_phase = None
+        if self.output_dir:
+            self.phases.append(['imports', IMPORT_STARTED, time.perf_counter(), 0])
+    
+    def begin(self, name):
+        if not self.output_dir:
+            return None
+        self.phases.append([name, time.perf_counter(), None, self.depth])
+        self.depth += 1
+        return len(self.phases) - 1
+    
+    def end(self, phase):
+        if phase is not None:
+            self.depth -= 1
+            self.phases[phase][2] = time.perf_counter()
+    
+    def wrap(self, cls, *names):
+        """Time every call of the named methods as a phase of its own"""
+        if not self.output_dir:
+            return
+        for name in names:
+            setattr(cls, name, self.timed(name, getattr(cls, name)))
+    
+    def timed(self, name, method):
+        def wrapper(*args, **kwargs):
+            phase = self.begin(name)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.end(phase)
+        return wrapper
+    
+    def watch_first_paint(self, root):
+        """Close the profile once the window has been drawn for the first time"""
+        if not self.output_dir:
+            return
+        self.paint_phase = self.begin('first paint')
+        # Tk draws from idle callbacks, so the first idle turn after the
+        # window is mapped is when it is on screen
+        root.bind('<Map>', lambda event: root.after_idle(self.finish, root), add='+')
+    
+    def finish(self, root):
+        if self.paint_phase is None:
+            return
+        self.end(self.paint_phase)
+        self.paint_phase = None
+        self.write_report()
+        root.quit()
+    
+    def write_report(self):
+        edition = os.path.splitext(os.path.basename(__file__))[0]
+        origin = self.phases[0][1]
+        report = {
+            'edition': edition,
+            'python': sys.version.split()[0],
+            'tk': tk.TkVersion,
+            'platform': sys.platform,
+            'total_ms': round((max(end for _, _, end, _ in self.phases) - origin) * 1000, 3),
+            'phases': [{'name': name, 'depth': depth,
+                        'start_ms': round((start - origin) * 1000, 3),
+                        'duration_ms': round((end - start) * 1000, 3)}
+                       for name, start, end, depth in self.phases],
+        }
+        trace = {
+            'traceEvents': [{'name': name, 'cat': 'startup', 'ph': 'X', 'pid': os.getpid(), 'tid': 1,
+                             'ts': round((start - origin) * 1e6), 'dur': round((end - start) * 1e6)}
+                            for name, start, end, depth in self.phases],
+            'displayTimeUnit': 'ms',
+        }
+        
+        base = os.path.join(self.output_dir, f"{edition}_startup")
+        for path, data in ((base + '.json', report), (base + '.trace.json', trace)):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+        
+        for phase in report['phases']:
+            print(f"{'  ' * phase['depth']}{phase['name']:<{24 - 2 * phase['depth']}} {phase['duration_ms']:9.1f} ms")
+        print(f"{'total':<24} {report['total_ms']:9.1f} ms")
+        print(f"Startup profile written to {base}.json and {base}.trace.json")
+
+def main():
+    profiler = StartupProfiler(sys.argv)
+    profiler.wrap(LRDCodeEditor, 'setup_ui', 'setup_syntax', 'bind_events')
+    
+    phase = profiler.begin('Tk')
     root = tk.Tk()
+    profiler.end(phase)
+    
+    phase = profiler.begin('window')
     app = LRDCodeEditor(root)
+    profiler.end(phase)
+    profiler.watch_first_paint(root)
     root.mainloop()
+
+if __name__ == "__main__":
+    main()